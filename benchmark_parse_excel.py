@@ -0,0 +1,51 @@
+import logging
+import os
+import tempfile
+import time
+import warnings
+import pandas as pd
+from utils.utils import parse_csv, parse_excel
+
+logging.basicConfig(level=logging.WARNING)
+warnings.filterwarnings("ignore", message="Data Validation extension")
+logger = logging.getLogger(__name__)
+
+WORKBOOK_PATH = "attached_assets/Hours Tracker.xlsx"
+REPEATS = 10
+
+def legacy_parse_excel(file):
+    """The previous implementation: write the sheet to CSV and parse it again."""
+    df = pd.read_excel(file, parse_dates=['Date'])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'temp.csv')
+        df.to_csv(csv_path, index=False)
+        with open(csv_path, 'r') as csv_file:
+            return parse_csv(csv_file)
+
+def best_of(parser, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parser(WORKBOOK_PATH)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    # Silence the per-row debug logging so it does not dominate the timings
+    logging.disable(logging.INFO)
+
+    legacy_entries = legacy_parse_excel(WORKBOOK_PATH)
+    entries = parse_excel(WORKBOOK_PATH)
+    if [e.model_dump() for e in legacy_entries] != [e.model_dump() for e in entries]:
+        raise RuntimeError("parse_excel output differs from the CSV round-trip")
+
+    legacy_time = best_of(legacy_parse_excel, REPEATS)
+    direct_time = best_of(parse_excel, REPEATS)
+
+    print(f"\nParsed {len(entries)} entries from {WORKBOOK_PATH} (best of {REPEATS})")
+    print(f"CSV round-trip: {legacy_time * 1000:.1f} ms")
+    print(f"Direct:         {direct_time * 1000:.1f} ms")
+    print(f"Speedup:        {legacy_time / direct_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
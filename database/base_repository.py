@@ -1,21 +1,86 @@
+import sqlalchemy as sa
 from sqlalchemy.orm import Session
-from typing import Generic, TypeVar, Type, Optional, List, Union, Dict
+from typing import Generic, TypeVar, Type, Optional, List, Union, Dict, Any, Iterable
 from models.baseModel import BaseModel
+from .reference_cache import get_reference_cache
+from .unit_of_work import after_commit, commit, current_unit_of_work
 
 T = TypeVar('T', bound=BaseModel)
 
 class BaseRepository(Generic[T]):
+    # Reference data repositories name the cache namespace and the key column kept in it
+    cache_namespace: Optional[str] = None
+    cache_key: Optional[str] = None
+
     def __init__(self, model: Type[T]):
         self.model = model
 
+    def _commit(self, db: Session) -> None:
+        """Commit, or only flush inside a unit of work, which commits once.
+
+        Flushes load server generated values through RETURNING and the commit
+        does not expire them, so written objects need no refresh.
+        """
+        if current_unit_of_work(db) is not None:
+            db.flush()
+            return
+        commit(db)
+
+    def _rollback(self, db: Session) -> None:
+        """Roll back a failed write; inside a unit of work the unit rolls back as a whole."""
+        if current_unit_of_work(db) is None:
+            db.rollback()
+
+    def _remember(self, db: Session, ids: Dict[Any, int]) -> None:
+        """Cache the ids of rows by their keys, once the rows are committed."""
+        if self.cache_namespace:
+            namespace = self.cache_namespace
+            cache = get_reference_cache()
+
+            def remember():
+                for key, id in ids.items():
+                    if key and id is not None:
+                        cache.set(namespace, key, id)
+            after_commit(db, remember)
+
+    def _forget(self, key: Any = None) -> None:
+        """Invalidate a cached key, or the whole namespace when key is None."""
+        if self.cache_namespace:
+            get_reference_cache().invalidate(self.cache_namespace, key)
+
+    def ids_for(self, db: Session, keys: Iterable[Any]) -> Dict[Any, Optional[int]]:
+        """Map cache keys to the ids of their rows, or None for keys with no row.
+
+        Cached keys cost no query; the rest are looked up together with one
+        IN query.
+        """
+        cache = get_reference_cache()
+        ids = {key: cache.get(self.cache_namespace, key) for key in set(keys) if key}
+        missing = [key for key, id in ids.items() if id is None]
+        if missing:
+            column = getattr(self.model, self.cache_key)
+            found = dict(db.query(column, self.model.id).filter(column.in_(missing)).all())
+            ids.update(found)
+            self._remember(db, found)
+        return ids
+
+    def id_for(self, db: Session, key: Any) -> Optional[int]:
+        """The id of the row with the cache key, or None when there is none."""
+        return self.ids_for(db, [key]).get(key)
+
+    def exists(self, db: Session, key: Any) -> bool:
+        """Whether a row with the cache key exists; known rows cost no query."""
+        return self.id_for(db, key) is not None
+
     def create(self, db: Session, data: Union[Dict, BaseModel]) -> T:
         if isinstance(data, BaseModel):
             db_item = data
         else:
             db_item = self.model(**data)
         db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
+        self._commit(db)
+        if self.cache_key:
+            self._remember(db, {getattr(db_item, self.cache_key): db_item.id})
         return db_item
 
     def get(self, db: Session, id: int) -> Optional[T]:
@@ -25,15 +90,59 @@ class BaseRepository(Generic[T]):
         return db.query(self.model).offset(skip).limit(limit).all()
 
     def update(self, db: Session, item: T) -> T:
+        # The key may have been renamed, so cached keys of the namespace are dropped
+        self._forget()
         db.add(item)
-        db.commit()
-        db.refresh(item)
+        self._commit(db)
+        return item
+
+    def update_returning(self, db: Session, criterion: Any, values: Dict[str, Any]) -> Optional[T]:
+        """Apply values to the row matching criterion with UPDATE ... RETURNING.
+
+        The row is written and loaded back in one statement; None means no row
+        matched.
+        """
+        if not values:
+            return db.query(self.model).filter(criterion).first()
+        if self.cache_key in values:
+            self._forget()
+        statement = sa.update(self.model).where(criterion).values(**values).returning(self.model)
+        # A row already in the session is overwritten, so its relationships follow changed foreign keys
+        item = db.execute(statement.execution_options(populate_existing=True)).scalar_one_or_none()
+        if item is not None:
+            self._commit(db)
         return item
 
+    def delete_returning(self, db: Session, criterion: Any) -> List[Any]:
+        """Delete the rows matching criterion with DELETE ... RETURNING.
+
+        Returns the cache keys of the deleted rows, or their ids when the
+        repository has no cache key; an empty list means nothing matched.
+        """
+        column = getattr(self.model, self.cache_key) if self.cache_key else self.model.id
+        keys = db.execute(sa.delete(self.model).where(criterion).returning(column)).scalars().all()
+        for key in keys:
+            self._forget(key)
+        if keys:
+            self._commit(db)
+        return keys
+
+    def update_where(self, db: Session, criteria: List[Any], values: Dict[str, Any]) -> int:
+        """Apply values to every row matching criteria with one UPDATE; returns the row count."""
+        if self.cache_key in values:
+            self._forget()
+        statement = sa.update(self.model).where(*criteria).values(**values)
+        result = db.execute(statement.execution_options(synchronize_session=False))
+        self._commit(db)
+        return result.rowcount
+
+    def delete_where(self, db: Session, criteria: List[Any]) -> int:
+        """Delete every row matching criteria with one DELETE; returns the row count."""
+        self._forget()
+        statement = sa.delete(self.model).where(*criteria)
+        result = db.execute(statement.execution_options(synchronize_session=False))
+        self._commit(db)
+        return result.rowcount
+
     def delete(self, db: Session, id: int) -> bool:
-        db_item = self.get(db, id)
-        if db_item:
-            db.delete(db_item)
-            db.commit()
-            return True
-        return False
\ No newline at end of file
+        return bool(self.delete_returning(db, self.model.id == id))
@@ -0,0 +1,383 @@
+from typing import List, Dict, Any, Iterable, Iterator, Union, Set
+from io import StringIO
+from datetime import date
+import hashlib
+import uuid
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database import schemas
+from database.calendar_repository import CalendarRepository
+from utils.logger import Logger
+from utils.time_entry_batch import TimeEntryBatch
+
+logger = Logger().get_logger()
+
+EntryData = Union[schemas.TimeEntryCreate, Dict[str, Any]]
+
+class TimeEntryBulkLoader:
+    """Load time entries through COPY into an unlogged staging table.
+
+    Rows are streamed into ``time_entry_staging`` with ``COPY ... FROM STDIN``,
+    invalid rows are reported back per row, and the remaining rows are moved
+    into ``time_entries`` with a single ``INSERT ... SELECT`` that resolves the
+    customer names and project ids to their integer foreign keys with joins.
+    References that do not resolve are stored as NULL, matching the
+    single-entry create path.
+
+    Each inserted row gets a fingerprint hashed from its date, customer,
+    project, category, subcategory, task and hours. Rows whose fingerprint
+    already exists are skipped, so re-uploading a timesheet is a no-op.
+
+    Entries may also be given as a columnar TimeEntryBatch. Its values are
+    rendered once per distinct value, and its source row numbers are used
+    for the staged rows so rejects point back at the uploaded file.
+    """
+
+    STAGING_TABLE = "time_entry_staging"
+    COPY_COLUMNS = (
+        'load_id', 'row_number', 'date', 'category', 'subcategory',
+        'customer', 'project', 'task_description', 'hours'
+    )
+    COPY_BATCH_SIZE = 10000
+    # Unit separator keeps adjacent fields from running into each other.
+    # fingerprint() computes the same hash in Python and must be kept in step.
+    FINGERPRINT_SQL = """
+        encode(sha256(convert_to(concat_ws(chr(31),
+            s.date::text,
+            coalesce(c.name, ''),
+            coalesce(p.project_id, ''),
+            s.category,
+            coalesce(s.subcategory, ''),
+            coalesce(s.task_description, ''),
+            s.hours::text
+        ), 'UTF8')), 'hex')
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _copy_value(value: Any) -> str:
+        """Render a value in PostgreSQL COPY text format."""
+        if value is None:
+            return '\\N'
+        if isinstance(value, date):
+            return value.isoformat()
+        return (
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
+
+    @staticmethod
+    def _entry_values(entry: EntryData) -> tuple:
+        """Extract the staged columns from a schema instance or dictionary."""
+        if isinstance(entry, dict):
+            get = entry.get
+        else:
+            get = lambda key, default=None: getattr(entry, key, default)
+        return (
+            get('date'),
+            get('category'),
+            get('subcategory'),
+            get('customer'),
+            get('project'),
+            get('task_description'),
+            get('hours', 0.0)
+        )
+
+    @staticmethod
+    def _float_text(value: float) -> str:
+        """Render a float the way PostgreSQL prints float8 (shortest round-trip form)."""
+        rendered = repr(float(value))
+        return rendered[:-2] if rendered.endswith('.0') else rendered
+
+    @staticmethod
+    def fingerprint(entry: EntryData) -> str:
+        """Compute a row fingerprint matching FINGERPRINT_SQL without touching the database.
+
+        Customer and project are expected to be normalized, as they are once
+        bulk_ensure has created any missing references.
+        """
+        entry_date, category, subcategory, customer, project, task_description, hours = (
+            TimeEntryBulkLoader._entry_values(entry)
+        )
+        parts = [
+            entry_date.isoformat(),
+            customer or '',
+            project or '',
+            category,
+            subcategory or '',
+            task_description or '',
+            TimeEntryBulkLoader._float_text(hours)
+        ]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _hours_text(batch: TimeEntryBatch, render) -> List[str]:
+        """Render the hours of a batch once per distinct value."""
+        distinct, inverse = np.unique(batch.hours, return_inverse=True)
+        return np.array([render(value) for value in distinct.tolist()] or [''], dtype=object)[inverse].tolist()
+
+    @staticmethod
+    def batch_fingerprints(batch: TimeEntryBatch) -> List[str]:
+        """Compute fingerprint() for every entry of a batch."""
+        columns = [batch.date_text()]
+        for column in (batch.customer, batch.project, batch.category, batch.subcategory, batch.task_description):
+            columns.append(column.lookup(column.values, '').tolist())
+        columns.append(TimeEntryBulkLoader._hours_text(batch, TimeEntryBulkLoader._float_text))
+        return [
+            hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+            for parts in zip(*columns)
+        ]
+
+    def existing_fingerprints(self, fingerprints: Iterable[str]) -> Set[str]:
+        """Return the fingerprints that are already stored in time_entries."""
+        unique = sorted(set(fingerprints))
+        if not unique:
+            return set()
+        result = self.db.execute(
+            text("SELECT fingerprint FROM time_entries WHERE fingerprint = ANY(CAST(:fingerprints AS text[]))"),
+            {"fingerprints": unique}
+        )
+        return {row.fingerprint for row in result}
+
+    def _ensure_staging_table(self) -> None:
+        """Create the staging table when the migration has not been applied.
+
+        The lookup takes no lock, so concurrent loads do not queue behind each
+        other; the DDL, whose CREATE INDEX locks the table until commit, only
+        runs when the table is missing.
+        """
+        exists = self.db.execute(text("SELECT to_regclass(:table)"), {"table": self.STAGING_TABLE}).scalar()
+        if exists is not None:
+            return
+        self.db.execute(text(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {self.STAGING_TABLE} (
+                load_id TEXT NOT NULL,
+                row_number INTEGER NOT NULL,
+                date DATE,
+                category TEXT,
+                subcategory TEXT,
+                customer TEXT,
+                project TEXT,
+                task_description TEXT,
+                hours DOUBLE PRECISION
+            )
+        """))
+        self.db.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.STAGING_TABLE}_load_id "
+            f"ON {self.STAGING_TABLE} (load_id)"
+        ))
+
+    def _copy_lines(
+        self,
+        load_id: str,
+        entries: Union[Iterable[EntryData], TimeEntryBatch],
+        first_row_number: int
+    ) -> Iterator[str]:
+        """Yield one COPY text line per entry."""
+        if not isinstance(entries, TimeEntryBatch):
+            for row_number, entry in enumerate(entries, start=first_row_number):
+                values = (load_id, row_number) + self._entry_values(entry)
+                yield '\t'.join(self._copy_value(value) for value in values)
+            return
+
+        columns = [entries.rows.tolist(), entries.date_text()]
+        for column in (entries.category, entries.subcategory, entries.customer, entries.project, entries.task_description):
+            columns.append(column.lookup([self._copy_value(value) for value in column.values], '\\N').tolist())
+        columns.append(self._hours_text(entries, repr))
+        for values in zip(*columns):
+            yield f"{load_id}\t" + '\t'.join(map(str, values))
+
+    def _iter_copy_buffers(
+        self,
+        load_id: str,
+        entries: Union[Iterable[EntryData], TimeEntryBatch],
+        first_row_number: int
+    ) -> Iterator[StringIO]:
+        """Yield COPY text buffers holding at most COPY_BATCH_SIZE rows each."""
+        buffer = StringIO()
+        rows_in_buffer = 0
+        for line in self._copy_lines(load_id, entries, first_row_number):
+            buffer.write(line)
+            buffer.write('\n')
+            rows_in_buffer += 1
+            if rows_in_buffer >= self.COPY_BATCH_SIZE:
+                buffer.seek(0)
+                yield buffer
+                buffer = StringIO()
+                rows_in_buffer = 0
+        if rows_in_buffer:
+            buffer.seek(0)
+            yield buffer
+
+    def _copy_rows(
+        self,
+        load_id: str,
+        entries: Union[Iterable[EntryData], TimeEntryBatch],
+        first_row_number: int
+    ) -> int:
+        """Stream rows into the staging table and return how many were staged."""
+        cursor = self.db.connection().connection.cursor()
+        try:
+            copy_sql = (
+                f"COPY {self.STAGING_TABLE} ({', '.join(self.COPY_COLUMNS)}) "
+                "FROM STDIN"
+            )
+            staged = 0
+            for buffer in self._iter_copy_buffers(load_id, entries, first_row_number):
+                cursor.copy_expert(copy_sql, buffer)
+                staged += cursor.rowcount
+            return staged
+        finally:
+            cursor.close()
+
+    def _collect_rejects(self, load_id: str) -> List[Dict[str, Any]]:
+        """Return the staged rows that cannot be inserted, with the reason."""
+        rows = self.db.execute(text(f"""
+            SELECT row_number, column_name, reason FROM (
+                SELECT
+                    row_number,
+                    CASE
+                        WHEN date IS NULL THEN 'date'
+                        WHEN category IS NULL OR category = '' THEN 'category'
+                        WHEN hours IS NULL OR hours < 0 OR hours > 24 THEN 'hours'
+                    END AS column_name,
+                    CASE
+                        WHEN date IS NULL THEN 'missing date'
+                        WHEN category IS NULL OR category = '' THEN 'missing category'
+                        WHEN hours IS NULL OR hours < 0 OR hours > 24 THEN 'hours must be between 0 and 24'
+                    END AS reason
+                FROM {self.STAGING_TABLE}
+                WHERE load_id = :load_id
+            ) checked
+            WHERE reason IS NOT NULL
+            ORDER BY row_number
+        """), {"load_id": load_id})
+        return [
+            {"row": row.row_number, "column": row.column_name, "reason": row.reason}
+            for row in rows
+        ]
+
+    def _ensure_calendar_days(self, load_id: str) -> None:
+        """Add calendar rows for staged dates outside the range filled by the migration."""
+        self.db.execute(text(CalendarRepository.insert_sql(f"""
+            SELECT DISTINCT s.date AS d
+            FROM {self.STAGING_TABLE} s
+            WHERE s.load_id = :load_id AND s.date IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM calendar_days cd WHERE cd.date = s.date)
+        """)), {"load_id": load_id})
+
+    def _insert_from_staging(self, load_id: str, deduplicate: bool = True) -> List[Any]:
+        """Move valid staged rows into time_entries in one set-based statement.
+
+        Week numbers and month names come from the calendar_days dimension.
+        With deduplicate, rows whose fingerprint is already stored, including
+        duplicates within the same load, are skipped; otherwise every valid
+        row is inserted without a fingerprint. Ids are drawn before the insert
+        so each inserted row can be matched to its staged row. Returns the
+        row_number, id and fingerprint of each inserted row, in row order.
+        """
+        fingerprint_sql = self.FINGERPRINT_SQL if deduplicate else "NULL"
+        result = self.db.execute(text(f"""
+            WITH valid AS (
+                SELECT
+                    nextval(pg_get_serial_sequence('time_entries', 'id')) AS id,
+                    s.row_number,
+                    s.date,
+                    cd.iso_week,
+                    cd.month_name,
+                    s.category,
+                    COALESCE(s.subcategory, '') AS subcategory,
+                    c.id AS customer_id,
+                    p.id AS project_id,
+                    s.task_description,
+                    s.hours,
+                    {fingerprint_sql} AS fingerprint
+                FROM {self.STAGING_TABLE} s
+                JOIN calendar_days cd ON cd.date = s.date
+                LEFT JOIN customers c ON c.name = s.customer
+                LEFT JOIN projects p ON p.project_id = s.project
+                WHERE s.load_id = :load_id
+                  AND s.date IS NOT NULL
+                  AND s.category IS NOT NULL AND s.category <> ''
+                  AND s.hours BETWEEN 0 AND 24
+            ), inserted AS (
+                INSERT INTO time_entries (
+                    id, date, week_number, month, category, subcategory,
+                    customer_id, project_id, task_description, hours, fingerprint, created_at
+                )
+                SELECT
+                    id, date, iso_week, month_name, category, subcategory,
+                    customer_id, project_id, task_description, hours, fingerprint, clock_timestamp()
+                FROM valid
+                ORDER BY row_number
+                ON CONFLICT (fingerprint) DO NOTHING
+                RETURNING id
+            )
+            SELECT v.row_number, v.id, v.fingerprint
+            FROM valid v
+            JOIN inserted i ON i.id = v.id
+            ORDER BY v.row_number
+        """), {"load_id": load_id})
+        return list(result)
+
+    def load(
+        self,
+        entries: Union[Iterable[EntryData], TimeEntryBatch],
+        first_row_number: int = 1,
+        commit: bool = True,
+        deduplicate: bool = True
+    ) -> Dict[str, Any]:
+        """Bulk load entries and return inserted ids plus per-row rejects.
+
+        Customer and project values are expected to be normalized already.
+        Rows of a TimeEntryBatch are numbered with its source row numbers
+        instead of from first_row_number.
+        With commit=False the rows are left in the open transaction so the
+        caller can commit them together with its own writes; on failure the
+        transaction is left for the caller to roll back.
+        With deduplicate=False rows are not fingerprinted, so identical rows
+        are all inserted and never block a later file upload.
+        The result also maps the row number and fingerprint of each inserted
+        row to its id, so callers can match their entries to the rows they
+        became.
+        """
+        load_id = uuid.uuid4().hex
+        try:
+            self._ensure_staging_table()
+            staged = self._copy_rows(load_id, entries, first_row_number)
+            rejected = self._collect_rejects(load_id)
+            self._ensure_calendar_days(load_id)
+            inserted = self._insert_from_staging(load_id, deduplicate=deduplicate)
+            inserted_ids = [row.id for row in inserted]
+            self.db.execute(
+                text(f"DELETE FROM {self.STAGING_TABLE} WHERE load_id = :load_id"),
+                {"load_id": load_id}
+            )
+            if commit:
+                self.db.commit()
+
+            duplicates = staged - len(rejected) - len(inserted_ids)
+            logger.info(
+                f"Bulk loaded {len(inserted_ids)} of {staged} time entries "
+                f"({len(rejected)} rejected, {duplicates} duplicates skipped)"
+            )
+            return {
+                "staged": staged,
+                "inserted": len(inserted_ids),
+                "duplicates": duplicates,
+                "ids": inserted_ids,
+                "rows": {row.row_number: row.id for row in inserted},
+                "fingerprints": {row.fingerprint: row.id for row in inserted if row.fingerprint is not None},
+                "rejected": rejected
+            }
+        except Exception as e:
+            logger.error(f"Error bulk loading time entries: {str(e)}")
+            if commit:
+                self.db.rollback()
+            raise
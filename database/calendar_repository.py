@@ -0,0 +1,93 @@
+from datetime import date
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from models.calendarDayModel import CalendarDay
+from utils.calendar_days import FISCAL_YEAR_START_MONTH
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+class CalendarRepository:
+    """Access to the calendar_days dimension.
+
+    The migration fills a fixed range of dates. Bulk loads and single-entry
+    writes extend the table for any date outside it, so every stored time
+    entry has a calendar row and reports can join on it.
+    """
+    DEFAULT_START = date(2000, 1, 1)
+    DEFAULT_END = date(2050, 12, 31)
+
+    COLUMNS = (
+        'date', 'iso_year', 'iso_week', 'year', 'month', 'month_name',
+        'quarter', 'fiscal_year', 'fiscal_period', 'is_workday'
+    )
+    # Attributes of a date column d; the same rules as utils.calendar_days.calendar_attributes
+    ATTRIBUTES_SQL = f"""
+        d::date,
+        EXTRACT(ISOYEAR FROM d)::int,
+        EXTRACT(WEEK FROM d)::int,
+        EXTRACT(YEAR FROM d)::int,
+        EXTRACT(MONTH FROM d)::int,
+        to_char(d, 'FMMonth'),
+        EXTRACT(QUARTER FROM d)::int,
+        EXTRACT(YEAR FROM d)::int
+            + CASE WHEN {FISCAL_YEAR_START_MONTH} > 1 AND EXTRACT(MONTH FROM d) >= {FISCAL_YEAR_START_MONTH} THEN 1 ELSE 0 END,
+        (EXTRACT(MONTH FROM d)::int - {FISCAL_YEAR_START_MONTH} + 12) % 12 + 1,
+        EXTRACT(ISODOW FROM d) < 6
+    """
+
+    @classmethod
+    def insert_sql(cls, dates_sql: str) -> str:
+        """INSERT adding the missing days among the dates (column d) selected by dates_sql."""
+        return f"""
+            INSERT INTO calendar_days ({', '.join(cls.COLUMNS)})
+            SELECT {cls.ATTRIBUTES_SQL} FROM ({dates_sql}) AS dates
+            ON CONFLICT (date) DO NOTHING
+        """
+
+    def ensure_range(self, db: Session, start: date = DEFAULT_START, end: date = DEFAULT_END) -> int:
+        """Fill in the days from start to end that are missing and commit them.
+
+        Returns the number of days added; a range already present costs one count.
+        """
+        present = db.query(func.count(CalendarDay.date)).filter(
+            CalendarDay.date.between(start, end)
+        ).scalar()
+        if present == (end - start).days + 1:
+            return 0
+
+        try:
+            result = db.execute(text(self.insert_sql(
+                "SELECT generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS d"
+            )), {"start": start, "end": end})
+            db.commit()
+            logger.info(f"Added {result.rowcount} calendar days between {start} and {end}")
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Error filling calendar days: {str(e)}")
+            db.rollback()
+            raise
+
+    def ensure_dates(self, db: Session, dates: Iterable[Optional[date]]) -> None:
+        """Add the days among dates that lie outside the migrated range, without committing.
+
+        Dates inside DEFAULT_START to DEFAULT_END are already present, so the
+        usual write costs no statement; the caller commits the days with its rows.
+        """
+        outside = sorted({
+            day for day in dates
+            if isinstance(day, date) and not self.DEFAULT_START <= day <= self.DEFAULT_END
+        })
+        if outside:
+            db.execute(text(self.insert_sql("SELECT unnest(CAST(:dates AS date[])) AS d")), {"dates": outside})
+
+    def period_bounds(self, db: Session, **attributes) -> Optional[Tuple[date, date]]:
+        """First and last date of the period with the given attributes, e.g. iso_year and iso_week."""
+        query = db.query(func.min(CalendarDay.date), func.max(CalendarDay.date))
+        for name, value in attributes.items():
+            query = query.filter(getattr(CalendarDay, name) == value)
+        first, last = query.one()
+        if first is None:
+            return None
+        return first, last
@@ -79,9 +79,10 @@ def get_project_managers(db: Session, skip: int = 0, limit: int = 100) -> List[m
 # Project operations
 def create_project(db: Session, project: schemas.ProjectCreate) -> models.Project:
     """Create a new project."""
+    from .project_repository import ProjectRepository
     try:
         logger.debug(f"Creating project with data: {project.dict()}")
-        db_project = models.Project(**project.dict())
+        db_project = models.Project(**ProjectRepository().with_customer_id(db, project.dict()))
         db.add(db_project)
         db.commit()
         db.refresh(db_project)
@@ -170,11 +171,17 @@ def update_time_entry(
     entry: schemas.TimeEntryUpdate
 ) -> Optional[models.TimeEntry]:
     """Update an existing time entry."""
+    from .calendar_repository import CalendarRepository
+    from .timesheet_repository import TimeEntryRepository
     logger.debug(f"Attempting to update time entry {entry_id} with data: {entry.dict(exclude_unset=True)}")
     db_entry = db.query(models.TimeEntry).filter(models.TimeEntry.id == entry_id).first()
     if db_entry:
         try:
-            update_data = entry.dict(exclude_unset=True)
+            repository = TimeEntryRepository()
+            update_data = repository.clear_stale_fingerprint(
+                repository.with_reference_ids(db, entry.dict(exclude_unset=True))
+            )
+            CalendarRepository().ensure_dates(db, [update_data.get('date')])
             for key, value in update_data.items():
                 setattr(db_entry, key, value)
             db.commit()
@@ -267,11 +274,15 @@ def get_monthly_report(
 
 def get_time_entries_by_date(db: Session, query_date: date) -> List[models.TimeEntry]:
     """Retrieve all time entries for a specific date."""
+    from .timesheet_repository import TimeEntryRepository
     logger.debug(f"Executing database query for time entries on date: {query_date}")
 
-    entries = db.query(models.TimeEntry).filter(
+    entries = TimeEntryRepository.load_references(db.query(models.TimeEntry)).filter(
         models.TimeEntry.date == query_date
-    ).order_by(models.TimeEntry.created_at.asc()).all()
+    ).order_by(
+        # Rows bulk loaded in one statement share created_at; id keeps insertion order
+        models.TimeEntry.created_at.asc(), models.TimeEntry.id.asc()
+    ).all()
 
     if entries:
         logger.info(f"Found {len(entries)} time entries for date {query_date}")
@@ -290,17 +301,19 @@ def get_time_summaries(
     customer_name: Optional[str] = None
 ) -> schemas.TimeSummary:
     """Get time entries summary within a date range."""
+    from .timesheet_repository import TimeEntryRepository
     logger.debug(f"Fetching time summaries from {start_date} to {end_date}")
 
-    query = db.query(models.TimeEntry).filter(
+    entry_repo = TimeEntryRepository()
+    query = entry_repo.load_references(db.query(models.TimeEntry)).filter(
         models.TimeEntry.date >= start_date,
         models.TimeEntry.date <= end_date
     )
 
     if project_id:
-        query = query.filter(models.TimeEntry.project == project_id)
+        query = query.filter(entry_repo.reference_criterion(db, 'project', project_id))
     if customer_name:
-        query = query.filter(models.TimeEntry.customer == customer_name)
+        query = query.filter(entry_repo.reference_criterion(db, 'customer', customer_name))
 
     entries = query.all()
 
@@ -339,6 +352,7 @@ def get_time_entries_by_month(
     project_id: Optional[str] = None
 ) -> schemas.TimeSummary:
     """Get time entries for a specific month."""
+    from .calendar_repository import CalendarRepository
     logger.debug(f"Fetching time entries for {month} {year}")
 
     # Get the month number from the month name
@@ -346,12 +360,13 @@ def get_time_entries_by_month(
     if month_num == 0:
         raise ValueError("Invalid month name")
 
-    # Calculate start and end dates for the month
-    start_date = date(year, month_num, 1)
-    _, last_day = calendar.monthrange(year, month_num)
-    end_date = date(year, month_num, last_day)
+    bounds = CalendarRepository().period_bounds(db, year=year, month=month_num)
+    if bounds is None:
+        # No entry has extended the calendar to this year, so compute the dates
+        _, last_day = calendar.monthrange(year, month_num)
+        bounds = (date(year, month_num, 1), date(year, month_num, last_day))
 
-    return get_time_summaries(db, start_date, end_date, project_id)
+    return get_time_summaries(db, *bounds, project_id)
 
 def get_time_entries_by_week(
     db: Session,
@@ -360,13 +375,17 @@ def get_time_entries_by_week(
     project_id: Optional[str] = None
 ) -> schemas.TimeSummary:
     """Get time entries for a specific week number."""
+    from .calendar_repository import CalendarRepository
     logger.debug(f"Fetching time entries for week {week_number} of {year}")
 
-    # Calculate the date range for the given week number
-    first_day = datetime.strptime(f'{year}-W{week_number}-1', '%Y-W%W-%w').date()
-    last_day = first_day + timedelta(days=6)
+    # Look up the dates of the ISO week in the calendar dimension
+    bounds = CalendarRepository().period_bounds(db, iso_year=year, iso_week=week_number)
+    if bounds is None:
+        # No entry has extended the calendar to this year, so compute the dates
+        first_day = date.fromisocalendar(year, week_number, 1)
+        bounds = (first_day, first_day + timedelta(days=6))
 
-    return get_time_summaries(db, first_day, last_day, project_id)
+    return get_time_summaries(db, *bounds, project_id)
 
 try:
     from . import schemas
@@ -1,16 +1,19 @@
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Iterable, List
 import sqlalchemy as sa
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from models.customerModel import Customer
-from models.projectModel import Project
-from models.timeEntry import TimeEntry
 from .base_repository import BaseRepository
+from .reference_cache import get_reference_cache
 from utils.logger import Logger
 from database import schemas
 
 logger = Logger().get_logger()
 
 class CustomerRepository(BaseRepository[Customer]):
+    cache_namespace = 'customer'
+    cache_key = 'name'
+
     def __init__(self):
         super().__init__(Customer)
         logger.debug("CustomerRepository initialized")
@@ -25,35 +28,85 @@ class CustomerRepository(BaseRepository[Customer]):
         logger.debug(f"Fetching customer by ID: {id}")
         return db.query(self.model).filter(self.model.id == id).first()
 
-    def delete_by_name(self, db: Session, name: str) -> bool:
-        """Delete customer with cascade handling."""
-        logger.debug(f"Attempting to delete customer by name: {name}")
+    def bulk_ensure(self, db: Session, names: Iterable[str]) -> List[str]:
+        """Create any missing customers in one statement and return the names created.
+
+        Uses INSERT ... ON CONFLICT (name) DO NOTHING so concurrent uploads that
+        race on the same customer do not fail with unique violations. Generated
+        contact emails that are already taken are left NULL, so a name is never
+        skipped because of its email. The ids of the new and existing customers
+        are cached for resolving references.
+        """
+        cache = get_reference_cache()
+        unique_names = sorted({name for name in names if name and not cache.contains(self.cache_namespace, name)})
+        if not unique_names:
+            return []
         try:
-            customer = self.get_by_name(db, name)
-            if customer:
-                # Update related projects and time entries to set customer to NULL
-                db.query(Project).filter(
-                    Project.customer == name
-                ).update(
-                    {Project.customer: None},
-                    synchronize_session=False
-                )
-                db.query(TimeEntry).filter(
-                    TimeEntry.customer == name
-                ).update(
-                    {TimeEntry.customer: None},
-                    synchronize_session=False
+            emails, seen = [], set()
+            for name in unique_names:
+                email = f"{name.lower().replace(' ', '_')}@example.com"
+                emails.append(None if email in seen else email)
+                seen.add(email)
+            # The existing rows are read from the snapshot taken before the insert,
+            # so each requested name comes back once with its id
+            result = db.execute(text("""
+                WITH requested AS (
+                    SELECT * FROM unnest(CAST(:names AS text[]), CAST(:emails AS text[])) AS v(name, contact_email)
+                ), inserted AS (
+                    INSERT INTO customers (name, contact_email, status, created_at)
+                    SELECT r.name,
+                           CASE WHEN EXISTS (SELECT 1 FROM customers c WHERE c.contact_email = r.contact_email)
+                                THEN NULL ELSE r.contact_email END,
+                           'active', now()
+                    FROM requested r
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING id, name
                 )
+                SELECT id, name, true AS created FROM inserted
+                UNION ALL
+                SELECT c.id, c.name, false FROM customers c JOIN requested r ON r.name = c.name
+            """), {"names": unique_names, "emails": emails})
+            rows = result.all()
+            created = [row.name for row in rows if row.created]
+            self._commit(db)
+            self._remember(db, {row.name: row.id for row in rows})
+            if created:
+                logger.info(f"Created {len(created)} new customers: {', '.join(created)}")
+            return created
+        except Exception as e:
+            logger.error(f"Error ensuring customers exist: {str(e)}")
+            self._rollback(db)
+            raise
+
+    def find_missing(self, db: Session, names: Iterable[str]) -> List[str]:
+        """Return the names that have no customer yet, without creating them."""
+        unique_names = sorted({name for name in names if name})
+        if not unique_names:
+            return []
+        result = db.execute(text("""
+            SELECT v.name
+            FROM unnest(CAST(:names AS text[])) AS v(name)
+            WHERE NOT EXISTS (SELECT 1 FROM customers c WHERE c.name = v.name)
+            ORDER BY v.name
+        """), {"names": unique_names})
+        return [row.name for row in result]
 
-                db.delete(customer)
-                db.commit()
+    def delete_by_name(self, db: Session, name: str) -> bool:
+        """Delete a customer with a single DELETE ... RETURNING.
+
+        The customer_id foreign keys of projects and time entries are ON DELETE
+        SET NULL, so the database clears their references in the same statement.
+        """
+        logger.debug(f"Attempting to delete customer by name: {name}")
+        try:
+            if self.delete_returning(db, self.model.name == name):
                 logger.info(f"Successfully deleted customer: {name}")
                 return True
             logger.warning(f"Customer not found for deletion: {name}")
             return False
         except Exception as e:
             logger.error(f"Error in cascade delete: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def create(self, db: Session, data: Union[Dict[str, Any], schemas.CustomerCreate, Customer]) -> Customer:
@@ -71,17 +124,17 @@ class CustomerRepository(BaseRepository[Customer]):
                 raise ValueError(f"Invalid data type for customer creation: {type(data)}")
 
             db.add(db_customer)
-            db.commit()
-            db.refresh(db_customer)
+            self._commit(db)
+            self._remember(db, {db_customer.name: db_customer.id})
             logger.info(f"Successfully created customer: {db_customer.name}")
             return db_customer
         except Exception as e:
             logger.error(f"Error creating customer: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def update(self, db: Session, item: Customer) -> Customer:
-        """Update with cascade handling."""
+        """Update with better error handling."""
         logger.debug(f"Updating customer: {item.name}")
         try:
             # Get the current customer to check for name changes
@@ -89,28 +142,37 @@ class CustomerRepository(BaseRepository[Customer]):
             if not current:
                 raise ValueError(f"Customer with ID {item.id} not found")
 
-            # Update related records with new customer name
-            if current.name != item.name:
-                db.query(Project).filter(
-                    Project.customer == current.name
-                ).update(
-                    {Project.customer: item.name},
-                    synchronize_session=False
-                )
-                db.query(TimeEntry).filter(
-                    TimeEntry.customer == current.name
-                ).update(
-                    {TimeEntry.customer: item.name},
-                    synchronize_session=False
-                )
+            # A rename may already be applied to current through the identity map,
+            # so every cached name is dropped rather than just the old one.
+            # Projects and time entries reference the customer by id, so a
+            # rename does not touch them.
+            self._forget()
 
             # Perform the update
             db.merge(item)
-            db.commit()
-            db.refresh(item)
+            self._commit(db)
+            self._remember(db, {item.name: item.id})
             logger.info(f"Successfully updated customer: {item.name}")
             return item
         except Exception as e:
             logger.error(f"Error updating customer: {str(e)}")
-            db.rollback()
-            raise
\ No newline at end of file
+            self._rollback(db)
+            raise
+
+    def update_by_name(self, db: Session, name: str, values: Dict[str, Any]) -> Optional[Customer]:
+        """Update the customer called name with UPDATE ... RETURNING; None when it does not exist.
+
+        Projects and time entries reference the customer by id, so a rename
+        is this one statement.
+        """
+        logger.debug(f"Updating customer {name} with {values}")
+        try:
+            customer = self.update_returning(db, self.model.name == name, values)
+            if customer is not None:
+                self._remember(db, {customer.name: customer.id})
+                logger.info(f"Successfully updated customer: {customer.name}")
+            return customer
+        except Exception as e:
+            logger.error(f"Error updating customer: {str(e)}")
+            self._rollback(db)
+            raise
@@ -105,6 +105,11 @@ def init_database():
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
 
+        # Fill the calendar dimension, as the calendar_days migration does
+        from database.calendar_repository import CalendarRepository
+        with SessionLocal() as session:
+            CalendarRepository().ensure_range(session)
+
         # Verify tables were created
         new_tables = inspector.get_table_names()
         logger.info(f"Tables after initialization: {', '.join(new_tables)}")
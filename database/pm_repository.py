@@ -1,9 +1,12 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from sqlalchemy.orm import Session
 from models.projectManagerModel import ProjectManager
 from .base_repository import BaseRepository
 
 class ProjectManagerRepository(BaseRepository[ProjectManager]):
+    cache_namespace = 'project_manager'
+    cache_key = 'name'
+
     def __init__(self):
         super().__init__(ProjectManager)
 
@@ -19,25 +22,28 @@ class ProjectManagerRepository(BaseRepository[ProjectManager]):
         """Create a new project manager."""
         db_project_manager = ProjectManager(**project_manager_data)
         db.add(db_project_manager)
-        db.commit()
-        db.refresh(db_project_manager)
+        self._commit(db)
+        self._remember(db, {db_project_manager.name: db_project_manager.id})
         return db_project_manager
 
     def update(self, db: Session, project_manager: ProjectManager) -> ProjectManager:
         """Update an existing project manager."""
+        # The name may have changed, so cached names are dropped
+        self._forget()
         db.merge(project_manager)
-        db.commit()
-        db.refresh(project_manager)
+        self._commit(db)
+        return project_manager
+
+    def update_by_email(self, db: Session, email: str, values: Dict[str, Any]) -> Optional[ProjectManager]:
+        """Update a project manager with UPDATE ... RETURNING; None when it does not exist."""
+        project_manager = self.update_returning(db, self.model.email == email, values)
+        if project_manager is not None:
+            self._remember(db, {project_manager.name: project_manager.id})
         return project_manager
 
     def delete(self, db: Session, email: str) -> bool:
-        """Delete a project manager by email."""
-        project_manager = self.get_by_email(db, email)
-        if project_manager:
-            db.delete(project_manager)
-            db.commit()
-            return True
-        return False
+        """Delete a project manager by email with a single DELETE ... RETURNING."""
+        return bool(self.delete_returning(db, self.model.email == email))
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ProjectManager]:
         """Get all project managers with pagination."""
@@ -1,19 +1,38 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Iterable
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
 from models.projectModel import Project
 from models.timeEntry import TimeEntry
 from .base_repository import BaseRepository
+from .customer_repository import CustomerRepository
+from .reference_cache import get_reference_cache
 from utils.logger import Logger
 from database import schemas
 
 logger = Logger().get_logger()
 
 class ProjectRepository(BaseRepository[Project]):
+    cache_namespace = 'project'
+    cache_key = 'project_id'
+
     def __init__(self):
         super().__init__(Project)
+        self.customer_repo = CustomerRepository()
         logger.debug("ProjectRepository initialized")
 
+    def with_customer_id(self, db: Session, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the customer name in project values with its customer_id.
+
+        Names come from the reference cache or one lookup; a name with no
+        customer is stored as NULL.
+        """
+        if 'customer' in values:
+            values = dict(values)
+            customer_name = values.pop('customer')
+            values['customer_id'] = self.customer_repo.id_for(db, customer_name) if customer_name else None
+        return values
+
     def get_by_project_id(self, db: Session, project_id: str) -> Optional[Project]:
         """Get a project by its unique project_id."""
         logger.debug(f"Fetching project with ID: {project_id}")
@@ -22,13 +41,76 @@ class ProjectRepository(BaseRepository[Project]):
     def get_by_customer(self, db: Session, customer_name: str) -> List[Project]:
         """Get all projects for a specific customer."""
         logger.debug(f"Fetching projects for customer: {customer_name}")
-        return db.query(self.model).filter(self.model.customer == customer_name).all()
+        customer_id = self.customer_repo.id_for(db, customer_name)
+        if customer_id is None:
+            return []
+        return db.query(self.model).options(joinedload(self.model.customer_ref)).filter(
+            self.model.customer_id == customer_id
+        ).all()
 
     def get_by_project_manager(self, db: Session, manager_name: str) -> List[Project]:
         """Get all projects managed by a specific project manager."""
         logger.debug(f"Fetching projects for manager: {manager_name}")
         return db.query(self.model).filter(self.model.project_manager == manager_name).all()
 
+    def bulk_ensure(self, db: Session, project_customers: Dict[str, Optional[str]]) -> List[str]:
+        """Create any missing projects in one statement and return the project IDs created.
+
+        project_customers maps each project_id to the customer it should be created
+        for. Customers that do not exist are stored as NULL, and conflicts on
+        project_id are ignored so concurrent uploads cannot race each other.
+        The ids of the new and existing projects are cached for resolving
+        references.
+        """
+        cache = get_reference_cache()
+        project_ids = sorted(
+            project_id for project_id in project_customers
+            if project_id and not cache.contains(self.cache_namespace, project_id)
+        )
+        if not project_ids:
+            return []
+        try:
+            customers = [project_customers[project_id] for project_id in project_ids]
+            result = db.execute(text("""
+                WITH requested AS (
+                    SELECT * FROM unnest(CAST(:project_ids AS text[]), CAST(:customers AS text[])) AS v(project_id, customer)
+                ), inserted AS (
+                    INSERT INTO projects (project_id, name, customer_id, project_manager, status, created_at)
+                    SELECT r.project_id, r.project_id, c.id, NULL, 'active', now()
+                    FROM requested r
+                    LEFT JOIN customers c ON c.name = r.customer
+                    ON CONFLICT (project_id) DO NOTHING
+                    RETURNING id, project_id
+                )
+                SELECT id, project_id, true AS created FROM inserted
+                UNION ALL
+                SELECT p.id, p.project_id, false FROM projects p JOIN requested r ON r.project_id = p.project_id
+            """), {"project_ids": project_ids, "customers": customers})
+            rows = result.all()
+            created = [row.project_id for row in rows if row.created]
+            self._commit(db)
+            self._remember(db, {row.project_id: row.id for row in rows})
+            if created:
+                logger.info(f"Created {len(created)} new projects: {', '.join(created)}")
+            return created
+        except Exception as e:
+            logger.error(f"Error ensuring projects exist: {str(e)}")
+            self._rollback(db)
+            raise
+
+    def find_missing(self, db: Session, project_ids: Iterable[str]) -> List[str]:
+        """Return the project IDs that have no project yet, without creating them."""
+        unique_ids = sorted({project_id for project_id in project_ids if project_id})
+        if not unique_ids:
+            return []
+        result = db.execute(text("""
+            SELECT v.project_id
+            FROM unnest(CAST(:project_ids AS text[])) AS v(project_id)
+            WHERE NOT EXISTS (SELECT 1 FROM projects p WHERE p.project_id = v.project_id)
+            ORDER BY v.project_id
+        """), {"project_ids": unique_ids})
+        return [row.project_id for row in result]
+
     def create(self, db: Session, data: Union[Dict[str, Any], schemas.ProjectCreate, Project]) -> Project:
         """Create with better foreign key handling."""
         try:
@@ -42,9 +124,8 @@ class ProjectRepository(BaseRepository[Project]):
                 else:
                     raise ValueError(f"Invalid data type for project creation: {type(data)}")
 
-                # Handle None values for foreign keys
-                if 'customer' in project_data and not project_data['customer']:
-                    project_data.pop('customer')
+                # Store the customer by id and handle None values for foreign keys
+                project_data = self.with_customer_id(db, project_data)
                 if 'project_manager' in project_data and not project_data['project_manager']:
                     project_data.pop('project_manager')
 
@@ -58,13 +139,13 @@ class ProjectRepository(BaseRepository[Project]):
                 raise ValueError(f"Project with ID {db_project.project_id} already exists")
 
             db.add(db_project)
-            db.commit()
-            db.refresh(db_project)
+            self._commit(db)
+            self._remember(db, {db_project.project_id: db_project.id})
             logger.info(f"Successfully created project: {db_project.project_id}")
             return db_project
         except Exception as e:
             logger.error(f"Error creating project: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def update(self, db: Session, item: Project) -> Project:
@@ -75,19 +156,16 @@ class ProjectRepository(BaseRepository[Project]):
                 raise ValueError(f"Project with ID {item.project_id} not found")
 
             # Handle None values for foreign keys
-            if hasattr(item, 'customer') and not item.customer:
-                delattr(item, 'customer')
             if hasattr(item, 'project_manager') and not item.project_manager:
                 delattr(item, 'project_manager')
 
             db.merge(item)
-            db.commit()
-            db.refresh(item)
+            self._commit(db)
             logger.info(f"Successfully updated project: {item.project_id}")
             return item
         except Exception as e:
             logger.error(f"Error updating project: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def get(self, db: Session, id: int) -> Optional[Project]:
@@ -109,26 +187,60 @@ class ProjectRepository(BaseRepository[Project]):
             if project:
                 # Update related time entries to set project to NULL
                 db.query(TimeEntry).filter(
-                    TimeEntry.project == project.project_id
+                    TimeEntry.project_id == project.id
                 ).update(
-                    {TimeEntry.project: None},
+                    {TimeEntry.project_id: None},
                     synchronize_session=False
                 )
 
+                self._forget(project.project_id)
                 db.delete(project)
-                db.commit()
+                self._commit(db)
                 logger.info(f"Successfully deleted project: {project.project_id}")
                 return True
             logger.warning(f"Project not found for deletion: {id}")
             return False
         except Exception as e:
             logger.error(f"Error deleting project: {str(e)}")
-            db.rollback()
+            self._rollback(db)
+            raise
+
+    def update_by_project_id(self, db: Session, project_id: str, values: Dict[str, Any]) -> Optional[Project]:
+        """Update a project with UPDATE ... RETURNING; None when it does not exist.
+
+        A customer name among the values is stored as its customer_id.
+        """
+        try:
+            project = self.update_returning(db, self.model.project_id == project_id, self.with_customer_id(db, values))
+            if project is not None:
+                self._remember(db, {project.project_id: project.id})
+                logger.info(f"Successfully updated project: {project_id}")
+            return project
+        except Exception as e:
+            logger.error(f"Error updating project: {str(e)}")
+            self._rollback(db)
+            raise
+
+    def delete_by_project_id(self, db: Session, project_id: str) -> bool:
+        """Delete a project with a single DELETE ... RETURNING.
+
+        time_entries.project_id is ON DELETE SET NULL, so the database clears the
+        references in the same statement.
+        """
+        try:
+            if self.delete_returning(db, self.model.project_id == project_id):
+                logger.info(f"Successfully deleted project: {project_id}")
+                return True
+            logger.warning(f"Project not found for deletion: {project_id}")
+            return False
+        except Exception as e:
+            logger.error(f"Error deleting project: {str(e)}")
+            self._rollback(db)
             raise
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[Project]:
         """Get all projects with pagination."""
         logger.debug(f"Fetching all projects with skip={skip}, limit={limit}")
-        projects = db.query(self.model).offset(skip).limit(limit).all()
+        projects = db.query(self.model).options(joinedload(self.model.customer_ref)).offset(skip).limit(limit).all()
         logger.info(f"Retrieved {len(projects)} projects")
         return projects
\ No newline at end of file
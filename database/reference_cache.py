@@ -0,0 +1,129 @@
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import os
+import threading
+import time
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL_SECONDS = 300.0
+
+class ReferenceCache:
+    """Process-local cache of reference data such as customer names and project ids.
+
+    Entries are keyed by a namespace and a key. They expire ttl seconds after
+    they are stored, and the least recently used entry is evicted once
+    max_size entries are held. Repositories store the ids of rows under their
+    keys after their writes commit and invalidate them on renames and deletes.
+    Changes made by other processes become visible once the entry expires.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]' = OrderedDict()
+        self._counters: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace: str, event: str) -> None:
+        self._counters.setdefault(namespace, Counter())[event] += 1
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[(namespace, key)]
+                self._count(namespace, 'expirations')
+                entry = None
+            if entry is None:
+                self._count(namespace, 'misses')
+                return default
+            self._entries.move_to_end((namespace, key))
+            self._count(namespace, 'hits')
+            return entry[1]
+
+    def contains(self, namespace: str, key: Hashable) -> bool:
+        """Whether a live entry exists for the key; counted as a hit or a miss."""
+        return self.get(namespace, key, _MISSING) is not _MISSING
+
+    def set(self, namespace: str, key: Hashable, value: Any = True) -> None:
+        """Store a value, evicting the least recently used entries beyond max_size."""
+        with self._lock:
+            self._entries[(namespace, key)] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_size:
+                (evicted_namespace, _), _ = self._entries.popitem(last=False)
+                self._count(evicted_namespace, 'evictions')
+
+    def invalidate(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        """Drop one key of a namespace, or the whole namespace when key is None."""
+        with self._lock:
+            if key is None:
+                keys = [cached for cached in self._entries if cached[0] == namespace]
+            else:
+                keys = [(namespace, key)] if (namespace, key) in self._entries else []
+            for cached in keys:
+                del self._entries[cached]
+            self._count(namespace, 'invalidations')
+
+    def clear(self) -> None:
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and hit, miss, eviction and expiration counters per namespace."""
+        with self._lock:
+            sizes = Counter(namespace for namespace, _ in self._entries)
+            namespaces = {}
+            for namespace in sorted(set(self._counters) | set(sizes)):
+                counters = self._counters.get(namespace, Counter())
+                lookups = counters['hits'] + counters['misses']
+                namespaces[namespace] = {
+                    'size': sizes[namespace],
+                    'hits': counters['hits'],
+                    'misses': counters['misses'],
+                    'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else None,
+                    'evictions': counters['evictions'],
+                    'expirations': counters['expirations'],
+                    'invalidations': counters['invalidations']
+                }
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': sum(counters['hits'] for counters in self._counters.values()),
+                'misses': sum(counters['misses'] for counters in self._counters.values()),
+                'namespaces': namespaces
+            }
+
+_MISSING = object()
+
+_cache: Optional[ReferenceCache] = None
+_cache_lock = threading.Lock()
+
+def get_reference_cache() -> ReferenceCache:
+    """Return the process-wide reference cache.
+
+    REFERENCE_CACHE_SIZE bounds the number of entries and
+    REFERENCE_CACHE_TTL_SECONDS sets how long they live; a TTL of 0 disables
+    caching.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReferenceCache(
+                max_size=int(os.environ.get('REFERENCE_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+                ttl=float(os.environ.get('REFERENCE_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+            )
+            logger.info(f"Reference cache holds up to {_cache.max_size} entries for {_cache.ttl}s")
+        return _cache
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, ValidationError, model_validator
+from typing import Any, Iterable, Optional, List, Dict, Tuple
 from datetime import datetime, date
 from models.timeEntry import TimeEntry as TimeEntryModel
 from models.customerModel import Customer as CustomerModel
@@ -36,6 +36,38 @@ class TimeEntryCreate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Built once: creating an adapter compiles a validator for the whole list type
+TIME_ENTRY_LIST_ADAPTER = TypeAdapter(List[TimeEntryCreate])
+
+def validate_time_entries(rows: List[Dict[str, Any]]) -> Tuple[List[TimeEntryCreate], Dict[int, str]]:
+    """Validate rows as TimeEntryCreate in one call.
+
+    Returns the valid entries in order and an error message for each rejected
+    row, keyed by its position in rows.
+    """
+    try:
+        return TIME_ENTRY_LIST_ADAPTER.validate_python(rows), {}
+    except ValidationError as e:
+        errors = {}
+        for error in e.errors():
+            index, *field = error['loc']
+            message = f"{'.'.join(map(str, field))}: {error['msg']}" if field else error['msg']
+            errors.setdefault(index, message)
+        valid = [row for index, row in enumerate(rows) if index not in errors]
+        return TIME_ENTRY_LIST_ADAPTER.validate_python(valid), errors
+
+def construct_time_entries(rows: Iterable[Dict[str, Any]]) -> List[TimeEntryCreate]:
+    """Build TimeEntryCreate instances without validation.
+
+    Only for rows already checked in bulk, e.g. by FrameValidator; keys that
+    are not fields of TimeEntryCreate are ignored.
+    """
+    fields = TimeEntryCreate.model_fields
+    return [
+        TimeEntryCreate.model_construct(**{key: value for key, value in row.items() if key in fields})
+        for row in rows
+    ]
+
 class TimeEntryUpdate(BaseModel):
     """Schema for updating time entries"""
     category: Optional[str] = None
@@ -48,6 +80,30 @@ class TimeEntryUpdate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TimeEntryFilter(BaseModel):
+    """Schema selecting time entries for bulk updates and deletes
+
+    Either ids or at least one other criterion is required, so a request
+    cannot touch every entry by accident. Date bounds are inclusive.
+    """
+    ids: Optional[List[int]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    customer: Optional[str] = None
+    project: Optional[str] = None
+    category: Optional[str] = None
+
+    @model_validator(mode='after')
+    def require_criterion(self) -> 'TimeEntryFilter':
+        if all(value is None for value in self.model_dump().values()):
+            raise ValueError("At least one filter criterion or a list of ids is required")
+        return self
+
+class TimeEntryBulkUpdate(BaseModel):
+    """Schema for applying the same changes to every time entry a filter matches"""
+    filter: TimeEntryFilter
+    changes: TimeEntryUpdate
+
 class TimeEntry(TimeEntryBase):
     """Schema for time entry responses"""
     week_number: int
@@ -199,4 +255,33 @@ class Project(ProjectBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class SheetUploadStatus(BaseModel):
+    """Schema for the progress of one worksheet of an upload"""
+    progress: float
+    total_rows: int
+    rows_processed: int
+    rows_rejected: int
+    rows_duplicate: int = 0
+
+class UploadStatus(BaseModel):
+    """Schema for upload job progress"""
+    progress_key: str
+    filename: Optional[str] = None
+    file_hash: Optional[str] = None
+    state: str
+    progress: float
+    total_rows: int
+    rows_processed: int
+    rows_rejected: int
+    rows_duplicate: int = 0
+    rows_per_second: float
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    sheets: Optional[Dict[str, SheetUploadStatus]] = None
+
+    model_config = ConfigDict(from_attributes=True)
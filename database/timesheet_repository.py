@@ -1,23 +1,117 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Iterable
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, date
 from models.timeEntry import TimeEntry
-from models.customerModel import Customer
-from models.projectModel import Project
 from database import schemas
 from .base_repository import BaseRepository
-from utils.xls_analyzer import XLSAnalyzer
+from .bulk_loader import TimeEntryBulkLoader
+from .calendar_repository import CalendarRepository
+from .reference_cache import get_reference_cache
+from .unit_of_work import after_commit
+from utils.xls_analyzer import XLSAnalyzer, ExcelSource
+from utils.frame_validator import FrameValidator
 from utils.logger import Logger
 from utils.validators import normalize_project_id, normalize_customer_name
 import pandas as pd
 
 logger = Logger().get_logger()
 
+# Id of each candidate reference, or None when it does not exist
+References = Dict[str, Dict[str, Optional[int]]]
+
 class TimeEntryRepository(BaseRepository[TimeEntry]):
+    # Time entry column holding the id of each reference
+    REFERENCE_COLUMNS = {'customer': 'customer_id', 'project': 'project_id'}
+    # Values hashed into the fingerprint by TimeEntryBulkLoader
+    FINGERPRINT_COLUMNS = frozenset({
+        'date', 'customer', 'customer_id', 'project', 'project_id',
+        'category', 'subcategory', 'task_description', 'hours'
+    })
+
     def __init__(self):
         super().__init__(TimeEntry)
 
+    def resolve_references(
+        self,
+        db: Session,
+        customers: Iterable[Optional[str]],
+        projects: Iterable[Optional[str]]
+    ) -> References:
+        """Look up the ids of candidate customer names and project ids in one round trip.
+
+        Candidates found in the reference cache need no lookup; the rest are
+        searched once per table with ``= ANY(:values)``. The result maps every
+        candidate to the id of its row, or None when it does not exist, keyed
+        by the reference it belongs to.
+        """
+        cache = get_reference_cache()
+        references = {
+            'customer': dict.fromkeys(sorted({name for name in customers if name})),
+            'project': dict.fromkeys(sorted({project for project in projects if project}))
+        }
+        candidates = {}
+        for field, known in references.items():
+            for value in known:
+                known[value] = cache.get(field, value)
+            candidates[field] = [value for value, resolved in known.items() if resolved is None]
+        if not candidates['customer'] and not candidates['project']:
+            return references
+
+        rows = db.execute(text("""
+            SELECT 'customer' AS field, name AS value, id FROM customers WHERE name = ANY(:customers)
+            UNION ALL
+            SELECT 'project', project_id, id FROM projects WHERE project_id = ANY(:projects)
+        """), {"customers": candidates['customer'], "projects": candidates['project']})
+        found = [(row.field, row.value, row.id) for row in rows]
+        for field, value, id in found:
+            references[field][value] = id
+
+        # Rows flushed by an open unit of work are only cached once it commits
+        def remember():
+            for field, value, id in found:
+                cache.set(field, value, id)
+        after_commit(db, remember)
+        return references
+
+    @classmethod
+    def apply_references(cls, entry: Dict[str, Any], references: References) -> Dict[str, Any]:
+        """Replace the customer and project names of an entry dictionary with their ids.
+
+        References that do not exist are stored as NULL.
+        """
+        for field, column in cls.REFERENCE_COLUMNS.items():
+            if field in entry:
+                value = entry.pop(field)
+                entry[column] = references[field].get(value) if value else None
+        return entry
+
+    def with_reference_ids(self, db: Session, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of time entry values with the customer and project names resolved to ids."""
+        values = dict(values)
+        references = self.resolve_references(db, [values.get('customer')], [values.get('project')])
+        return self.apply_references(values, references)
+
+    @classmethod
+    def clear_stale_fingerprint(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of update values that also clears the fingerprint when a hashed column changes.
+
+        An edited entry no longer matches the row it was uploaded from, so it
+        stops counting as a duplicate of that row when a file is uploaded again.
+        """
+        if cls.FINGERPRINT_COLUMNS.isdisjoint(values):
+            return values
+        return {**values, 'fingerprint': None}
+
+    def update_returning(self, db: Session, criterion: Any, values: Dict[str, Any]) -> Optional[TimeEntry]:
+        CalendarRepository().ensure_dates(db, [values.get('date')])
+        return super().update_returning(db, criterion, self.clear_stale_fingerprint(values))
+
+    def update_where(self, db: Session, criteria: List[Any], values: Dict[str, Any]) -> int:
+        CalendarRepository().ensure_dates(db, [values.get('date')])
+        return super().update_where(db, criteria, self.clear_stale_fingerprint(values))
+
     def create(self, db: Session, data: Union[Dict[str, Any], schemas.TimeEntryCreate, TimeEntry]) -> TimeEntry:
         """Create a new time entry with better foreign key handling."""
         try:
@@ -32,79 +126,46 @@ class TimeEntryRepository(BaseRepository[TimeEntry]):
                     raise ValueError(f"Invalid data type for time entry creation: {type(data)}")
 
                 # Validate foreign keys before creation
-                if entry_dict.get('project'):
-                    project = db.query(Project).filter(
-                        Project.project_id == entry_dict['project']
-                    ).first()
-                    if not project:
-                        entry_dict['project'] = None
-
-                if entry_dict.get('customer'):
-                    customer = db.query(Customer).filter(
-                        Customer.name == entry_dict['customer']
-                    ).first()
-                    if not customer:
-                        entry_dict['customer'] = None
-
-                db_entry = TimeEntry(**entry_dict)
+                db_entry = TimeEntry(**self.with_reference_ids(db, entry_dict))
 
+            CalendarRepository().ensure_dates(db, [db_entry.date])
             db.add(db_entry)
-            db.commit()
-            db.refresh(db_entry)
+            self._commit(db)
             logger.info(f"Successfully created time entry: {db_entry.id}")
             return db_entry
         except Exception as e:
             logger.error(f"Error creating time entry: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def bulk_create(self, db: Session, entries: List[schemas.TimeEntryCreate]) -> List[TimeEntry]:
-        """Bulk create time entries with better error handling."""
+        """Bulk create time entries through the COPY-based bulk loader."""
         try:
-            from services.time_entry_service import TimeEntryService
-            service = TimeEntryService(db)
-
-            db_entries = []
-            for entry in entries:
-                try:
-                    db_entry = service.create_time_entry(entry)
-                    db_entries.append(db_entry)
-                except Exception as e:
-                    logger.error(f"Error creating entry: {str(e)}")
-                    continue
+            result = TimeEntryBulkLoader(db).load(entries)
+            for reject in result["rejected"]:
+                logger.warning(f"Rejected entry {reject['row']} ({reject['column']}): {reject['reason']}")
 
-            return db_entries
+            if not result["ids"]:
+                return []
+            return self.load_references(db.query(self.model)).filter(
+                self.model.id.in_(result["ids"])
+            ).order_by(self.model.id).all()
         except Exception as e:
             logger.error(f"Error in bulk create: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def update(self, db: Session, item: TimeEntry) -> TimeEntry:
         """Update with better error handling."""
         try:
-            # Validate foreign keys
-            if item.project:
-                project = db.query(Project).filter(
-                    Project.project_id == item.project
-                ).first()
-                if not project:
-                    item.project = None
-
-            if item.customer:
-                customer = db.query(Customer).filter(
-                    Customer.name == item.customer
-                ).first()
-                if not customer:
-                    item.customer = None
-
+            CalendarRepository().ensure_dates(db, [item.date])
             db.merge(item)
-            db.commit()
-            db.refresh(item)
+            self._commit(db)
             logger.info(f"Successfully updated time entry: {item.id}")
             return item
         except Exception as e:
             logger.error(f"Error updating time entry: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
     def get_by_id(self, db: Session, id: int) -> Optional[TimeEntry]:
@@ -118,21 +179,36 @@ class TimeEntryRepository(BaseRepository[TimeEntry]):
             logger.error(f"Error getting time entry by ID {id}: {str(e)}")
             raise
 
+    @staticmethod
+    def load_references(query: Any) -> Any:
+        """Load the customer and project of the entries a query lists in the same query."""
+        return query.options(joinedload(TimeEntry.customer_ref), joinedload(TimeEntry.project_ref))
+
+    def reference_criterion(self, db: Session, field: str, value: str) -> Any:
+        """SQL condition matching entries whose customer or project is value."""
+        customers, projects = ([value], []) if field == 'customer' else ([], [value])
+        reference_id = self.resolve_references(db, customers, projects)[field].get(value)
+        if reference_id is None:
+            return sa.false()
+        return getattr(self.model, self.REFERENCE_COLUMNS[field]) == reference_id
+
     def get_by_date(self, db: Session, entry_date: date) -> List[TimeEntry]:
         """Get all time entries for a specific date."""
-        return db.query(self.model).filter(self.model.date == entry_date).all()
+        return self.load_references(db.query(self.model)).filter(self.model.date == entry_date).all()
 
     def get_by_project(self, db: Session, project_id: str) -> List[TimeEntry]:
         """Get all time entries for a specific project."""
-        return db.query(self.model).filter(self.model.project == project_id).all()
+        criterion = self.reference_criterion(db, 'project', project_id)
+        return self.load_references(db.query(self.model)).filter(criterion).all()
 
     def get_by_customer(self, db: Session, customer_name: str) -> List[TimeEntry]:
         """Get all time entries for a specific customer."""
-        return db.query(self.model).filter(self.model.customer == customer_name).all()
+        criterion = self.reference_criterion(db, 'customer', customer_name)
+        return self.load_references(db.query(self.model)).filter(criterion).all()
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[TimeEntry]:
         """Get all time entries with pagination."""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.load_references(db.query(self.model)).offset(skip).limit(limit).all()
 
     def delete(self, db: Session, id: int) -> bool:
         """Delete with proper error handling."""
@@ -140,55 +216,56 @@ class TimeEntryRepository(BaseRepository[TimeEntry]):
             entry = self.get_by_id(db, id)
             if entry:
                 db.delete(entry)
-                db.commit()
+                self._commit(db)
                 logger.info(f"Successfully deleted time entry: {id}")
                 return True
             logger.warning(f"Time entry not found for deletion: {id}")
             return False
         except Exception as e:
             logger.error(f"Error deleting time entry: {str(e)}")
-            db.rollback()
+            self._rollback(db)
             raise
 
-    def import_excel(self, db: Session, file_contents: bytes) -> List[TimeEntry]:
-        """Import time entries with better validation."""
+    def import_excel(self, db: Session, file_contents: ExcelSource) -> List[TimeEntry]:
+        """Import time entries with better validation.
+
+        The workbook is streamed in batches and each batch is written before the
+        next one is parsed, so only one batch of records is held at a time.
+        Rows failing FrameValidator are logged and skipped.
+        """
         try:
             analyzer = XLSAnalyzer()
-            records = analyzer.read_excel(file_contents)
-
-            entries = []
-            for record in records:
-                if not pd.isna(record.get('Date')):
-                    customer = normalize_customer_name(record.get('Customer'))
-                    project = normalize_project_id(record.get('Project'))
-
-                    # Validate foreign keys
-                    if customer:
-                        customer_exists = db.query(Customer).filter(
-                            Customer.name == customer
-                        ).first()
-                        if not customer_exists:
-                            customer = None
-
-                    if project:
-                        project_exists = db.query(Project).filter(
-                            Project.project_id == project
-                        ).first()
-                        if not project_exists:
-                            project = None
-
-                    entry_data = schemas.TimeEntryCreate(
-                        date=record.get('Date'),
-                        category=record.get('Category', 'Other'),
-                        subcategory=record.get('Subcategory', 'General'),
-                        customer=customer,
-                        project=project,
-                        task_description=record.get('Task Description', ''),
-                        hours=float(record.get('Hours', 0.0))
+            created_entries = []
+
+            for raw in analyzer.iter_raw_frames(file_contents):
+                frame, rejects = FrameValidator.validate(raw)
+                if not rejects.empty:
+                    logger.warning(
+                        f"Rejected {rejects['row'].nunique()} rows: "
+                        f"{FrameValidator.summarize(FrameValidator.to_records(rejects))}"
                     )
-                    entries.append(entry_data)
+                frame = analyzer.clean_frame(frame)
+                if frame.empty:
+                    continue
+
+                entries = [
+                    {
+                        'date': record.get('Date'),
+                        'category': record.get('Category') or 'Other',
+                        'subcategory': record.get('Subcategory') or 'General',
+                        'customer': normalize_customer_name(record.get('Customer')),
+                        'project': normalize_project_id(record.get('Project')),
+                        'task_description': record.get('Task Description') or '',
+                        'hours': float(record.get('Hours', 0.0))
+                    }
+                    for record in analyzer.frame_to_records(frame)
+                ]
 
-            return self.bulk_create(db, entries)
+                # FrameValidator has checked dates and hours, so entries skip pydantic validation.
+                # The bulk loader resolves the names to ids and stores unknown references as NULL.
+                created_entries.extend(self.bulk_create(db, schemas.construct_time_entries(entries)))
+
+            return created_entries
         except Exception as e:
             logger.error(f"Error importing Excel data: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,84 @@
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+_SESSION_KEY = 'unit_of_work'
+
+class UnitOfWork:
+    """One transaction around a service operation.
+
+    While a unit of work is open on a session, repositories flush their
+    changes instead of committing them. The unit of work commits once when
+    the block exits and rolls everything back when it raises, so operations
+    touching several entities are atomic. A unit of work opened inside
+    another one on the same session joins it, and only the outermost
+    commits. Callbacks registered with after_commit run once the commit has
+    succeeded and are dropped on rollback. The commit keeps loaded objects
+    as they are; see commit.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._outer: Optional['UnitOfWork'] = None
+        self._callbacks: List[Callable[[], None]] = []
+
+    def __enter__(self) -> 'UnitOfWork':
+        self._outer = current_unit_of_work(self.db)
+        if self._outer is None:
+            self.db.info[_SESSION_KEY] = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._outer is not None:
+            return False
+
+        try:
+            if exc_type is None:
+                commit(self.db)
+            else:
+                logger.debug(f"Rolling back unit of work: {exc}")
+                self.db.rollback()
+        except Exception as e:
+            logger.error(f"Error committing unit of work: {str(e)}")
+            self.db.rollback()
+            raise
+        finally:
+            self.db.info.pop(_SESSION_KEY, None)
+            callbacks, self._callbacks = self._callbacks, []
+
+        if exc_type is None:
+            for callback in callbacks:
+                callback()
+        return False
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the outermost unit of work has committed."""
+        (self._outer or self)._callbacks.append(callback)
+
+def commit(db: Session) -> None:
+    """Commit without expiring the objects loaded in the session.
+
+    Writes load their rows back through RETURNING, so the objects already
+    hold what the database stored and reading them after the commit needs no
+    SELECT.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+def current_unit_of_work(db: Session) -> Optional[UnitOfWork]:
+    """The unit of work open on the session, if any."""
+    return db.info.get(_SESSION_KEY)
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Run callback after the session's unit of work commits, or now when none is open."""
+    unit_of_work = current_unit_of_work(db)
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work.after_commit(callback)
@@ -0,0 +1,78 @@
+from typing import Optional, Dict, Any
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.uploadCheckpointModel import UploadCheckpoint
+from .base_repository import BaseRepository
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+class UploadCheckpointRepository(BaseRepository[UploadCheckpoint]):
+    """Chunk checkpoints of upload jobs.
+
+    Checkpoints are added to the session that loads the chunk and committed
+    with its rows, so a checkpoint exists exactly when its chunk was stored.
+    Single-sheet and CSV uploads are checkpointed under the empty sheet name.
+    """
+
+    def __init__(self):
+        super().__init__(UploadCheckpoint)
+        logger.debug("UploadCheckpointRepository initialized")
+
+    def add(
+        self,
+        db: Session,
+        progress_key: str,
+        chunk_index: int,
+        first_row: int,
+        last_row: int,
+        processed: int,
+        rejected: int = 0,
+        duplicates: int = 0,
+        sheet: Optional[str] = None,
+        end_line: Optional[int] = None
+    ) -> UploadCheckpoint:
+        """Add a chunk checkpoint without committing; the caller commits it with the chunk."""
+        checkpoint = self.model(
+            progress_key=progress_key,
+            sheet=sheet or '',
+            chunk_index=chunk_index,
+            first_row=first_row,
+            last_row=last_row,
+            end_line=end_line,
+            rows_processed=processed,
+            rows_rejected=rejected,
+            rows_duplicate=duplicates
+        )
+        db.add(checkpoint)
+        db.flush()
+        return checkpoint
+
+    def resume_points(self, db: Session, progress_key: str) -> Dict[Optional[str], Dict[str, Any]]:
+        """Return where each worksheet of a job resumes, keyed by sheet (None for single-sheet uploads).
+
+        Each entry holds the next chunk index, the first row still to load,
+        the CSV lines read before it (None for Excel) and the counters of the
+        committed chunks.
+        """
+        rows = db.query(
+            self.model.sheet,
+            func.max(self.model.chunk_index).label('chunk_index'),
+            func.max(self.model.last_row).label('last_row'),
+            func.max(self.model.end_line).label('end_line'),
+            func.sum(self.model.rows_processed).label('rows_processed'),
+            func.sum(self.model.rows_rejected).label('rows_rejected'),
+            func.sum(self.model.rows_duplicate).label('rows_duplicate')
+        ).filter(self.model.progress_key == progress_key).group_by(self.model.sheet).all()
+
+        return {
+            (row.sheet or None): {
+                'chunk_index': row.chunk_index + 1,
+                'start_row': row.last_row + 1,
+                'start_line': row.end_line,
+                'rows_processed': int(row.rows_processed),
+                'rows_rejected': int(row.rows_rejected),
+                'rows_duplicate': int(row.rows_duplicate)
+            }
+            for row in rows
+        }
@@ -0,0 +1,306 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, Callable
+from datetime import datetime, timezone
+import os
+import threading
+from sqlalchemy.orm import Session
+from models.uploadJobModel import UploadJob
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+JOB_FIELDS = (
+    'progress_key', 'filename', 'file_hash', 'state', 'total_rows',
+    'rows_processed', 'rows_rejected', 'rows_duplicate', 'rows_per_second',
+    'elapsed_seconds', 'eta_seconds', 'error', 'started_at', 'finished_at', 'sheets'
+)
+
+class UploadJobStore(ABC):
+    """Store for upload job progress.
+
+    Implementations only persist job dictionaries; the state transitions and
+    throughput, elapsed time and ETA calculations are shared here so every
+    backend reports the same numbers.
+    """
+
+    @abstractmethod
+    def _insert(self, job: Dict[str, Any]) -> None:
+        """Persist a new job."""
+
+    @abstractmethod
+    def _update(self, progress_key: str, changes: Dict[str, Any]) -> None:
+        """Apply field changes to an existing job."""
+
+    @abstractmethod
+    def get(self, progress_key: str) -> Optional[Dict[str, Any]]:
+        """Return the job for a progress key, or None if it is unknown."""
+
+    @abstractmethod
+    def find_completed(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a completed job for a file hash, or None if the file is new."""
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _metrics(job: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Calculate elapsed time, throughput and ETA from the job counters."""
+        elapsed = max((now - job['started_at']).total_seconds(), 0.0)
+        done = job['rows_processed'] + job['rows_rejected'] + job['rows_duplicate']
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(job['total_rows'] - done, 0)
+        if remaining == 0:
+            eta = 0.0
+        elif rate > 0:
+            eta = remaining / rate
+        else:
+            eta = None
+        return {'elapsed_seconds': elapsed, 'rows_per_second': rate, 'eta_seconds': eta}
+
+    def create(
+        self,
+        progress_key: str,
+        total_rows: int,
+        filename: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        sheets: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Register a queued job; the clock starts when the job is created.
+
+        sheets maps worksheet names to their row counts for multi-sheet uploads,
+        which then also track progress per worksheet.
+        """
+        job = {
+            'progress_key': progress_key,
+            'filename': filename,
+            'file_hash': file_hash,
+            'state': 'queued',
+            'total_rows': total_rows,
+            'rows_processed': 0,
+            'rows_rejected': 0,
+            'rows_duplicate': 0,
+            'rows_per_second': 0.0,
+            'elapsed_seconds': 0.0,
+            'eta_seconds': None,
+            'error': None,
+            'started_at': self._now(),
+            'finished_at': None,
+            'sheets': None if sheets is None else {
+                name: {'total_rows': rows, 'rows_processed': 0, 'rows_rejected': 0, 'rows_duplicate': 0}
+                for name, rows in sheets.items()
+            }
+        }
+        self._insert(job)
+        logger.info(f"Created upload job {progress_key} for {total_rows} rows")
+        return job
+
+    def record_chunk(
+        self,
+        progress_key: str,
+        processed: int,
+        rejected: int = 0,
+        duplicates: int = 0,
+        sheet: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Add a processed chunk to the job counters and refresh its metrics.
+
+        sheet names the worksheet the chunk came from for multi-sheet uploads.
+        """
+        job = self.get(progress_key)
+        if job is None:
+            logger.warning(f"Upload job {progress_key} not found")
+            return None
+        job['state'] = 'processing'
+        job['rows_processed'] += processed
+        job['rows_rejected'] += rejected
+        job['rows_duplicate'] += duplicates
+        if sheet is not None and job['sheets'] and sheet in job['sheets']:
+            # Replace rather than mutate so stored copies are never shared
+            counters = dict(job['sheets'][sheet])
+            counters['rows_processed'] += processed
+            counters['rows_rejected'] += rejected
+            counters['rows_duplicate'] += duplicates
+            job['sheets'] = {**job['sheets'], sheet: counters}
+        job.update(self._metrics(job, self._now()))
+        self._update(progress_key, job)
+        logger.info(
+            f"Upload progress {progress_key}: {job['rows_processed']} processed, "
+            f"{job['rows_rejected']} rejected, {job['rows_duplicate']} duplicates, "
+            f"{job['rows_per_second']:.1f} rows/s"
+        )
+        return job
+
+    def resume(
+        self,
+        progress_key: str,
+        processed: int,
+        rejected: int = 0,
+        duplicates: int = 0,
+        sheets: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Queue an interrupted job again with its counters reset to the committed chunks.
+
+        Counters recorded after the last checkpoint may belong to chunks that
+        were rolled back, so they are replaced rather than kept. sheets maps
+        worksheet names to their committed counters for multi-sheet uploads.
+        """
+        job = self.get(progress_key)
+        if job is None:
+            logger.warning(f"Upload job {progress_key} not found")
+            return None
+        job.update({
+            'state': 'queued',
+            'rows_processed': processed,
+            'rows_rejected': rejected,
+            'rows_duplicate': duplicates,
+            'error': None,
+            'finished_at': None
+        })
+        if job['sheets']:
+            empty = {'rows_processed': 0, 'rows_rejected': 0, 'rows_duplicate': 0}
+            job['sheets'] = {
+                name: {**counters, **(sheets or {}).get(name, empty)}
+                for name, counters in job['sheets'].items()
+            }
+        job.update(self._metrics(job, self._now()))
+        self._update(progress_key, job)
+        logger.info(f"Resuming upload job {progress_key} after {processed + rejected + duplicates} committed rows")
+        return job
+
+    def _finish(self, progress_key: str, state: str, error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        job = self.get(progress_key)
+        if job is None:
+            logger.warning(f"Upload job {progress_key} not found")
+            return None
+        now = self._now()
+        job.update(self._metrics(job, now))
+        job.update({
+            'state': state,
+            'error': error,
+            'finished_at': now,
+            'eta_seconds': 0.0 if state == 'completed' else None
+        })
+        self._update(progress_key, job)
+        return job
+
+    def complete(self, progress_key: str) -> Optional[Dict[str, Any]]:
+        """Mark a job as completed."""
+        logger.info(f"Upload job {progress_key} completed")
+        return self._finish(progress_key, 'completed')
+
+    def fail(self, progress_key: str, error: str) -> Optional[Dict[str, Any]]:
+        """Mark a job as failed with the error message."""
+        logger.error(f"Upload job {progress_key} failed: {error}")
+        return self._finish(progress_key, 'failed', error)
+
+class InMemoryUploadJobStore(UploadJobStore):
+    """Process-local job store, suitable for a single worker and tests."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _insert(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job['progress_key']] = dict(job)
+
+    def _update(self, progress_key: str, changes: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[progress_key].update(changes)
+
+    def get(self, progress_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(progress_key)
+            return dict(job) if job else None
+
+    def find_completed(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job['file_hash'] == file_hash and job['state'] == 'completed':
+                    return dict(job)
+            return None
+
+class DatabaseUploadJobStore(UploadJobStore):
+    """Job store backed by the upload_jobs table, shared by all workers.
+
+    Each operation uses its own short session so progress is committed
+    independently of the ingestion transaction.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        if session_factory is None:
+            from database.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _to_dict(job: UploadJob) -> Dict[str, Any]:
+        return {field: getattr(job, field) for field in JOB_FIELDS}
+
+    def _insert(self, job: Dict[str, Any]) -> None:
+        db = self.session_factory()
+        try:
+            db.add(UploadJob(**job))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error creating upload job: {str(e)}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _update(self, progress_key: str, changes: Dict[str, Any]) -> None:
+        db = self.session_factory()
+        try:
+            values = {field: changes[field] for field in JOB_FIELDS if field in changes and field != 'progress_key'}
+            values['updated_at'] = self._now()
+            db.query(UploadJob).filter(UploadJob.progress_key == progress_key).update(values)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error updating upload job {progress_key}: {str(e)}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get(self, progress_key: str) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            job = db.query(UploadJob).filter(UploadJob.progress_key == progress_key).first()
+            return self._to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def find_completed(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            job = db.query(UploadJob).filter(
+                UploadJob.file_hash == file_hash,
+                UploadJob.state == 'completed'
+            ).order_by(UploadJob.id).first()
+            return self._to_dict(job) if job else None
+        finally:
+            db.close()
+
+_store: Optional[UploadJobStore] = None
+_store_lock = threading.Lock()
+
+def get_upload_job_store() -> UploadJobStore:
+    """Return the configured job store.
+
+    UPLOAD_JOB_STORE selects the backend: ``database`` (default) shares progress
+    across workers, ``memory`` keeps it in the current process.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.environ.get('UPLOAD_JOB_STORE', 'database').lower()
+            if backend == 'memory':
+                _store = InMemoryUploadJobStore()
+            elif backend == 'database':
+                _store = DatabaseUploadJobStore()
+            else:
+                raise ValueError(f"Unknown upload job store: {backend}")
+            logger.info(f"Using {backend} upload job store")
+        return _store
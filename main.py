@@ -1,12 +1,15 @@
 from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Query, Request, BackgroundTasks, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, date
+import json
 import os
 import traceback
 from database import crud, schemas, get_db
+from database.reference_cache import get_reference_cache
 from services.timesheet_service import TimesheetService
 from services.customer_service import CustomerService
 from services.project_service import ProjectService
@@ -15,8 +18,10 @@ from services.database_service import DatabaseService
 from services.time_entry_service import TimeEntryService
 from services.report_service import ReportService
 from utils.logger import Logger
-from utils.middleware import logging_middleware, error_logging_middleware
+from utils.middleware import logging_middleware, error_logging_middleware, upload_size_middleware
 from utils.structured_log import structured_log
+from utils.upload_spool import read_body, spool_upload, UploadTooLargeError
+from utils.utils import parse_json_lines
 
 # Initialize logger
 logger = Logger().get_logger()
@@ -38,6 +43,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized request bodies before they are received
+app.middleware("http")(upload_size_middleware)
+
 # Basic root endpoint for testing
 @app.get("/")
 async def root():
@@ -81,6 +89,18 @@ async def debug_database(request: Request, db: Session = Depends(get_db)):
         "version": connection_info[4]
     })
 
+@app.get("/debug/cache", include_in_schema=False)
+async def debug_cache(request: Request):
+    """Debug endpoint reporting reference cache sizes and hit/miss counters"""
+    logger.info(structured_log(
+        "Cache debug endpoint accessed",
+        correlation_id=Logger().get_correlation_id(),
+        method=request.method,
+        path="/debug/cache"
+    ))
+
+    return JSONResponse(content=get_reference_cache().stats())
+
 @app.get("/time-entries", response_model=List[schemas.TimeEntry])
 def get_time_entries(
     date: date = Query(default=None),
@@ -98,6 +118,66 @@ def create_time_entry(entry: schemas.TimeEntryCreate, db: Session = Depends(get_
     service = TimesheetService(db)
     return service.create_entry(entry)
 
+@app.post("/time-entries/bulk")
+async def bulk_create_time_entries(request: Request, db: Session = Depends(get_db)):
+    """Create many time entries from a JSON array or an NDJSON body, in one transaction"""
+    try:
+        body = await read_body(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # Parsing and the database work are blocking, so they run off the event loop
+    return await run_in_threadpool(_bulk_create_from_body, db, body, request.headers.get('content-type', ''))
+
+def _bulk_create_from_body(db: Session, body: bytes, content_type: str):
+    """Parse a bulk create body and create its time entries"""
+    try:
+        text = body.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Request body is not valid UTF-8: {str(e)}")
+
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        rows, parse_errors = parse_json_lines(text)
+    else:
+        try:
+            rows = json.loads(text)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=422, detail="Request body must be a list of time entries")
+        parse_errors = {}
+
+    try:
+        service = TimeEntryService(db)
+        return service.create_entries_bulk(rows, parse_errors)
+    except Exception as e:
+        logger.error(f"Error bulk creating time entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.patch("/time-entries")
+def bulk_update_time_entries(update: schemas.TimeEntryBulkUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to every time entry matching a filter or id list"""
+    try:
+        service = TimeEntryService(db)
+        return {"updated": service.bulk_update(update.filter, update.changes)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error bulk updating time entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.delete("/time-entries")
+def bulk_delete_time_entries(entry_filter: schemas.TimeEntryFilter, db: Session = Depends(get_db)):
+    """Delete every time entry matching a filter or id list"""
+    try:
+        service = TimeEntryService(db)
+        return {"deleted": service.bulk_delete(entry_filter)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error bulk deleting time entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/time-entries/{entry_id}", response_model=schemas.TimeEntry)
 def get_time_entry(entry_id: int, db: Session = Depends(get_db)):
     """Get a specific time entry by ID"""
@@ -119,6 +199,8 @@ def update_time_entry(
         if not updated_entry:
             raise HTTPException(status_code=404, detail="Time entry not found")
         return updated_entry
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
@@ -133,6 +215,8 @@ def delete_time_entry(entry_id: int, db: Session = Depends(get_db)):
         if not service.delete_entry(entry_id):
             raise HTTPException(status_code=404, detail="Time entry not found")
         return None
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting time entry {entry_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -271,6 +355,9 @@ def get_customer(name: str, db: Session = Depends(get_db)):
 @app.post("/time-entries/upload/")
 async def upload_timesheet(
     file: UploadFile = File(...),
+    sheets: Optional[List[str]] = Query(None, description="Worksheets to ingest; defaults to the first"),
+    all_sheets: bool = Query(False, description="Ingest every worksheet"),
+    dry_run: bool = Query(False, description="Preview the import without writing to the database"),
     background_tasks: BackgroundTasks = None,
     db: Session = Depends(get_db)
 ):
@@ -280,25 +367,23 @@ async def upload_timesheet(
     if not file or not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
-    # Check file size (10MB limit)
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    file_size = 0
-    contents = await file.read()
-    file_size = len(contents)
-
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
-
-    if file_size == 0:
-        raise HTTPException(status_code=400, detail="File is empty")
-
-    # Check file extension
+    # Check file extension before reading the body
     if not file.filename.lower().endswith('.xlsx'):
         raise HTTPException(
             status_code=400,
             detail="Only Excel (.xlsx) files are supported"
         )
 
+    # Size-check and hash the upload in the temp file it was received into
+    try:
+        spooled, file_size, file_hash = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if file_size == 0:
+        spooled.close()
+        raise HTTPException(status_code=400, detail="File is empty")
+
     # Accept both standard Excel content types
     allowed_content_types = {
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -313,33 +398,133 @@ async def upload_timesheet(
 
     try:
         service = TimeEntryService(db)
-        result = await service.process_excel_upload(contents, background_tasks)
+        result = await service.process_excel_upload(
+            spooled,
+            background_tasks,
+            filename=file.filename,
+            file_hash=file_hash,
+            sheets=sheets,
+            all_sheets=all_sheets,
+            dry_run=dry_run
+        )
+        # Background tasks run in order, so the spool is closed after processing
+        background_tasks.add_task(spooled.close)
 
+        if dry_run:
+            return JSONResponse(status_code=200, content=result)
+
+        # Re-uploads of an imported file complete immediately
         return JSONResponse(
-            status_code=202,  # Accepted
+            status_code=200 if result["duplicate"] else 202,
             content={
-                "message": "Upload processing started",
+                "message": result["message"],
                 "progress_key": result["progress_key"],
                 "total_records": result["total_records"]
             }
         )
     except HTTPException:
+        spooled.close()
         raise
     except Exception as e:
+        spooled.close()
         logger.error(f"Error processing timesheet: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/time-entries/upload/{progress_key}/status")
-async def get_upload_status(progress_key: str):
-    """Get the status of an ongoing upload"""
-    # In a real implementation, this would fetch progress from Redis or similar
-    # For now, we'll return a mock response
-    return JSONResponse(
-        content={
-            "status": "processing",
-            "progress": 50  # This would be the actual progress in a real implementation
-        }
-    )
+@app.post("/time-entries/upload-csv")
+async def upload_timesheet_csv(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Preview the import without writing to the database"),
+    background_tasks: BackgroundTasks = None,
+    db: Session = Depends(get_db)
+):
+    """Upload and process a CSV timesheet with progress tracking"""
+    logger.info(f"Processing CSV timesheet upload: {file.filename}")
+
+    if not file or not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    if not file.filename.lower().endswith(('.csv', '.tsv', '.txt')):
+        raise HTTPException(
+            status_code=400,
+            detail="Only CSV (.csv, .tsv, .txt) files are supported"
+        )
+
+    try:
+        spooled, file_size, file_hash = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if file_size == 0:
+        spooled.close()
+        raise HTTPException(status_code=400, detail="File is empty")
+
+    try:
+        service = TimeEntryService(db)
+        result = await service.process_csv_upload(
+            spooled, background_tasks, filename=file.filename, file_hash=file_hash, dry_run=dry_run
+        )
+        background_tasks.add_task(spooled.close)
+
+        if dry_run:
+            return JSONResponse(status_code=200, content=result)
+
+        # Re-uploads of an imported file complete immediately
+        return JSONResponse(
+            status_code=200 if result["duplicate"] else 202,
+            content={
+                "message": result["message"],
+                "progress_key": result["progress_key"],
+                "total_records": result["total_records"]
+            }
+        )
+    except HTTPException:
+        spooled.close()
+        raise
+    except Exception as e:
+        spooled.close()
+        logger.error(f"Error processing CSV timesheet: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/time-entries/upload/{progress_key}/status", response_model=schemas.UploadStatus)
+async def get_upload_status(progress_key: str, db: Session = Depends(get_db)):
+    """Get the status, throughput and ETA of an upload"""
+    service = TimeEntryService(db)
+    return service.get_upload_status(progress_key)
+
+@app.post("/time-entries/upload/{progress_key}/resume")
+async def resume_upload(
+    progress_key: str,
+    file: UploadFile = File(...),
+    background_tasks: BackgroundTasks = None,
+    db: Session = Depends(get_db)
+):
+    """Resume an interrupted upload from its last committed chunk"""
+    logger.info(f"Resuming upload {progress_key} with {file.filename}")
+
+    if not file or not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    try:
+        spooled, file_size, file_hash = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if file_size == 0:
+        spooled.close()
+        raise HTTPException(status_code=400, detail="File is empty")
+
+    try:
+        service = TimeEntryService(db)
+        result = await service.resume_upload(spooled, background_tasks, progress_key, file_hash=file_hash)
+        background_tasks.add_task(spooled.close)
+        return JSONResponse(status_code=202, content=result)
+    except HTTPException:
+        spooled.close()
+        raise
+    except Exception as e:
+        spooled.close()
+        logger.error(f"Error resuming upload {progress_key}: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/init-db/")
 async def initialize_database(force: bool = False, db: Session = Depends(get_db)):
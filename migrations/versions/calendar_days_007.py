@@ -0,0 +1,75 @@
+"""calendar days dimension
+
+Revision ID: calendar_days_007
+Revises: upload_checkpoints_006
+Create Date: 2025-02-24 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'calendar_days_007'
+down_revision: Union[str, None] = 'upload_checkpoints_006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create and fill the calendar_days table used to derive weeks and months"""
+    try:
+        logger.info("Creating calendar_days table")
+        op.create_table('calendar_days',
+            sa.Column('date', sa.Date(), primary_key=True, nullable=False),
+            sa.Column('iso_year', sa.Integer(), nullable=False),
+            sa.Column('iso_week', sa.Integer(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('month_name', sa.String(), nullable=False),
+            sa.Column('quarter', sa.Integer(), nullable=False),
+            sa.Column('fiscal_year', sa.Integer(), nullable=False),
+            sa.Column('fiscal_period', sa.Integer(), nullable=False),
+            sa.Column('is_workday', sa.Boolean(), nullable=False)
+        )
+        op.create_index('ix_calendar_days_iso_week', 'calendar_days', ['iso_year', 'iso_week'])
+        op.create_index('ix_calendar_days_month', 'calendar_days', ['year', 'month'])
+
+        logger.info("Filling calendar_days from 2000 to 2050")
+        # Fiscal years start in January; loads add rows for dates outside this range
+        op.execute("""
+            INSERT INTO calendar_days (
+                date, iso_year, iso_week, year, month, month_name,
+                quarter, fiscal_year, fiscal_period, is_workday
+            )
+            SELECT
+                d::date,
+                EXTRACT(ISOYEAR FROM d)::int,
+                EXTRACT(WEEK FROM d)::int,
+                EXTRACT(YEAR FROM d)::int,
+                EXTRACT(MONTH FROM d)::int,
+                to_char(d, 'FMMonth'),
+                EXTRACT(QUARTER FROM d)::int,
+                EXTRACT(YEAR FROM d)::int,
+                EXTRACT(MONTH FROM d)::int,
+                EXTRACT(ISODOW FROM d) < 6
+            FROM generate_series(DATE '2000-01-01', DATE '2050-12-31', interval '1 day') AS d
+        """)
+        logger.info("calendar_days table created successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Drop the calendar_days table"""
+    try:
+        logger.info("Dropping calendar_days table")
+        op.drop_index('ix_calendar_days_month', table_name='calendar_days')
+        op.drop_index('ix_calendar_days_iso_week', table_name='calendar_days')
+        op.drop_table('calendar_days')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
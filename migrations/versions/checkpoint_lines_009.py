@@ -0,0 +1,39 @@
+"""line offsets for upload checkpoints
+
+Revision ID: checkpoint_lines_009
+Revises: surrogate_keys_008
+Create Date: 2025-02-28 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'checkpoint_lines_009'
+down_revision: Union[str, None] = 'surrogate_keys_008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add the CSV line a resumed upload seeks to after each checkpoint"""
+    try:
+        logger.info("Adding end_line to upload_checkpoints")
+        op.add_column('upload_checkpoints', sa.Column('end_line', sa.Integer(), nullable=True))
+        logger.info("end_line added successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Drop the end_line column"""
+    try:
+        logger.info("Dropping end_line from upload_checkpoints")
+        op.drop_column('upload_checkpoints', 'end_line')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
@@ -0,0 +1,96 @@
+"""integer foreign keys for customers and projects
+
+Revision ID: surrogate_keys_008
+Revises: calendar_days_007
+Create Date: 2025-02-26 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'surrogate_keys_008'
+down_revision: Union[str, None] = 'calendar_days_007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Replace the customer name and project_id string references with integer ids"""
+    try:
+        logger.info("Adding integer reference columns")
+        op.add_column('projects', sa.Column('customer_id', sa.Integer(), nullable=True))
+        op.add_column('time_entries', sa.Column('customer_id', sa.Integer(), nullable=True))
+        op.add_column('time_entries', sa.Column('project_id', sa.Integer(), nullable=True))
+
+        logger.info("Filling reference ids from the string references")
+        op.execute("""
+            UPDATE projects p SET customer_id = c.id
+            FROM customers c WHERE c.name = p.customer
+        """)
+        op.execute("""
+            UPDATE time_entries t SET customer_id = c.id
+            FROM customers c WHERE c.name = t.customer
+        """)
+        op.execute("""
+            UPDATE time_entries t SET project_id = p.id
+            FROM projects p WHERE p.project_id = t.project
+        """)
+
+        logger.info("Creating foreign keys and indexes on the reference ids")
+        op.create_foreign_key('projects_customer_id_fkey', 'projects', 'customers', ['customer_id'], ['id'], ondelete='SET NULL')
+        op.create_foreign_key('time_entries_customer_id_fkey', 'time_entries', 'customers', ['customer_id'], ['id'], ondelete='SET NULL')
+        op.create_foreign_key('time_entries_project_id_fkey', 'time_entries', 'projects', ['project_id'], ['id'], ondelete='SET NULL')
+        op.create_index('ix_projects_customer_id', 'projects', ['customer_id'])
+        op.create_index('ix_time_entries_customer_id', 'time_entries', ['customer_id'])
+        op.create_index('ix_time_entries_project_id', 'time_entries', ['project_id'])
+
+        # Dropping the columns drops their foreign keys to customers.name and projects.project_id
+        logger.info("Dropping string reference columns")
+        op.drop_column('time_entries', 'project')
+        op.drop_column('time_entries', 'customer')
+        op.drop_column('projects', 'customer')
+        logger.info("Integer reference columns created successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Restore the string references from the integer ids"""
+    try:
+        logger.info("Restoring string reference columns")
+        op.add_column('projects', sa.Column('customer', sa.String(), nullable=True))
+        op.add_column('time_entries', sa.Column('customer', sa.String(), nullable=True))
+        op.add_column('time_entries', sa.Column('project', sa.String(), nullable=True))
+
+        op.execute("""
+            UPDATE projects p SET customer = c.name
+            FROM customers c WHERE c.id = p.customer_id
+        """)
+        op.execute("""
+            UPDATE time_entries t SET customer = c.name
+            FROM customers c WHERE c.id = t.customer_id
+        """)
+        op.execute("""
+            UPDATE time_entries t SET project = p.project_id
+            FROM projects p WHERE p.id = t.project_id
+        """)
+
+        op.create_foreign_key('projects_customer_fkey', 'projects', 'customers', ['customer'], ['name'], ondelete='SET NULL')
+        op.create_foreign_key('time_entries_customer_fkey', 'time_entries', 'customers', ['customer'], ['name'], ondelete='SET NULL')
+        op.create_foreign_key('time_entries_project_fkey', 'time_entries', 'projects', ['project'], ['project_id'], ondelete='SET NULL')
+
+        logger.info("Dropping integer reference columns")
+        op.drop_index('ix_time_entries_project_id', table_name='time_entries')
+        op.drop_index('ix_time_entries_customer_id', table_name='time_entries')
+        op.drop_index('ix_projects_customer_id', table_name='projects')
+        op.drop_column('time_entries', 'project_id')
+        op.drop_column('time_entries', 'customer_id')
+        op.drop_column('projects', 'customer_id')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
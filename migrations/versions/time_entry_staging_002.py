@@ -0,0 +1,52 @@
+"""time entry staging table
+
+Revision ID: time_entry_staging_002
+Revises: base_migration_001
+Create Date: 2025-02-14 10:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'time_entry_staging_002'
+down_revision: Union[str, None] = 'base_migration_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create the unlogged staging table used by the COPY bulk loader"""
+    try:
+        logger.info("Creating time_entry_staging table")
+        op.create_table('time_entry_staging',
+            sa.Column('load_id', sa.Text(), nullable=False),
+            sa.Column('row_number', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=True),
+            sa.Column('category', sa.Text(), nullable=True),
+            sa.Column('subcategory', sa.Text(), nullable=True),
+            sa.Column('customer', sa.Text(), nullable=True),
+            sa.Column('project', sa.Text(), nullable=True),
+            sa.Column('task_description', sa.Text(), nullable=True),
+            sa.Column('hours', sa.Float(), nullable=True),
+            prefixes=['UNLOGGED']
+        )
+        op.create_index('ix_time_entry_staging_load_id', 'time_entry_staging', ['load_id'])
+        logger.info("time_entry_staging table created successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Drop the staging table"""
+    try:
+        logger.info("Dropping time_entry_staging table")
+        op.drop_index('ix_time_entry_staging_load_id', table_name='time_entry_staging')
+        op.drop_table('time_entry_staging')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
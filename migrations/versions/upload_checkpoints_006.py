@@ -0,0 +1,54 @@
+"""upload chunk checkpoints
+
+Revision ID: upload_checkpoints_006
+Revises: upload_sheets_005
+Create Date: 2025-02-20 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'upload_checkpoints_006'
+down_revision: Union[str, None] = 'upload_sheets_005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create the upload_checkpoints table used to resume interrupted uploads"""
+    try:
+        logger.info("Creating upload_checkpoints table")
+        op.create_table('upload_checkpoints',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True, nullable=False, index=True),
+            sa.Column('progress_key', sa.String(), nullable=False),
+            sa.Column('sheet', sa.String(), server_default=sa.text("''"), nullable=False),
+            sa.Column('chunk_index', sa.Integer(), nullable=False),
+            sa.Column('first_row', sa.Integer(), nullable=False),
+            sa.Column('last_row', sa.Integer(), nullable=False),
+            sa.Column('rows_processed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('rows_rejected', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('rows_duplicate', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.UniqueConstraint('progress_key', 'sheet', 'chunk_index', name='uq_upload_checkpoints_chunk')
+        )
+        op.create_index(op.f('ix_upload_checkpoints_progress_key'), 'upload_checkpoints', ['progress_key'])
+        logger.info("upload_checkpoints table created successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Drop the upload_checkpoints table"""
+    try:
+        logger.info("Dropping upload_checkpoints table")
+        op.drop_index(op.f('ix_upload_checkpoints_progress_key'), table_name='upload_checkpoints')
+        op.drop_table('upload_checkpoints')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
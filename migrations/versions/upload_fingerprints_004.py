@@ -0,0 +1,49 @@
+"""upload and row fingerprints
+
+Revision ID: upload_fingerprints_004
+Revises: upload_jobs_003
+Create Date: 2025-02-18 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'upload_fingerprints_004'
+down_revision: Union[str, None] = 'upload_jobs_003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add row fingerprints to time_entries and file hashes to upload_jobs"""
+    try:
+        logger.info("Adding fingerprint column to time_entries")
+        op.add_column('time_entries', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+        op.create_index('ix_time_entries_fingerprint', 'time_entries', ['fingerprint'], unique=True)
+
+        logger.info("Adding file hash and duplicate count to upload_jobs")
+        op.add_column('upload_jobs', sa.Column('file_hash', sa.String(length=64), nullable=True))
+        op.add_column('upload_jobs', sa.Column('rows_duplicate', sa.Integer(), server_default=sa.text('0'), nullable=False))
+        op.create_index('ix_upload_jobs_file_hash', 'upload_jobs', ['file_hash'], unique=False)
+        logger.info("Fingerprint columns added successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Remove the fingerprint columns"""
+    try:
+        logger.info("Removing fingerprint columns")
+        op.drop_index('ix_upload_jobs_file_hash', table_name='upload_jobs')
+        op.drop_column('upload_jobs', 'rows_duplicate')
+        op.drop_column('upload_jobs', 'file_hash')
+        op.drop_index('ix_time_entries_fingerprint', table_name='time_entries')
+        op.drop_column('time_entries', 'fingerprint')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
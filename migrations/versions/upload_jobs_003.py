@@ -0,0 +1,57 @@
+"""upload jobs table
+
+Revision ID: upload_jobs_003
+Revises: time_entry_staging_002
+Create Date: 2025-02-17 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'upload_jobs_003'
+down_revision: Union[str, None] = 'time_entry_staging_002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create the upload_jobs table used to track upload progress"""
+    try:
+        logger.info("Creating upload_jobs table")
+        op.create_table('upload_jobs',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True, nullable=False, index=True),
+            sa.Column('progress_key', sa.String(), nullable=False),
+            sa.Column('filename', sa.String(), nullable=True),
+            sa.Column('state', sa.String(), server_default=sa.text("'queued'"), nullable=False),
+            sa.Column('total_rows', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('rows_processed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('rows_rejected', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('rows_per_second', sa.Float(), server_default=sa.text('0'), nullable=False),
+            sa.Column('elapsed_seconds', sa.Float(), server_default=sa.text('0'), nullable=False),
+            sa.Column('eta_seconds', sa.Float(), nullable=True),
+            sa.Column('error', sa.String(), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True)
+        )
+        op.create_index(op.f('ix_upload_jobs_progress_key'), 'upload_jobs', ['progress_key'], unique=True)
+        logger.info("upload_jobs table created successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Drop the upload_jobs table"""
+    try:
+        logger.info("Dropping upload_jobs table")
+        op.drop_index(op.f('ix_upload_jobs_progress_key'), table_name='upload_jobs')
+        op.drop_table('upload_jobs')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
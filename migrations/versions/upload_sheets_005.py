@@ -0,0 +1,39 @@
+"""per-sheet upload progress
+
+Revision ID: upload_sheets_005
+Revises: upload_fingerprints_004
+Create Date: 2025-02-19 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+# revision identifiers, used by Alembic.
+revision: str = 'upload_sheets_005'
+down_revision: Union[str, None] = 'upload_fingerprints_004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add per-worksheet counters to upload_jobs"""
+    try:
+        logger.info("Adding sheets column to upload_jobs")
+        op.add_column('upload_jobs', sa.Column('sheets', sa.JSON(), nullable=True))
+        logger.info("Sheets column added successfully")
+    except Exception as e:
+        logger.error(f"Error during upgrade: {str(e)}")
+        logger.exception("Upgrade error details:")
+        raise
+
+def downgrade() -> None:
+    """Remove the per-worksheet counters"""
+    try:
+        logger.info("Removing sheets column from upload_jobs")
+        op.drop_column('upload_jobs', 'sheets')
+    except Exception as e:
+        logger.error(f"Error during downgrade: {str(e)}")
+        logger.exception("Downgrade error details:")
+        raise
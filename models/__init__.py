@@ -3,6 +3,9 @@ from .customerModel import Customer
 from .projectManagerModel import ProjectManager
 from .projectModel import Project
 from .timeEntry import TimeEntry
+from .uploadJobModel import UploadJob
+from .uploadCheckpointModel import UploadCheckpoint
+from .calendarDayModel import CalendarDay
 
 # Make sure all models are imported and registered with Base
-__all__ = ['Base', 'BaseModel', 'Customer', 'ProjectManager', 'Project', 'TimeEntry']
\ No newline at end of file
+__all__ = ['Base', 'BaseModel', 'Customer', 'ProjectManager', 'Project', 'TimeEntry', 'UploadJob', 'UploadCheckpoint', 'CalendarDay']
\ No newline at end of file
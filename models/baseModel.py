@@ -1,5 +1,5 @@
-import time
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from sqlalchemy import Column, Integer
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
@@ -7,9 +7,29 @@ from sqlalchemy.types import DateTime
 
 Base = declarative_base()
 
+_clock_lock = threading.Lock()
+_last_timestamp = datetime.min
+
+def monotonic_now() -> datetime:
+    """Return the current time, strictly later than any earlier call in this process.
+
+    Calls within the same microsecond, or after the wall clock steps back, are
+    moved forward by one microsecond so creation timestamps stay unique and
+    ordered without waiting for the clock to advance.
+    """
+    global _last_timestamp
+    with _clock_lock:
+        now = datetime.now()
+        if now <= _last_timestamp:
+            now = _last_timestamp + timedelta(microseconds=1)
+        _last_timestamp = now
+        return now
+
 class BaseModel(Base):
     """Base model with common fields"""
     __abstract__ = True
+    # Server generated values such as created_at come back through INSERT/UPDATE ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -17,5 +37,4 @@ class BaseModel(Base):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.created_at = datetime.now()
-        time.sleep(0.001)  # Ensure timestamps are different
\ No newline at end of file
+        self.created_at = monotonic_now()
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Boolean, Date, Index
+from models.baseModel import Base
+
+class CalendarDay(Base):
+    """Calendar dimension: one row per date with its week, month and fiscal attributes"""
+    __tablename__ = "calendar_days"
+
+    date = Column(Date, primary_key=True)
+    iso_year = Column(Integer, nullable=False)
+    iso_week = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    month_name = Column(String, nullable=False)
+    quarter = Column(Integer, nullable=False)
+    fiscal_year = Column(Integer, nullable=False)
+    fiscal_period = Column(Integer, nullable=False)
+    is_workday = Column(Boolean, nullable=False)
+
+    __table_args__ = (
+        Index('ix_calendar_days_iso_week', 'iso_year', 'iso_week'),
+        Index('ix_calendar_days_month', 'year', 'month'),
+    )
+
+    def __repr__(self):
+        return f"<CalendarDay(date={self.date}, iso_week={self.iso_year}-W{self.iso_week:02d})>"
@@ -1,5 +1,8 @@
-from sqlalchemy import Column, String, ForeignKey, text
+from typing import Optional
+from sqlalchemy import Column, Integer, String, ForeignKey, text
+from sqlalchemy.orm import relationship
 from models.baseModel import BaseModel
+from models.customerModel import Customer
 
 class Project(BaseModel):
     """Project model for tracking customer projects"""
@@ -8,14 +11,21 @@ class Project(BaseModel):
     project_id = Column(String, unique=True, nullable=False)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    customer = Column(String, ForeignKey('customers.name', ondelete='SET NULL'), nullable=True)
+    customer_id = Column(Integer, ForeignKey('customers.id', ondelete='SET NULL'), nullable=True, index=True)
     project_manager = Column(String, ForeignKey('project_managers.name', ondelete='SET NULL'), nullable=True, server_default=text("'-'"))
     status = Column(String, nullable=False, server_default=text("'active'"))
 
+    customer_ref = relationship(Customer)
+
     def __init__(self, **kwargs):
         # Set defaults if not provided
         kwargs['status'] = kwargs.get('status', 'active')
         super().__init__(**kwargs)
 
+    @property
+    def customer(self) -> Optional[str]:
+        """Name of the customer; queries listing projects load customer_ref with them."""
+        return self.customer_ref.name if self.customer_ref is not None else None
+
     def __repr__(self):
         return f"<Project(id={self.id}, project_id={self.project_id}, name={self.name})>"
\ No newline at end of file
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Index, text
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.baseModel import BaseModel
+from models.customerModel import Customer
+from models.projectModel import Project
 from datetime import datetime, date
 from typing import Optional
+from utils.calendar_days import calendar_attributes
 
 class TimeEntry(BaseModel):
     """Time entry model for tracking hours"""
@@ -14,11 +18,20 @@ class TimeEntry(BaseModel):
 
     category = Column(String, nullable=False)
     subcategory = Column(String, nullable=False)
-    customer = Column(String, ForeignKey('customers.name', ondelete='SET NULL'), nullable=True)
-    project = Column(String, ForeignKey('projects.project_id', ondelete='SET NULL'), nullable=True)
+    customer_id = Column(Integer, ForeignKey('customers.id', ondelete='SET NULL'), nullable=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id', ondelete='SET NULL'), nullable=True, index=True)
     task_description = Column(String, nullable=True)
     hours = Column(Float, nullable=False, server_default=text('0'))
     date = Column(Date, nullable=False)
+    # Hash of the row content, set by bulk ingestion so re-uploaded rows are skipped
+    fingerprint = Column(String(64), nullable=True)
+
+    customer_ref = relationship(Customer)
+    project_ref = relationship(Project)
+
+    __table_args__ = (
+        Index('ix_time_entries_fingerprint', 'fingerprint', unique=True),
+    )
 
     def __init__(self, **kwargs):
         # Calculate week_number and month from date if not provided
@@ -36,19 +49,29 @@ class TimeEntry(BaseModel):
 
         super().__init__(**kwargs)
 
+    @property
+    def customer(self) -> Optional[str]:
+        """Name of the customer; queries listing entries load customer_ref with them."""
+        return self.customer_ref.name if self.customer_ref is not None else None
+
+    @property
+    def project(self) -> Optional[str]:
+        """project_id of the project; queries listing entries load project_ref with them."""
+        return self.project_ref.project_id if self.project_ref is not None else None
+
     def __repr__(self):
-        return f"<TimeEntry(id={self.id}, date={self.date}, hours={self.hours}, project={self.project})>"
+        return f"<TimeEntry(id={self.id}, date={self.date}, hours={self.hours}, project_id={self.project_id})>"
 
     @staticmethod
     def get_week_number(entry_date: date) -> int:
         """Calculate ISO week number from date"""
         if isinstance(entry_date, str):
             entry_date = datetime.strptime(entry_date, '%Y-%m-%d').date()
-        return entry_date.isocalendar()[1]
+        return calendar_attributes(entry_date).iso_week
 
     @staticmethod
     def get_month_name(entry_date: date) -> str:
         """Get month name from date"""
         if isinstance(entry_date, str):
             entry_date = datetime.strptime(entry_date, '%Y-%m-%d').date()
-        return entry_date.strftime('%B')
\ No newline at end of file
+        return calendar_attributes(entry_date).month_name
\ No newline at end of file
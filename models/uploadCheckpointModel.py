@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, UniqueConstraint, text
+from models.baseModel import BaseModel
+
+class UploadCheckpoint(BaseModel):
+    """Checkpoint for an upload chunk, committed together with the chunk's rows"""
+    __tablename__ = "upload_checkpoints"
+
+    progress_key = Column(String, nullable=False, index=True)
+    # Worksheet of multi-sheet uploads; empty for single-sheet and CSV uploads
+    sheet = Column(String, nullable=False, server_default=text("''"))
+    chunk_index = Column(Integer, nullable=False)
+    first_row = Column(Integer, nullable=False)
+    last_row = Column(Integer, nullable=False)
+    # Lines of a CSV file read through last_row, where a resumed parse seeks to; NULL for Excel
+    end_line = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, nullable=False, server_default=text("0"))
+    rows_rejected = Column(Integer, nullable=False, server_default=text("0"))
+    rows_duplicate = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        UniqueConstraint('progress_key', 'sheet', 'chunk_index', name='uq_upload_checkpoints_chunk'),
+    )
+
+    def __repr__(self):
+        return (
+            f"<UploadCheckpoint(progress_key={self.progress_key}, sheet={self.sheet!r}, "
+            f"chunk_index={self.chunk_index}, rows={self.first_row}-{self.last_row})>"
+        )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Float, JSON, text
+from sqlalchemy.types import DateTime
+from models.baseModel import BaseModel
+
+class UploadJob(BaseModel):
+    """Upload job model for tracking background ingestion progress"""
+    __tablename__ = "upload_jobs"
+
+    progress_key = Column(String, unique=True, nullable=False, index=True)
+    filename = Column(String, nullable=True)
+    file_hash = Column(String(64), nullable=True, index=True)
+    state = Column(String, nullable=False, server_default=text("'queued'"))
+    total_rows = Column(Integer, nullable=False, server_default=text("0"))
+    rows_processed = Column(Integer, nullable=False, server_default=text("0"))
+    rows_rejected = Column(Integer, nullable=False, server_default=text("0"))
+    rows_duplicate = Column(Integer, nullable=False, server_default=text("0"))
+    rows_per_second = Column(Float, nullable=False, server_default=text("0"))
+    elapsed_seconds = Column(Float, nullable=False, server_default=text("0"))
+    eta_seconds = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Per-worksheet counters for multi-sheet uploads, keyed by sheet name
+    sheets = Column(JSON, nullable=True)
+
+    def __repr__(self):
+        return f"<UploadJob(progress_key={self.progress_key}, state={self.state})>"
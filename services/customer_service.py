@@ -61,24 +61,20 @@ class CustomerService:
         """Update an existing customer."""
         logger.debug(f"Attempting to update customer {name} with data: {customer_update.model_dump(exclude_unset=True)}")
 
-        existing_customer = self.customer_repo.get_by_name(self.db, name)
-        if not existing_customer:
-            logger.warning(f"Customer not found: {name}")
-            raise HTTPException(status_code=404, detail=f"Customer not found: {name}")
-
         try:
-            # Update only provided fields
+            # Update only provided fields; the row comes back from the UPDATE itself
             update_data = customer_update.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(existing_customer, key, value)
-
-            updated_customer = self.customer_repo.update(self.db, existing_customer)
-            logger.info(f"Successfully updated customer: {name}")
-            return updated_customer
+            updated_customer = self.customer_repo.update_by_name(self.db, name, update_data)
         except Exception as e:
             logger.error(f"Error updating customer {name}: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+        if updated_customer is None:
+            logger.warning(f"Customer not found: {name}")
+            raise HTTPException(status_code=404, detail=f"Customer not found: {name}")
+        logger.info(f"Successfully updated customer: {name}")
+        return updated_customer
+
     def delete_customer(self, name: str) -> bool:
         """Delete a customer by name."""
         logger.debug(f"Attempting to delete customer with name: {name}")
@@ -5,6 +5,7 @@ from sqlalchemy import text, inspect
 from fastapi import HTTPException
 from utils.logger import Logger
 from database import engine
+from database.reference_cache import get_reference_cache
 
 logger = Logger().get_logger()
 
@@ -68,12 +69,17 @@ class DatabaseService:
         logger.info("Force flag is true, dropping existing tables")
         try:
             with engine.connect() as connection:
+                connection.execute(text("DROP TABLE IF EXISTS time_entry_staging"))
+                connection.execute(text("DROP TABLE IF EXISTS upload_jobs"))
+                connection.execute(text("DROP TABLE IF EXISTS upload_checkpoints"))
+                connection.execute(text("DROP TABLE IF EXISTS calendar_days"))
                 connection.execute(text("DROP TABLE IF EXISTS time_entries CASCADE"))
                 connection.execute(text("DROP TABLE IF EXISTS projects CASCADE"))
                 connection.execute(text("DROP TABLE IF EXISTS project_managers CASCADE"))
                 connection.execute(text("DROP TABLE IF EXISTS customers CASCADE"))
                 connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
                 connection.commit()
+            get_reference_cache().clear()
             logger.info("Existing tables dropped successfully")
         except Exception as e:
             logger.error(f"Error dropping tables: {str(e)}")
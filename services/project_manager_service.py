@@ -64,18 +64,15 @@ class ProjectManagerService:
         logger.debug(f"Attempting to update project manager {email} with data: {pm_update.model_dump(exclude_unset=True)}")
 
         try:
-            existing_pm = self.pm_repo.get_by_email(self.db, email)
-            if not existing_pm:
-                logger.warning(f"Project manager not found: {email}")
-                raise HTTPException(status_code=404, detail="Project manager not found")
-
             update_data = pm_update.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True)
+            # Only update non-None values
+            update_data = {key: value for key, value in update_data.items() if value is not None}
 
-            for key, value in update_data.items():
-                if value is not None:  # Only update non-None values
-                    setattr(existing_pm, key, value)
+            updated_pm = self.pm_repo.update_by_email(self.db, email, update_data)
+            if updated_pm is None:
+                logger.warning(f"Project manager not found: {email}")
+                raise HTTPException(status_code=404, detail="Project manager not found")
 
-            updated_pm = self.pm_repo.update(self.db, existing_pm)
             logger.info(f"Successfully updated project manager: {email}")
             return updated_pm
         except HTTPException:
@@ -89,21 +86,16 @@ class ProjectManagerService:
         """Delete a project manager by email."""
         logger.debug(f"Attempting to delete project manager with email: {email}")
         try:
-            # First check if the project manager exists
-            if not self.pm_repo.get_by_email(self.db, email):
+            # The row count of the DELETE tells whether the project manager existed
+            if not self.pm_repo.delete(self.db, email):
                 logger.warning(f"Project manager not found for deletion: {email}")
                 raise HTTPException(status_code=404, detail="Project manager not found")
 
-            success = self.pm_repo.delete(self.db, email)
-            if success:
-                logger.info(f"Successfully deleted project manager: {email}")
-                return True
-
-            logger.error(f"Failed to delete project manager: {email}")
-            raise HTTPException(status_code=500, detail="Failed to delete project manager")
+            logger.info(f"Successfully deleted project manager: {email}")
+            return True
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error deleting project manager {email}: {str(e)}")
             self.db.rollback()
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
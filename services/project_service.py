@@ -3,6 +3,7 @@ from typing import List, Optional
 from database.project_repository import ProjectRepository 
 from database.customer_repository import CustomerRepository
 from database.pm_repository import ProjectManagerRepository
+from database.unit_of_work import UnitOfWork
 from database import schemas
 from models.projectModel import Project
 from utils.logger import Logger
@@ -30,8 +31,7 @@ class ProjectService:
                 return None
 
             # Check if customer exists
-            existing = self.customer_repo.get_by_name(self.db, normalized_name)
-            if existing:
+            if self.customer_repo.exists(self.db, normalized_name):
                 logger.debug(f"Found existing customer: {normalized_name}")
                 return normalized_name
 
@@ -44,8 +44,7 @@ class ProjectService:
 
             # Convert to dictionary for database operation
             customer_dict = customer_data.model_dump()
-            new_customer = self.customer_repo.create(self.db, customer_dict)
-            self.db.refresh(new_customer)
+            self.customer_repo.create(self.db, customer_dict)
             logger.info(f"Created new customer: {normalized_name}")
             return normalized_name
 
@@ -64,8 +63,7 @@ class ProjectService:
                 return True
 
             # Check if project manager exists
-            existing = self.pm_repo.get_by_name(self.db, normalized_name)
-            if existing:
+            if self.pm_repo.exists(self.db, normalized_name):
                 logger.debug(f"Found existing project manager: {normalized_name}")
                 return True
 
@@ -83,31 +81,35 @@ class ProjectService:
             raise HTTPException(status_code=500, detail=f"Failed to verify project manager: {str(e)}")
 
     def create_project(self, project: schemas.ProjectCreate) -> Project:
-        """Create a new project with validation."""
+        """Create a new project with validation.
+
+        The customer, project manager and project are written in one unit of
+        work, so a failure leaves none of them behind.
+        """
         try:
             logger.debug(f"Starting creation of project with data: {project.model_dump()}")
 
-            # Normalize and validate customer if provided
-            customer_name = self._ensure_customer_exists(project.customer)
+            with UnitOfWork(self.db):
+                # Normalize and validate customer if provided
+                customer_name = self._ensure_customer_exists(project.customer)
 
-            # Create or validate project manager if provided
-            if project.project_manager:
-                self._ensure_project_manager_exists(project.project_manager)
+                # Create or validate project manager if provided
+                if project.project_manager:
+                    self._ensure_project_manager_exists(project.project_manager)
 
-            # Check if project already exists
-            existing_project = self.project_repo.get_by_project_id(self.db, project.project_id)
-            if existing_project:
-                logger.warning(f"Project with ID {project.project_id} already exists")
-                raise HTTPException(status_code=400, detail=f"Project with ID {project.project_id} already exists")
+                # Check if project already exists
+                existing_project = self.project_repo.get_by_project_id(self.db, project.project_id)
+                if existing_project:
+                    logger.warning(f"Project with ID {project.project_id} already exists")
+                    raise HTTPException(status_code=400, detail=f"Project with ID {project.project_id} already exists")
 
-            # Convert pydantic model to dict and create project
-            project_data = project.model_dump()
-            project_data['customer'] = customer_name
-            project_data['project_manager'] = normalize_project_manager(project_data.get('project_manager'))
+                # Convert pydantic model to dict and create project
+                project_data = project.model_dump()
+                project_data['customer'] = customer_name
+                project_data['project_manager'] = normalize_project_manager(project_data.get('project_manager'))
 
-            logger.debug(f"Creating new project with data: {project_data}")
-            created_project = self.project_repo.create(self.db, project_data)
-            self.db.refresh(created_project)
+                logger.debug(f"Creating new project with data: {project_data}")
+                created_project = self.project_repo.create(self.db, project_data)
 
             logger.info(f"Successfully created project: {created_project.project_id}")
             return created_project
@@ -116,7 +118,6 @@ class ProjectService:
             raise
         except Exception as e:
             logger.error(f"Error creating project: {str(e)}")
-            self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
     def get_project(self, project_id: str) -> Optional[Project]:
@@ -145,30 +146,28 @@ class ProjectService:
         logger.debug(f"Attempting to update project {project_id}")
 
         try:
-            existing_project = self.get_project(project_id)
-            if not existing_project:
-                logger.warning(f"Project not found: {project_id}")
-                raise HTTPException(status_code=404, detail="Project not found")
-
-            # Update only the fields that are provided
-            update_data = project_update.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True)
-
-            # If project manager is being updated, ensure they exist
-            if 'project_manager' in update_data:
-                manager_name = normalize_project_manager(update_data['project_manager'])
-                update_data['project_manager'] = manager_name
-                if manager_name:
-                    self._ensure_project_manager_exists(manager_name)
-
-            # If customer is being updated, ensure they exist
-            if 'customer' in update_data:
-                customer_name = self._ensure_customer_exists(update_data['customer'])
-                update_data['customer'] = customer_name
+            with UnitOfWork(self.db):
+                # Update only the fields that are provided
+                update_data = project_update.model_dump(exclude={'id', 'created_at', 'updated_at'}, exclude_unset=True)
+
+                # If project manager is being updated, ensure they exist
+                if 'project_manager' in update_data:
+                    manager_name = normalize_project_manager(update_data['project_manager'])
+                    update_data['project_manager'] = manager_name
+                    if manager_name:
+                        self._ensure_project_manager_exists(manager_name)
+
+                # If customer is being updated, ensure they exist
+                if 'customer' in update_data:
+                    customer_name = self._ensure_customer_exists(update_data['customer'])
+                    update_data['customer'] = customer_name
+
+                # The row comes back from the UPDATE itself; no row means no project
+                updated_project = self.project_repo.update_by_project_id(self.db, project_id, update_data)
+                if updated_project is None:
+                    logger.warning(f"Project not found: {project_id}")
+                    raise HTTPException(status_code=404, detail="Project not found")
 
-            for key, value in update_data.items():
-                setattr(existing_project, key, value)
-
-            updated_project = self.project_repo.update(self.db, existing_project)
             logger.info(f"Successfully updated project: {project_id}")
             return updated_project
 
@@ -176,29 +175,22 @@ class ProjectService:
             raise
         except Exception as e:
             logger.error(f"Error updating project {project_id}: {str(e)}")
-            self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
     def delete_project(self, project_id: str) -> bool:
         """Delete a project."""
         logger.debug(f"Attempting to delete project: {project_id}")
         try:
-            # First check if project exists
-            existing_project = self.get_project(project_id)
-            if not existing_project:
+            # The row count of the DELETE tells whether the project existed
+            if not self.project_repo.delete_by_project_id(self.db, project_id):
                 logger.warning(f"Project not found: {project_id}")
                 raise HTTPException(status_code=404, detail="Project not found")
 
-            result = self.project_repo.delete(self.db, project_id)
-            if result:
-                logger.info(f"Successfully deleted project: {project_id}")
-                return True
-
-            logger.error(f"Failed to delete project: {project_id}")
-            raise HTTPException(status_code=500, detail="Failed to delete project")
+            logger.info(f"Successfully deleted project: {project_id}")
+            return True
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error deleting project {project_id}: {str(e)}")
             self.db.rollback()
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
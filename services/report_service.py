@@ -3,10 +3,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional
 from datetime import datetime, timedelta
-import calendar
 from database import schemas
 from models.timeEntry import TimeEntry
+from models.customerModel import Customer
 from models.projectModel import Project
+from models.calendarDayModel import CalendarDay
+from utils.calendar_days import calendar_attributes
 from utils.logger import Logger
 
 logger = Logger().get_logger()
@@ -21,24 +23,25 @@ class ReportService:
 
         week_start = date - timedelta(days=date.weekday())
         week_end = week_start + timedelta(days=6)
+        week = calendar_attributes(week_start.date())
 
-        query = self._build_report_query(week_start.date(), week_end.date(), project_id)
+        query = self._build_report_query(
+            project_id,
+            CalendarDay.iso_year == week.iso_year,
+            CalendarDay.iso_week == week.iso_week
+        )
         results = query.all()
         entries = self._create_report_entries(results, f"{week_start.date()} to {week_end.date()}")
 
         return schemas.WeeklyReport(
             entries=entries,
             total_hours=sum(entry.total_hours for entry in entries),
-            week_number=week_start.isocalendar()[1],
-            month=calendar.month_name[week_start.month]
+            week_number=week.iso_week,
+            month=week.month_name
         )
 
     def get_monthly_report(self, year: int, month: int, project_id: Optional[str] = None) -> schemas.MonthlyReport:
-        _, last_day = calendar.monthrange(year, month)
-        start_date = datetime(year, month, 1).date()
-        end_date = datetime(year, month, last_day).date()
-
-        query = self._build_report_query(start_date, end_date, project_id)
+        query = self._build_report_query(project_id, CalendarDay.year == year, CalendarDay.month == month)
         results = query.all()
         entries = self._create_report_entries(results, f"{year}-{month:02d}")
 
@@ -49,20 +52,26 @@ class ReportService:
             year=year
         )
 
-    def _build_report_query(self, start_date, end_date, project_id=None):
+    def _build_report_query(self, project_id=None, *period):
+        """Sum hours per project over the calendar days matching the period filters."""
         query = self.db.query(
             Project.project_id,
-            Project.customer,
+            Customer.name.label('customer'),
             func.sum(TimeEntry.hours).label('total_hours')
         ).join(
             TimeEntry,
-            TimeEntry.project == Project.project_id
+            TimeEntry.project_id == Project.id
+        ).join(
+            CalendarDay,
+            CalendarDay.date == TimeEntry.date
+        ).outerjoin(
+            Customer,
+            Customer.id == Project.customer_id
         ).filter(
-            TimeEntry.date >= start_date,
-            TimeEntry.date <= end_date
+            *period
         ).group_by(
             Project.project_id,
-            Project.customer
+            Customer.name
         )
 
         if project_id:
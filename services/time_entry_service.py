@@ -1,23 +1,49 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException, BackgroundTasks
 from datetime import datetime, date
 from database import schemas
+from models.customerModel import Customer
 from models.timeEntry import TimeEntry
 from utils.logger import Logger
 from utils.validators import normalize_customer_name, normalize_project_id
 from database.customer_repository import CustomerRepository
 from database.project_repository import ProjectRepository
-from utils.xls_analyzer import XLSAnalyzer
+from database.timesheet_repository import TimeEntryRepository
+from database.bulk_loader import TimeEntryBulkLoader
+from database.calendar_repository import CalendarRepository
+from database.upload_checkpoint_repository import UploadCheckpointRepository
+from database.upload_job_store import UploadJobStore, get_upload_job_store
+from database.unit_of_work import UnitOfWork
+from utils.xls_analyzer import XLSAnalyzer, ExcelSource
+from utils.parse_pool import ParsedBatchStream, ParsePoolBusy, SheetBatchStreams, first_batch
+from utils.time_entry_batch import TimeEntryBatch
+from utils.frame_validator import FrameValidator
+from utils.ingest_pipeline import IngestPipeline, PipelineStage
 from tqdm import tqdm
+from collections import Counter
+import asyncio
+import hashlib
+import uuid
 
 logger = Logger().get_logger()
 
 class TimeEntryService:
-    def __init__(self, db: Session):
+    UPLOAD_CHUNK_SIZE = 1000
+    # Previews commit nothing, so they parse in larger batches to amortize per-batch overhead
+    PREVIEW_CHUNK_SIZE = 10000
+    # Chunks waiting between ingestion stages; bounds memory while the database catches up
+    PIPELINE_QUEUE_SIZE = 2
+
+    def __init__(self, db: Session, job_store: Optional[UploadJobStore] = None):
         self.db = db
         self.customer_repo = CustomerRepository()
         self.project_repo = ProjectRepository()
+        self.entry_repo = TimeEntryRepository()
+        self.checkpoint_repo = UploadCheckpointRepository()
+        self.job_store = job_store or get_upload_job_store()
         logger.debug("TimeEntryService initialized with database session")
 
     def _ensure_customer_exists(self, customer_name: Optional[str]) -> Optional[str]:
@@ -33,15 +59,16 @@ class TimeEntryService:
                 return None
 
             # Check if customer exists
-            existing = self.customer_repo.get_by_name(self.db, normalized_name)
-            if not existing:
+            if not self.customer_repo.exists(self.db, normalized_name):
                 # Create new customer
                 customer_data = schemas.CustomerCreate(
                     name=normalized_name,
                     contact_email=f"{normalized_name.lower().replace(' ', '_')}@example.com",
                     status="active"
                 )
-                new_customer = self.customer_repo.create(self.db, customer_data)
+                # A failed create falls back to None, so only its savepoint is rolled back
+                with self.db.begin_nested():
+                    self.customer_repo.create(self.db, customer_data)
                 logger.info(f"Created new customer: {normalized_name}")
             return normalized_name
         except Exception as e:
@@ -61,8 +88,7 @@ class TimeEntryService:
                 return None
 
             # Check if project exists
-            existing = self.project_repo.get_by_project_id(self.db, normalized_id)
-            if not existing:
+            if not self.project_repo.exists(self.db, normalized_id):
                 # Create new project
                 project_data = schemas.ProjectCreate(
                     project_id=normalized_id,
@@ -70,7 +96,8 @@ class TimeEntryService:
                     customer=customer_name,
                     status="active"
                 )
-                self.project_repo.create(self.db, project_data)
+                with self.db.begin_nested():
+                    self.project_repo.create(self.db, project_data)
                 logger.info(f"Created new project: {normalized_id} for customer: {customer_name}")
             return normalized_id
         except Exception as e:
@@ -82,38 +109,38 @@ class TimeEntryService:
         try:
             logger.debug(f"Starting creation of time entry with data: {entry.model_dump()}")
 
-            # Validate and normalize customer if provided
-            customer_name = self._ensure_customer_exists(entry.customer)
+            # New customers and projects commit together with the entry
+            with UnitOfWork(self.db):
+                # Validate and normalize customer if provided
+                customer_name = self._ensure_customer_exists(entry.customer)
 
-            # Validate and normalize project if provided
-            project_id = self._ensure_project_exists(entry.project, customer_name)
+                # Validate and normalize project if provided
+                project_id = self._ensure_project_exists(entry.project, customer_name)
 
-            # Set default hours if not provided
-            if entry.hours is None:
-                entry.hours = 0.0
-                logger.debug("No hours provided, defaulting to 0.0")
+                # Set default hours if not provided
+                if entry.hours is None:
+                    entry.hours = 0.0
+                    logger.debug("No hours provided, defaulting to 0.0")
 
-            # Create entry with validated customer and project
-            entry_dict = entry.model_dump(exclude={'id', 'created_at', 'updated_at'})
-            entry_dict.update({
-                'customer': customer_name,
-                'project': project_id
-            })
+                # Create entry with validated customer and project
+                entry_dict = entry.model_dump(exclude={'id', 'created_at', 'updated_at'})
+                entry_dict.update({
+                    'customer': customer_name,
+                    'project': project_id
+                })
 
-            # Create TimeEntry instance
-            db_entry = TimeEntry(**entry_dict)
+                # Create TimeEntry instance referencing the customer and project by id
+                db_entry = TimeEntry(**self.entry_repo.with_reference_ids(self.db, entry_dict))
 
-            logger.debug("Adding entry to database session")
-            self.db.add(db_entry)
-            self.db.commit()
-            self.db.refresh(db_entry)
+                logger.debug("Adding entry to database session")
+                CalendarRepository().ensure_dates(self.db, [db_entry.date])
+                self.db.add(db_entry)
 
             logger.info(f"Successfully created time entry for {customer_name} - {project_id}")
             return db_entry
 
         except Exception as e:
             logger.error(f"Error creating time entry: {str(e)}")
-            self.db.rollback()
             raise
 
     def bulk_create(self, db: Session, entries: List[schemas.TimeEntryCreate]) -> List[TimeEntry]:
@@ -140,169 +167,518 @@ class TimeEntryService:
             self.db.rollback()
             raise
 
-    async def process_entries_chunk(
+    @staticmethod
+    def _normalize_batch(batch: TimeEntryBatch) -> TimeEntryBatch:
+        """Normalize the customer and project columns, once per distinct value."""
+        return (
+            batch
+            .map_column('customer', normalize_customer_name)
+            .map_column('project', normalize_project_id)
+        )
+
+    def create_entries_bulk(self, rows: List[Any], parse_errors: Optional[Dict[int, str]] = None) -> Dict[str, Any]:
+        """Create many time entries in one transaction.
+
+        The rows are validated together, their customers and projects are
+        created with one upsert per table, and the valid rows are inserted by
+        the bulk loader. parse_errors holds rows already known to be invalid,
+        by position. Unlike file uploads, identical entries are not skipped as
+        duplicates. Returns the counts and one result per row, in order: the
+        id of the created entry, or why it was rejected.
+        """
+        errors = dict(parse_errors or {})
+        candidates = [index for index in range(len(rows)) if index not in errors]
+        entries, invalid = schemas.validate_time_entries([rows[index] for index in candidates])
+        for position, message in invalid.items():
+            errors[candidates[position]] = message
+        # Position of each row in the batch -> position in rows
+        valid = [index for index in candidates if index not in errors]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        for index, message in errors.items():
+            results[index] = {"index": index, "status": "rejected", "error": message}
+
+        if entries:
+            batch = self._normalize_batch(TimeEntryBatch.from_entries(entries, first_row=0))
+            with UnitOfWork(self.db):
+                self._resolve_references(self.db, batch)
+                # API entries are not fingerprinted, so identical items are all created
+                result = TimeEntryBulkLoader(self.db).load(batch, commit=False, deduplicate=False)
+
+            for reject in result["rejected"]:
+                index = valid[reject["row"]]
+                results[index] = {"index": index, "status": "rejected", "error": f"{reject['column']}: {reject['reason']}"}
+            for row, entry_id in result["rows"].items():
+                index = valid[row]
+                results[index] = {"index": index, "status": "created", "id": entry_id}
+
+        counts = Counter(item["status"] for item in results)
+        logger.info(
+            f"Bulk created {counts['created']} of {len(rows)} time entries "
+            f"({counts['rejected']} rejected)"
+        )
+        return {
+            "created": counts["created"],
+            "rejected": counts["rejected"],
+            "results": results
+        }
+
+    def _resolve_references(self, db: Session, batch: TimeEntryBatch) -> None:
+        """Create the customers and projects a normalized batch refers to.
+
+        Missing references are created with one upsert per table and committed
+        on db, so they are visible to the session that loads the rows.
+        """
+        self.customer_repo.bulk_ensure(db, batch.customers())
+        self.project_repo.bulk_ensure(db, batch.project_customers())
+
+    def _load_chunk(
         self,
-        entries: List[schemas.TimeEntryCreate],
-        progress_key: str
-    ) -> List[TimeEntry]:
-        """Process a chunk of entries with progress tracking."""
-        created_entries = []
-        total = len(entries)
-
+        progress_key: str,
+        batch: TimeEntryBatch,
+        skipped: int,
+        sheet: Optional[str],
+        chunk_index: Optional[int],
+        first_row: int,
+        last_row: int,
+        end_line: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Bulk load a normalized batch, committing the chunk's checkpoint with it."""
         try:
-            # Pre-process unique customers and projects for batch creation
-            unique_customers = {
-                normalize_customer_name(entry.customer)
-                for entry in entries
-                if entry.customer
-            }
-            unique_projects = {
-                normalize_project_id(entry.project)
-                for entry in entries
-                if entry.project
-            }
-
-            # Create customers in bulk
-            for customer_name in unique_customers:
-                if not customer_name:
-                    continue
-                try:
-                    if not self.customer_repo.get_by_name(self.db, customer_name):
-                        customer_data = schemas.CustomerCreate(
-                            name=customer_name,
-                            contact_email=f"{customer_name.lower().replace(' ', '_')}@example.com",
-                            status="active"
-                        )
-                        self.customer_repo.create(self.db, customer_data)
-                        logger.info(f"Created new customer: {customer_name}")
-                except Exception as e:
-                    logger.error(f"Error creating customer {customer_name}: {str(e)}")
-
-            # Create projects in bulk
-            for project_id in unique_projects:
-                if not project_id:
-                    continue
-                try:
-                    if not self.project_repo.get_by_project_id(self.db, project_id):
-                        # Find the associated customer for this project
-                        project_entries = [e for e in entries if normalize_project_id(e.project) == project_id]
-                        if project_entries:
-                            customer_name = normalize_customer_name(project_entries[0].customer)
-                            project_data = schemas.ProjectCreate(
-                                project_id=project_id,
-                                name=project_id,
-                                customer=customer_name,
-                                status="active"
-                            )
-                            self.project_repo.create(self.db, project_data)
-                            logger.info(f"Created new project: {project_id} for customer: {customer_name}")
-                except Exception as e:
-                    logger.error(f"Error creating project {project_id}: {str(e)}")
-
-            # Prepare time entries for bulk insert
-            entries_to_create = []
-            for entry in entries:
-                try:
-                    # Normalize and validate customer and project
-                    normalized_customer = normalize_customer_name(entry.customer)
-                    normalized_project = normalize_project_id(entry.project)
-
-                    entry_dict = entry.model_dump(exclude={'id', 'created_at', 'updated_at'})
-                    entry_dict.update({
-                        'customer': normalized_customer,
-                        'project': normalized_project
-                    })
-                    entries_to_create.append(TimeEntry(**entry_dict))
-                except Exception as e:
-                    logger.error(f"Error preparing entry: {str(e)}")
-                    continue
+            # Stream the batch through COPY and insert it in one statement
+            result = TimeEntryBulkLoader(self.db).load(batch, commit=chunk_index is None)
+            if result["rejected"]:
+                logger.warning(
+                    f"Bulk loader rejected {len(result['rejected'])} rows: {FrameValidator.summarize(result['rejected'])}"
+                )
 
-            # Bulk insert time entries
-            if entries_to_create:
-                self.db.bulk_save_objects(entries_to_create)
+            if chunk_index is not None:
+                self.checkpoint_repo.add(
+                    self.db, progress_key, chunk_index, first_row, last_row,
+                    result["inserted"], len(result["rejected"]) + skipped, result["duplicates"], sheet, end_line
+                )
                 self.db.commit()
-                created_entries.extend(entries_to_create)
-
-            # Update progress
-            progress = (len(created_entries) / total) * 100 if total > 0 else 100
-            await self.update_progress(progress_key, progress)
-
-            return created_entries
+            return result
 
         except Exception as e:
             logger.error(f"Error in bulk processing: {str(e)}")
             self.db.rollback()
             raise
 
-    async def update_progress(self, progress_key: str, progress: float):
-        """Update progress in Redis or similar storage."""
-        # In a real implementation, this would store progress in Redis or similar
-        # For now, we'll just log it
-        logger.info(f"Upload progress {progress_key}: {progress:.2f}%")
+    @staticmethod
+    def _progress(counters: Dict[str, Any], completed: bool) -> float:
+        """Percentage of rows processed, rejected or skipped as duplicates."""
+        if completed:
+            return 100.0
+        if not counters['total_rows']:
+            return 0.0
+        done = counters['rows_processed'] + counters['rows_rejected'] + counters['rows_duplicate']
+        return round(min(done / counters['total_rows'] * 100, 100.0), 2)
+
+    def get_upload_status(self, progress_key: str) -> Dict[str, Any]:
+        """Return the progress, throughput and ETA of an upload job."""
+        job = self.job_store.get(progress_key)
+        if not job:
+            logger.warning(f"Upload job {progress_key} not found")
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        completed = job['state'] == 'completed'
+        status = {**job, 'progress': self._progress(job, completed)}
+        if job.get('sheets'):
+            status['sheets'] = {
+                name: {**counters, 'progress': self._progress(counters, completed)}
+                for name, counters in job['sheets'].items()
+            }
+        return status
 
     async def process_excel_upload(
         self,
-        file_contents: bytes,
-        background_tasks: BackgroundTasks
+        source: ExcelSource,
+        background_tasks: BackgroundTasks,
+        filename: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        sheets: Optional[List[str]] = None,
+        all_sheets: bool = False,
+        dry_run: bool = False
     ) -> Dict[str, Any]:
-        """Process Excel upload with progress tracking."""
+        """Process Excel upload with progress tracking.
+
+        source may be the raw bytes or an open file such as a spooled upload; a
+        file must stay open until the background task has finished. Records are
+        streamed from the workbook in batches so memory stays bounded by the
+        batch size rather than the size of the sheet.
+
+        Only the first worksheet is read unless sheets names the worksheets to
+        ingest or all_sheets is set. Selected worksheets are parsed concurrently
+        and loaded by one job that reports progress per worksheet. With dry_run
+        the upload is only previewed; see _preview_upload.
+        """
+        if all_sheets or sheets:
+            sheets = await self._select_sheets(source, sheets, all_sheets)
+            if file_hash:
+                # The same file with a different selection is a different import
+                file_hash = self._selection_hash(file_hash, sheets)
+        return await self._process_upload(
+            source, background_tasks, filename, file_hash, parser='excel', sheets=sheets or None, dry_run=dry_run
+        )
+
+    @staticmethod
+    def _selection_hash(file_hash: str, sheets: List[str]) -> str:
+        """Hash of a workbook together with the worksheets selected from it."""
+        return hashlib.sha256(f"{file_hash}:{'|'.join(sheets)}".encode()).hexdigest()
+
+    async def _select_sheets(
+        self,
+        source: ExcelSource,
+        sheets: Optional[List[str]],
+        all_sheets: bool
+    ) -> List[str]:
+        """Resolve the worksheets to ingest, in workbook order."""
+        loop = asyncio.get_running_loop()
         try:
-            analyzer = XLSAnalyzer()
-            records = analyzer.read_excel(file_contents)
+            names = await loop.run_in_executor(None, XLSAnalyzer.sheet_names, source)
+        except Exception as e:
+            logger.error(f"Error reading worksheet names: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Failed to parse Excel file: {str(e)}")
+        if all_sheets:
+            return names
+
+        missing = [sheet for sheet in sheets if sheet not in names]
+        if missing:
+            logger.warning(f"Requested worksheets not found: {missing}")
+            raise HTTPException(status_code=400, detail=f"Worksheets not found: {', '.join(missing)}")
+        return [name for name in names if name in set(sheets)]
+
+    async def process_csv_upload(
+        self,
+        source: ExcelSource,
+        background_tasks: BackgroundTasks,
+        filename: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Process CSV upload with progress tracking.
 
-            if not records:
-                raise ValueError("No valid records found in Excel file")
+        The file is read in chunks with the C parser and goes through the same
+        cleaning, bulk load and job tracking as Excel uploads.
+        """
+        return await self._process_upload(
+            source, background_tasks, filename, file_hash, parser='csv', dry_run=dry_run
+        )
 
-            # Generate unique progress key
-            progress_key = f"upload_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    async def _process_upload(
+        self,
+        source: ExcelSource,
+        background_tasks: BackgroundTasks,
+        filename: Optional[str],
+        file_hash: Optional[str],
+        parser: str,
+        sheets: Optional[List[str]] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Parse an upload in a worker pool and load its batches in the background.
 
-            # Convert records to TimeEntryCreate instances
-            entries = []
-            for record in records:
+        A file whose hash matches a completed upload is not parsed again; the
+        earlier job is returned with duplicate set. A dry run is previewed in
+        the request instead and never writes to the database.
+        """
+        try:
+            if file_hash:
+                previous = self.job_store.find_completed(file_hash)
+                if previous and not dry_run:
+                    logger.info(f"File already imported by upload {previous['progress_key']}")
+                    return {
+                        "message": "File already imported",
+                        "progress_key": previous['progress_key'],
+                        "total_records": previous['total_rows'],
+                        "duplicate": True
+                    }
+
+            # Parse in a worker pool so the event loop stays responsive
+            batch_size = self.PREVIEW_CHUNK_SIZE if dry_run else self.UPLOAD_CHUNK_SIZE
+            if sheets:
+                stream = await SheetBatchStreams.start(source, sheets, batch_size=batch_size)
+                sheet_rows = dict(stream.sheet_rows)
+            else:
+                stream = await ParsedBatchStream.start(source, batch_size=batch_size, parser=parser)
+                sheet_rows = None
+            total_records = stream.total_rows
+            batches = stream.batches()
+
+            # Pull the first batch eagerly so empty or unreadable files fail the request
+            try:
+                first = await first_batch(batches)
+            except Exception:
+                await stream.aclose()
+                raise
+            if not first:
+                await stream.aclose()
+                raise ValueError(f"No valid records found in {'Excel' if parser == 'excel' else 'CSV'} file")
+
+            if dry_run:
                 try:
-                    entry_data = schemas.TimeEntryCreate(
-                        date=record['Date'],
-                        week_number=record['Week Number'],
-                        month=record['Month'],
-                        category=record['Category'],
-                        subcategory=record.get('Subcategory', ''),
-                        customer=record['Customer'],
-                        project=record['Project'],
-                        task_description=record['Task Description'],
-                        hours=record['Hours']
-                    )
-                    entries.append(entry_data)
-                except Exception as e:
-                    logger.error(f"Error creating entry data: {str(e)}")
-                    continue
+                    preview = await self._preview_upload(first, batches)
+                finally:
+                    await stream.aclose()
+                return {
+                    "message": "Dry run completed",
+                    "total_records": total_records,
+                    "already_imported": bool(file_hash and previous),
+                    **preview
+                }
+
+            # Random keys cannot collide between simultaneous uploads
+            progress_key = f"upload_{uuid.uuid4().hex}"
+            self.job_store.create(
+                progress_key, total_rows=total_records, filename=filename, file_hash=file_hash, sheets=sheet_rows
+            )
+
+            # Add background task for processing chunks as they are parsed
+            if background_tasks:
+                background_tasks.add_task(self._ingest_batches, progress_key, stream, batches, first)
+            else:
+                await stream.aclose()
 
-            # Process in chunks of 100 entries
-            chunk_size = 100
-            chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+            return {
+                "message": "Upload processing started",
+                "progress_key": progress_key,
+                "total_records": total_records,
+                "duplicate": False
+            }
 
-            # Add background task for processing chunks
-            async def process_chunks():
-                created_entries = []
-                for chunk in chunks:
-                    processed_entries = await self.process_entries_chunk(chunk, progress_key)
-                    created_entries.extend(processed_entries)
-                    # Update progress after each chunk
-                    progress = (len(created_entries) / len(entries)) * 100
-                    await self.update_progress(progress_key, progress)
+        except ParsePoolBusy as e:
+            logger.warning(f"Rejecting {parser} upload: {str(e)}")
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error processing {parser} upload: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
 
-            if background_tasks:
-                background_tasks.add_task(process_chunks)
+    async def _ingest_batches(
+        self,
+        progress_key: str,
+        stream,
+        batches,
+        first,
+        chunk_indexes: Optional[Dict[Optional[str], int]] = None
+    ) -> None:
+        """Load parsed batches into an upload job, checkpointing every chunk.
+
+        Batches go through a pipeline of bounded queues: a normalizer cleans the
+        customer and project columns, a resolver creates missing customers and
+        projects on its own session, and a writer bulk loads each chunk with
+        its checkpoint. The stages and the parser work on different chunks at
+        once, and a slow writer holds the others back instead of letting
+        parsed chunks pile up.
+
+        Chunks are numbered per worksheet; chunk_indexes gives the next index of
+        each worksheet when a job is resumed. The job is completed or failed
+        once the stream is exhausted, and the stream is always closed.
+        """
+        next_chunk = dict(chunk_indexes or {})
+        resolver_db = Session(bind=self.db.get_bind())
+
+        async def numbered_batches():
+            item = first
+            while item is not None:
+                sheet, batch = item
+                chunk_index = next_chunk.get(sheet, 0)
+                next_chunk[sheet] = chunk_index + 1
+                yield sheet, chunk_index, batch
+                item = await anext(batches, None)
+
+        def normalize(item) -> Dict[str, Any]:
+            sheet, chunk_index, batch = item
+            if batch.rejects:
+                logger.warning(
+                    f"Upload {progress_key} rejected {batch.rejected_rows} rows: "
+                    f"{FrameValidator.summarize(batch.rejects)}"
+                )
+            return {
+                'sheet': sheet,
+                'chunk_index': chunk_index,
+                'first_row': batch.first_row,
+                'last_row': batch.last_row,
+                'end_line': batch.end_line,
+                'entries': self._normalize_batch(batch.entries),
+                'skipped': batch.rejected_rows
+            }
+
+        def resolve(chunk: Dict[str, Any]) -> Dict[str, Any]:
+            self._resolve_references(resolver_db, chunk['entries'])
+            return chunk
+
+        def write(chunk: Dict[str, Any]) -> None:
+            result = self._load_chunk(
+                progress_key, chunk['entries'], chunk['skipped'], chunk['sheet'],
+                chunk['chunk_index'], chunk['first_row'], chunk['last_row'], chunk['end_line']
+            )
+            self.job_store.record_chunk(
+                progress_key, result["inserted"], len(result["rejected"]) + chunk['skipped'],
+                result["duplicates"], chunk['sheet']
+            )
+
+        pipeline = IngestPipeline(
+            [PipelineStage('normalize', normalize), PipelineStage('resolve', resolve), PipelineStage('write', write)],
+            queue_size=self.PIPELINE_QUEUE_SIZE
+        )
+        try:
+            await pipeline.run(numbered_batches())
+            self.job_store.complete(progress_key)
+        except Exception as e:
+            logger.error(f"Error ingesting upload {progress_key}: {str(e)}")
+            logger.exception("Stack trace:")
+            self.job_store.fail(progress_key, str(e))
+        finally:
+            resolver_db.close()
+            await stream.aclose()
+
+    async def resume_upload(
+        self,
+        source: ExcelSource,
+        background_tasks: BackgroundTasks,
+        progress_key: str,
+        file_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Resume an interrupted upload from its last committed chunk.
+
+        The original file is uploaded again and must match the job's hash. Each
+        worksheet is parsed from the row after its last checkpoint, so committed
+        rows are neither parsed nor loaded again, and the job counters are reset
+        to the checkpointed totals. Jobs left processing by a restarted worker
+        can be resumed as well as failed ones; if two workers ever load the same
+        chunk, the checkpoint's unique constraint rolls one of them back.
+        """
+        job = self.job_store.get(progress_key)
+        if not job:
+            logger.warning(f"Upload job {progress_key} not found")
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if job['state'] == 'completed':
+            raise HTTPException(status_code=409, detail="Upload already completed")
+
+        sheets = list(job['sheets']) if job.get('sheets') else None
+        if file_hash and job['file_hash']:
+            expected = self._selection_hash(file_hash, sheets) if sheets else file_hash
+            if expected != job['file_hash']:
+                logger.warning(f"File does not match upload {progress_key}")
+                raise HTTPException(status_code=409, detail="File does not match the original upload")
+        filename = job['filename'] or ''
+        parser = 'excel' if filename.lower().endswith('.xlsx') else 'csv'
+
+        try:
+            points = self.checkpoint_repo.resume_points(self.db, progress_key)
+            if sheets:
+                start_rows = {sheet: point['start_row'] for sheet, point in points.items() if sheet}
+                stream = await SheetBatchStreams.start(
+                    source, sheets, batch_size=self.UPLOAD_CHUNK_SIZE, start_rows=start_rows
+                )
+            else:
+                point = points.get(None)
+                stream = await ParsedBatchStream.start(
+                    source, batch_size=self.UPLOAD_CHUNK_SIZE, parser=parser,
+                    start_row=point['start_row'] if point else None,
+                    start_line=point['start_line'] if point else None
+                )
+            batches = stream.batches()
+            try:
+                first = await first_batch(batches)
+            except Exception:
+                await stream.aclose()
+                raise
+
+            counters = {
+                field: sum(point[field] for point in points.values())
+                for field in ('rows_processed', 'rows_rejected', 'rows_duplicate')
+            }
+            self.job_store.resume(
+                progress_key,
+                counters['rows_processed'],
+                counters['rows_rejected'],
+                counters['rows_duplicate'],
+                sheets={
+                    sheet: {field: point[field] for field in counters}
+                    for sheet, point in points.items() if sheet
+                }
+            )
+
+            chunk_indexes = {sheet: point['chunk_index'] for sheet, point in points.items()}
+            if first is None:
+                # Every chunk was committed before the job was interrupted
+                await stream.aclose()
+                self.job_store.complete(progress_key)
+            elif background_tasks:
+                background_tasks.add_task(self._ingest_batches, progress_key, stream, batches, first, chunk_indexes)
+            else:
+                await stream.aclose()
 
             return {
-                "message": "Upload processing started",
+                "message": "Upload resumed",
                 "progress_key": progress_key,
-                "total_records": len(records)
+                "total_records": job['total_rows'],
+                "rows_committed": sum(counters.values())
             }
 
+        except ParsePoolBusy as e:
+            logger.warning(f"Rejecting resume of upload {progress_key}: {str(e)}")
+            raise HTTPException(status_code=503, detail=str(e))
         except Exception as e:
-            logger.error(f"Error processing Excel upload: {str(e)}")
+            logger.error(f"Error resuming upload {progress_key}: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
 
+    async def _preview_upload(self, first, batches) -> Dict[str, Any]:
+        """Count what an upload would do without writing anything.
+
+        Batches go through the same validation and normalization as a real
+        import. References are resolved and duplicates
+        detected with one set-based lookup per batch, so no ORM objects are
+        created. Rejections are counted per reason; a row failing several
+        checks counts once towards rows_rejected but under each of its reasons.
+        """
+        loader = TimeEntryBulkLoader(self.db)
+        rows_rejected = 0
+        rejected_by_reason = Counter()
+        customers = set()
+        projects = set()
+        seen = set()
+        accepted = 0
+        duplicates = 0
+
+        item = first
+        while item is not None:
+            _, batch = item
+            rows_rejected += batch.rejected_rows
+            rejected_by_reason.update(FrameValidator.summarize(batch.rejects))
+
+            entries = self._normalize_batch(batch.entries)
+            customers.update(entries.customers())
+            projects.update(entries.project_customers())
+
+            # Rows already stored or repeated earlier in the file would be skipped
+            fingerprints = TimeEntryBulkLoader.batch_fingerprints(entries)
+            existing = loader.existing_fingerprints(fingerprints)
+            for fingerprint in fingerprints:
+                if fingerprint in existing or fingerprint in seen:
+                    duplicates += 1
+                else:
+                    seen.add(fingerprint)
+                    accepted += 1
+            item = await anext(batches, None)
+
+        new_customers = self.customer_repo.find_missing(self.db, customers)
+        new_projects = self.project_repo.find_missing(self.db, projects)
+        logger.info(
+            f"Dry run: {accepted} rows accepted, {rows_rejected} rejected, {duplicates} duplicates, "
+            f"{len(new_customers)} new customers, {len(new_projects)} new projects"
+        )
+        return {
+            "dry_run": True,
+            "rows_accepted": accepted,
+            "rows_rejected": rows_rejected,
+            "rejected_by_reason": dict(rejected_by_reason),
+            "rows_duplicate": duplicates,
+            "new_customers": new_customers,
+            "new_projects": new_projects
+        }
+
     def get_time_entries(
         self,
         date: Optional[date] = None,
@@ -313,7 +689,7 @@ class TimeEntryService:
     ) -> List[TimeEntry]:
         """Retrieve time entries with filters."""
         logger.debug(f"Retrieving time entries with filters: date={date}, project_id={project_id}, customer={customer_name}")
-        query = self.db.query(TimeEntry)
+        query = self.entry_repo.load_references(self.db.query(TimeEntry))
 
         if date:
             logger.debug(f"Applying date filter: {date}")
@@ -322,41 +698,35 @@ class TimeEntryService:
             normalized_project = normalize_project_id(project_id)
             if normalized_project:
                 logger.debug(f"Applying project filter: {normalized_project}")
-                query = query.filter(TimeEntry.project == normalized_project)
+                query = query.filter(self.entry_repo.reference_criterion(self.db, 'project', normalized_project))
         if customer_name:
             normalized_customer = normalize_customer_name(customer_name)
             if normalized_customer:
                 logger.debug(f"Applying customer filter: {normalized_customer}")
-                query = query.filter(TimeEntry.customer == normalized_customer)
+                query = query.filter(self.entry_repo.reference_criterion(self.db, 'customer', normalized_customer))
 
         logger.debug(f"Applying pagination: skip={skip}, limit={limit}")
         results = query.offset(skip).limit(limit).all()
         logger.info(f"Retrieved {len(results)} time entries")
         return results
 
+    @staticmethod
+    def _derive_calendar_fields(update_data: Dict[str, Any]) -> None:
+        """Set week_number and month from a changed date."""
+        if update_data.get('date'):
+            update_data['week_number'] = TimeEntry.get_week_number(update_data['date'])
+            update_data['month'] = TimeEntry.get_month_name(update_data['date'])
+
     def update_entry(self, entry_id: int, entry: schemas.TimeEntryUpdate) -> Optional[TimeEntry]:
-        """Update an existing time entry."""
+        """Update an existing time entry.
+
+        The entry is written and loaded back with one UPDATE ... RETURNING;
+        None means it does not exist.
+        """
         try:
             logger.debug(f"Attempting to update time entry {entry_id}")
-            db_entry = self.db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
-
-            if not db_entry:
-                logger.warning(f"Time entry {entry_id} not found")
-                return None
-
             update_data = entry.model_dump(exclude_unset=True)
 
-            # Validate and normalize customer if provided
-            if 'customer' in update_data:
-                update_data['customer'] = self._ensure_customer_exists(update_data['customer'])
-
-            # Validate and normalize project if provided
-            if 'project' in update_data:
-                update_data['project'] = self._ensure_project_exists(
-                    update_data['project'],
-                    update_data.get('customer', db_entry.customer)
-                )
-
             # Validate hours
             if 'hours' in update_data and (
                 update_data['hours'] < 0 or 
@@ -364,36 +734,110 @@ class TimeEntryService:
             ):
                 raise ValueError("Hours must be between 0 and 24")
 
-            # Update the entry
-            for key, value in update_data.items():
-                setattr(db_entry, key, value)
+            self._derive_calendar_fields(update_data)
+
+            with UnitOfWork(self.db):
+                # Validate and normalize customer if provided
+                if 'customer' in update_data:
+                    update_data['customer'] = self._ensure_customer_exists(update_data['customer'])
+
+                # Validate and normalize project if provided
+                if 'project' in update_data:
+                    customer_name = update_data.get('customer')
+                    project_id = normalize_project_id(update_data['project'])
+                    if 'customer' not in update_data and project_id and not self.project_repo.exists(self.db, project_id):
+                        # Only a project that has to be created needs the entry's current customer
+                        customer_name = self.db.query(Customer.name).join(
+                            TimeEntry, TimeEntry.customer_id == Customer.id
+                        ).filter(TimeEntry.id == entry_id).scalar()
+                    update_data['project'] = self._ensure_project_exists(update_data['project'], customer_name)
+
+                db_entry = self.entry_repo.update_returning(
+                    self.db, TimeEntry.id == entry_id, self.entry_repo.with_reference_ids(self.db, update_data)
+                )
 
-            self.db.commit()
-            self.db.refresh(db_entry)
+            if db_entry is None:
+                logger.warning(f"Time entry {entry_id} not found")
+                return None
             logger.info(f"Successfully updated time entry {entry_id}")
             return db_entry
 
         except Exception as e:
             logger.error(f"Error updating time entry {entry_id}: {str(e)}")
-            self.db.rollback()
             raise ValueError(str(e))
 
     def delete_entry(self, entry_id: int) -> bool:
-        """Delete a time entry."""
+        """Delete a time entry with one DELETE ... RETURNING; False when it does not exist."""
         try:
             logger.debug(f"Attempting to delete time entry {entry_id}")
-            db_entry = self.db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
-
-            if not db_entry:
+            if not self.entry_repo.delete_returning(self.db, TimeEntry.id == entry_id):
                 logger.warning(f"Time entry {entry_id} not found")
                 return False
 
-            self.db.delete(db_entry)
-            self.db.commit()
             logger.info(f"Successfully deleted time entry {entry_id}")
             return True
 
         except Exception as e:
             logger.error(f"Error deleting time entry {entry_id}: {str(e)}")
             self.db.rollback()
-            raise
\ No newline at end of file
+            raise
+
+    def _filter_criteria(self, entry_filter: schemas.TimeEntryFilter) -> List[Any]:
+        """SQL conditions selecting the time entries a bulk filter matches."""
+        criteria = []
+        if entry_filter.ids is not None:
+            criteria.append(TimeEntry.id == sa.any_(sa.literal(entry_filter.ids, ARRAY(sa.Integer))))
+        if entry_filter.start_date:
+            criteria.append(TimeEntry.date >= entry_filter.start_date)
+        if entry_filter.end_date:
+            criteria.append(TimeEntry.date <= entry_filter.end_date)
+        if entry_filter.customer is not None:
+            normalized_customer = normalize_customer_name(entry_filter.customer)
+            if not normalized_customer:
+                raise ValueError(f"Invalid customer filter: {entry_filter.customer}")
+            criteria.append(self.entry_repo.reference_criterion(self.db, 'customer', normalized_customer))
+        if entry_filter.project is not None:
+            normalized_project = normalize_project_id(entry_filter.project)
+            if not normalized_project:
+                raise ValueError(f"Invalid project filter: {entry_filter.project}")
+            criteria.append(self.entry_repo.reference_criterion(self.db, 'project', normalized_project))
+        if entry_filter.category is not None:
+            criteria.append(TimeEntry.category == entry_filter.category)
+        return criteria
+
+    def bulk_update(self, entry_filter: schemas.TimeEntryFilter, changes: schemas.TimeEntryUpdate) -> int:
+        """Apply the same changes to every matching time entry with one UPDATE.
+
+        Returns the number of entries changed.
+        """
+        update_data = changes.model_dump(exclude_unset=True)
+        if not update_data:
+            raise ValueError("No changes given")
+        criteria = self._filter_criteria(entry_filter)
+        self._derive_calendar_fields(update_data)
+        logger.debug(f"Bulk updating time entries matching {entry_filter.model_dump(exclude_none=True)} with {update_data}")
+
+        with UnitOfWork(self.db):
+            if 'customer' in update_data:
+                update_data['customer'] = self._ensure_customer_exists(update_data['customer'])
+            if 'project' in update_data:
+                update_data['project'] = self._ensure_project_exists(
+                    update_data['project'], update_data.get('customer')
+                )
+            updated = self.entry_repo.update_where(
+                self.db, criteria, self.entry_repo.with_reference_ids(self.db, update_data)
+            )
+
+        logger.info(f"Bulk updated {updated} time entries")
+        return updated
+
+    def bulk_delete(self, entry_filter: schemas.TimeEntryFilter) -> int:
+        """Delete every matching time entry with one DELETE; returns the number deleted."""
+        criteria = self._filter_criteria(entry_filter)
+        logger.debug(f"Bulk deleting time entries matching {entry_filter.model_dump(exclude_none=True)}")
+
+        with UnitOfWork(self.db):
+            deleted = self.entry_repo.delete_where(self.db, criteria)
+
+        logger.info(f"Bulk deleted {deleted} time entries")
+        return deleted
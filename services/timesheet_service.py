@@ -9,7 +9,10 @@ from models.timeEntry import TimeEntry
 from database.timesheet_repository import TimeEntryRepository
 from database.customer_repository import CustomerRepository
 from database.project_repository import ProjectRepository
+from database.bulk_loader import TimeEntryBulkLoader
 from utils.xls_analyzer import XLSAnalyzer
+from utils.frame_validator import FrameValidator
+from utils.upload_spool import spool_upload, UploadTooLargeError
 from utils.validators import normalize_customer_name, normalize_project_id
 from datetime import datetime
 import json
@@ -61,44 +64,29 @@ class TimesheetService:
         try:
             created_entries = []
 
-            # Process all entries first to ensure customers and projects exist
-            processed_entries = []
+            # Collect customers and the customer for each project in one pass
+            unique_customers = set()
+            project_customers = {}
             for entry in entries:
-                # Create customer if not exists and customer is provided
                 if entry.customer:
-                    customer = self.customer_repo.get_by_name(self.db, entry.customer)
-                    if not customer:
-                        customer_data = schemas.CustomerCreate(
-                            name=entry.customer,
-                            contact_email=f"{entry.customer.lower().replace(' ', '_')}@example.com",
-                            status="active"
-                        )
-                        customer = self.customer_repo.create(self.db, customer_data)
-                        logger.info(f"Created new customer: {customer.name}")
-
-                # Create project if not exists and project is provided
-                if entry.project and entry.customer:
-                    project = self.project_repo.get_by_project_id(self.db, entry.project)
-                    if not project:
-                        project_data = schemas.ProjectCreate(
-                            project_id=entry.project,
-                            name=entry.project,
-                            customer=entry.customer,
-                            status="active"
-                        )
-                        project = self.project_repo.create(self.db, project_data)
-                        logger.info(f"Created new project: {project.project_id} for customer: {entry.customer}")
-
-                processed_entries.append(entry)
-
-            # Now create all time entries
-            for entry in processed_entries:
-                entry_dict = {k: v for k, v in entry.model_dump().items() if k not in {'id', 'created_at', 'updated_at'}}
-                db_entry = TimeEntry(**entry_dict)
-                self.db.add(db_entry)
-                created_entries.append(db_entry)
-
-            self.db.commit()
+                    unique_customers.add(entry.customer)
+                    if entry.project and entry.project not in project_customers:
+                        project_customers[entry.project] = entry.customer
+
+            # Create missing customers and projects with one upsert per table
+            self.customer_repo.bulk_ensure(self.db, unique_customers)
+            self.project_repo.bulk_ensure(self.db, project_customers)
+
+            # Now create all time entries with a single COPY + INSERT ... SELECT
+            result = TimeEntryBulkLoader(self.db).load(entries)
+            for reject in result["rejected"]:
+                logger.warning(f"Rejected entry {reject['row']} ({reject['column']}): {reject['reason']}")
+
+            if result["ids"]:
+                created_entries = self.repository.load_references(self.db.query(TimeEntry)).filter(
+                    TimeEntry.id.in_(result["ids"])
+                ).order_by(TimeEntry.id).all()
+
             return [self._serialize_time_entry(entry) for entry in created_entries]
 
         except Exception as e:
@@ -110,18 +98,22 @@ class TimesheetService:
         """Upload and process timesheet file"""
         logger.info(f"Processing timesheet upload: {file.filename}")
 
+        spooled = None
         try:
-            contents = await file.read()
-            if not contents:
-                raise HTTPException(status_code=400, detail="Empty file provided")
-
             if not file.filename.lower().endswith('.xlsx'):
                 raise HTTPException(
                     status_code=400,
                     detail="Only Excel (.xlsx) files are supported"
                 )
 
-            entries = self.repository.import_excel(self.db, contents)
+            try:
+                spooled, file_size, _ = await spool_upload(file)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            if file_size == 0:
+                raise HTTPException(status_code=400, detail="Empty file provided")
+
+            entries = self.repository.import_excel(self.db, spooled)
             if not entries:
                 logger.warning("No valid entries found in file")
                 raise HTTPException(
@@ -130,17 +122,18 @@ class TimesheetService:
                 )
 
             logger.info(f"Processing {len(entries)} entries")
-            entry_creates = [
-                schemas.TimeEntryCreate(
-                    category=entry.category,
-                    subcategory=entry.subcategory,
-                    customer=normalize_customer_name(entry.customer),
-                    project=normalize_project_id(entry.project),
-                    task_description=entry.task_description,
-                    hours=entry.hours,
-                    date=entry.date
-                ) for entry in entries
-            ]
+            # Stored entries passed validation on import, so they skip it here
+            entry_creates = schemas.construct_time_entries(
+                {
+                    'category': entry.category,
+                    'subcategory': entry.subcategory,
+                    'customer': normalize_customer_name(entry.customer),
+                    'project': normalize_project_id(entry.project),
+                    'task_description': entry.task_description,
+                    'hours': entry.hours,
+                    'date': entry.date
+                } for entry in entries
+            )
 
             created_entries = self._bulk_create_entries(entry_creates)
             logger.info(f"Successfully created {len(created_entries)} time entries")
@@ -158,6 +151,9 @@ class TimesheetService:
         except Exception as e:
             logger.error(f"Error processing timesheet: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            if spooled is not None:
+                spooled.close()
 
     def get_entries(self, skip: int = 0, limit: int = 100) -> List[TimeEntry]:
         """Get paginated time entries"""
@@ -177,18 +173,17 @@ class TimesheetService:
             raise HTTPException(status_code=500, detail=str(e))
 
     def update_entry(self, entry_id: int, entry: schemas.TimeEntryUpdate) -> TimeEntry:
-        """Update an existing time entry"""
-        db_entry = crud.get_time_entry(self.db, entry_id)
+        """Update an existing time entry with one UPDATE ... RETURNING"""
+        values = self.repository.with_reference_ids(self.db, entry.model_dump(exclude_unset=True))
+        db_entry = self.repository.update_returning(self.db, TimeEntry.id == entry_id, values)
         if not db_entry:
             raise HTTPException(status_code=404, detail="Time entry not found")
-        return crud.update_time_entry(self.db, db_entry, entry)
+        return db_entry
 
     def delete_entry(self, entry_id: int) -> Dict[str, str]:
-        """Delete a time entry"""
-        db_entry = crud.get_time_entry(self.db, entry_id)
-        if not db_entry:
+        """Delete a time entry with one DELETE ... RETURNING"""
+        if not self.repository.delete_returning(self.db, TimeEntry.id == entry_id):
             raise HTTPException(status_code=404, detail="Time entry not found")
-        crud.delete_time_entry(self.db, db_entry)
         return {"message": "Time entry deleted successfully"}
 
     def _process_dataframe(self, df: "pd.DataFrame") -> List[schemas.TimeEntryCreate]:
@@ -206,28 +201,34 @@ class TimesheetService:
                 detail=f"Missing required columns: {', '.join(missing_columns)}"
             )
 
-        valid_entries = []
-        for idx, row in df.iterrows():
-            try:
-                hours = float(row['Hours'])
-                if hours <= 0 or hours > 24:
-                    logger.warning(f"Invalid hours value in row {idx + 1}: {hours}")
-                    continue
-
-                entry_dict = {
-                    'week_number': int(row['Week Number']) if 'Week Number' in row else 0,
-                    'month': str(row['Month']) if 'Month' in row else '',
-                    'category': str(row['Category']),
-                    'subcategory': str(row['Subcategory']) if 'Subcategory' in row else '',
-                    'customer': normalize_customer_name(row['Customer']) if 'Customer' in row else None,
-                    'project': normalize_project_id(row['Project']) if 'Project' in row else None,
-                    'task_description': str(row['Task Description']) if 'Task Description' in row else '',
-                    'hours': hours,
-                    'date': pd.to_datetime(row['Date']).date()
-                }
-                valid_entries.append(schemas.TimeEntryCreate(**entry_dict))
-            except Exception as e:
-                logger.error(f"Error processing row {idx + 1}: {str(e)}")
-                continue
-
-        return valid_entries
\ No newline at end of file
+        df, rejects = FrameValidator.validate(df)
+        if not rejects.empty:
+            logger.warning(
+                f"Rejected {rejects['row'].nunique()} rows: "
+                f"{FrameValidator.summarize(FrameValidator.to_records(rejects))}"
+            )
+        df = XLSAnalyzer.clean_frame(df)
+        df = df[df['Hours'] > 0]
+
+        # FrameValidator has checked dates and hours, so entries skip pydantic validation
+        columns = zip(
+            df['Category'].fillna('').tolist(),
+            df['Subcategory'].fillna('').tolist(),
+            df['Customer'].tolist(),
+            df['Project'].tolist(),
+            df['Task Description'].fillna('').tolist(),
+            df['Hours'].tolist(),
+            df['Date'].dt.date.tolist()
+        )
+        return schemas.construct_time_entries(
+            {
+                'category': category,
+                'subcategory': subcategory,
+                'customer': normalize_customer_name(customer),
+                'project': normalize_project_id(project),
+                'task_description': description,
+                'hours': hours,
+                'date': entry_date
+            }
+            for category, subcategory, customer, project, description, hours, entry_date in columns
+        )
@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from models.baseModel import Base
 from database.database import get_db
+from database.calendar_repository import CalendarRepository
+from database.reference_cache import get_reference_cache
 from main import app
 
 # Import all models to ensure they're registered with SQLAlchemy
@@ -51,7 +53,13 @@ def test_db():
         session.execute(text("TRUNCATE TABLE projects RESTART IDENTITY CASCADE"))
         session.execute(text("TRUNCATE TABLE customers RESTART IDENTITY CASCADE"))
         session.execute(text("TRUNCATE TABLE project_managers RESTART IDENTITY CASCADE"))
+        session.execute(text("TRUNCATE TABLE upload_jobs RESTART IDENTITY CASCADE"))
+        session.execute(text("TRUNCATE TABLE upload_checkpoints RESTART IDENTITY CASCADE"))
         session.commit()
+        # calendar_days is reference data filled by its migration, so it is kept between tests
+        CalendarRepository().ensure_range(session)
+        # The truncated rows must not be served from the reference cache
+        get_reference_cache().clear()
     except Exception as e:
         session.rollback()
         raise e
@@ -67,6 +75,8 @@ def test_db():
         session.execute(text("TRUNCATE TABLE projects RESTART IDENTITY CASCADE"))
         session.execute(text("TRUNCATE TABLE customers RESTART IDENTITY CASCADE"))
         session.execute(text("TRUNCATE TABLE project_managers RESTART IDENTITY CASCADE"))
+        session.execute(text("TRUNCATE TABLE upload_jobs RESTART IDENTITY CASCADE"))
+        session.execute(text("TRUNCATE TABLE upload_checkpoints RESTART IDENTITY CASCADE"))
         session.commit()
         session.close()
 
@@ -114,7 +124,7 @@ def setup_test_data(test_db):
         project = Project(
             project_id="Project_Magic_Bullet",
             name="Project Magic Bullet",
-            customer="ECOLAB",  # Link to existing customer
+            customer_ref=customer,  # Link to existing customer
             project_manager="Test Manager",  # Link to existing manager
             status="active"
         )
@@ -0,0 +1,174 @@
+import pytest
+import pandas as pd
+from datetime import date
+from sqlalchemy import event, text
+from database.bulk_loader import TimeEntryBulkLoader
+from database.schemas import TimeEntryCreate
+from models.customerModel import Customer
+from models.timeEntry import TimeEntry
+from utils.time_entry_batch import TimeEntryBatch
+
+def test_bulk_loader_inserts_and_resolves_references(db_session, setup_test_data):
+    """Test that rows are inserted and unknown references are nulled"""
+    loader = TimeEntryBulkLoader(db_session)
+    entries = [
+        TimeEntryCreate(
+            category="Development",
+            subcategory="Backend",
+            customer="ECOLAB",
+            project="Project_Magic_Bullet",
+            task_description="Tab\tand\nnewline",
+            hours=8.0,
+            date=date(2024, 1, 15)
+        ),
+        TimeEntryCreate(
+            category="Development",
+            subcategory="Backend",
+            customer="Unknown Customer",
+            project="Unknown_Project",
+            task_description="Unknown references",
+            hours=4.0,
+            date=date(2024, 2, 1)
+        )
+    ]
+
+    result = loader.load(entries)
+    assert result["inserted"] == 2
+    assert result["rejected"] == []
+
+    rows = db_session.query(TimeEntry).filter(TimeEntry.id.in_(result["ids"])).order_by(TimeEntry.id).all()
+    assert rows[0].customer == "ECOLAB"
+    assert rows[0].project == "Project_Magic_Bullet"
+    assert rows[0].task_description == "Tab\tand\nnewline"
+    assert rows[0].week_number == 3
+    assert rows[0].month == "January"
+    assert rows[1].customer is None
+    assert rows[1].project is None
+    assert rows[1].month == "February"
+
+def test_bulk_loader_reports_rejects(db_session):
+    """Test that invalid rows are reported per row and not inserted"""
+    loader = TimeEntryBulkLoader(db_session)
+    rows = [
+        {"date": date(2024, 1, 1), "category": "Dev", "subcategory": "", "hours": 8.0},
+        {"date": None, "category": "Dev", "subcategory": "", "hours": 8.0},
+        {"date": date(2024, 1, 1), "category": "Dev", "subcategory": "", "hours": 30.0},
+    ]
+
+    result = loader.load(rows, first_row_number=2)
+    assert result["staged"] == 3
+    assert result["inserted"] == 1
+    assert result["rejected"] == [
+        {"row": 3, "column": "date", "reason": "missing date"},
+        {"row": 4, "column": "hours", "reason": "hours must be between 0 and 24"},
+    ]
+
+def test_bulk_loader_skips_duplicate_fingerprints(db_session, setup_test_data):
+    """Test that rows already loaded, or repeated in the same load, are skipped"""
+    loader = TimeEntryBulkLoader(db_session)
+    row = {
+        "date": date(2024, 1, 1), "category": "Dev", "subcategory": "Backend",
+        "customer": "ECOLAB", "project": "Project_Magic_Bullet",
+        "task_description": "API work", "hours": 8.0
+    }
+
+    first = loader.load([row, dict(row), dict(row, hours=4.0)])
+    assert first["inserted"] == 2
+    assert first["duplicates"] == 1
+
+    second = loader.load([row, dict(row, hours=4.0)])
+    assert second["inserted"] == 0
+    assert second["duplicates"] == 2
+    assert db_session.query(TimeEntry).count() == 2
+    assert all(len(entry.fingerprint) == 64 for entry in db_session.query(TimeEntry).all())
+
+def test_python_fingerprint_matches_stored_fingerprint(db_session, setup_test_data):
+    """Test that fingerprint() reproduces the hash computed in SQL"""
+    loader = TimeEntryBulkLoader(db_session)
+    entries = [
+        TimeEntryCreate(
+            category="Development",
+            subcategory=subcategory,
+            customer="ECOLAB",
+            project=project,
+            task_description=description,
+            hours=hours,
+            date=date(2024, 3, 1)
+        )
+        for subcategory, project, description, hours in [
+            ("Backend", "Project_Magic_Bullet", "Whole hours", 8.0),
+            ("", None, "Fractional hours", 7.25),
+            ("QA", "Project_Magic_Bullet", "Tiny value", 0.1),
+            ("QA", None, "Tab\tand \\ backslash", 0.00001)
+        ]
+    ]
+
+    result = loader.load(entries)
+    assert result["inserted"] == 4
+
+    rows = db_session.query(TimeEntry).filter(TimeEntry.id.in_(result["ids"])).order_by(TimeEntry.id).all()
+    assert [row.fingerprint for row in rows] == [TimeEntryBulkLoader.fingerprint(entry) for entry in entries]
+    assert loader.existing_fingerprints([rows[0].fingerprint, "0" * 64]) == {rows[0].fingerprint}
+
+def test_bulk_loader_loads_columnar_batch(db_session, setup_test_data):
+    """Test that a TimeEntryBatch loads with its source row numbers and matching fingerprints"""
+    loader = TimeEntryBulkLoader(db_session)
+    frame = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-03']),
+        'Category': ['Development', 'Development', None],
+        'Subcategory': ['Backend', None, 'QA'],
+        'Customer': ['ECOLAB', 'ECOLAB', None],
+        'Project': ['Project_Magic_Bullet', None, 'Project_Magic_Bullet'],
+        'Task Description': ['Tab\tand \\ backslash', 'Fractional hours', 'Too long'],
+        'Hours': [8.0, 7.25, 30.0]
+    }, index=[5, 9, 12])
+    batch = TimeEntryBatch.from_frame(frame)
+
+    result = loader.load(batch)
+    assert result["inserted"] == 2
+    assert result["rejected"] == [{"row": 12, "column": "hours", "reason": "hours must be between 0 and 24"}]
+
+    rows = db_session.query(TimeEntry).filter(TimeEntry.id.in_(result["ids"])).order_by(TimeEntry.id).all()
+    assert rows[0].task_description == "Tab\tand \\ backslash"
+    assert rows[1].subcategory == "General"
+    assert rows[1].project is None
+    assert TimeEntryBulkLoader.batch_fingerprints(batch) == [
+        TimeEntryBulkLoader.fingerprint(record) for record in batch.to_records()
+    ]
+    assert [row.fingerprint for row in rows] == TimeEntryBulkLoader.batch_fingerprints(batch)[:2]
+
+def test_bulk_loader_leaves_caller_transaction_on_failure(db_session, monkeypatch):
+    """Test that a failed load with commit=False does not roll back the caller's writes"""
+    db_session.add(Customer(name="Pending Customer"))
+    db_session.flush()
+
+    def failing_insert(self, load_id, deduplicate=True):
+        raise RuntimeError("insert failed")
+    monkeypatch.setattr(TimeEntryBulkLoader, "_insert_from_staging", failing_insert)
+
+    row = {"date": date(2024, 1, 1), "category": "Dev", "subcategory": "", "hours": 8.0}
+    with pytest.raises(RuntimeError):
+        TimeEntryBulkLoader(db_session).load([row], commit=False)
+    assert db_session.query(Customer).filter(Customer.name == "Pending Customer").count() == 1
+
+def test_bulk_loader_recreates_dropped_staging_table(db_session):
+    """Test that the staging table is created again when it disappears between loads"""
+    loader = TimeEntryBulkLoader(db_session)
+    row = {"date": date(2024, 1, 1), "category": "Dev", "subcategory": "", "hours": 8.0}
+    assert loader.load([row])["inserted"] == 1
+
+    db_session.execute(text(f"DROP TABLE {TimeEntryBulkLoader.STAGING_TABLE}"))
+    db_session.commit()
+    assert loader.load([dict(row, hours=4.0)])["inserted"] == 1
+
+def test_bulk_loader_skips_staging_ddl_when_table_exists(db_session):
+    """Test that loads do not run the locking staging DDL once the table exists"""
+    loader = TimeEntryBulkLoader(db_session)
+    row = {"date": date(2024, 1, 1), "category": "Dev", "subcategory": "", "hours": 8.0}
+    loader.load([row])
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+    loader.load([dict(row, hours=4.0)])
+    assert "CREATE" not in statements
@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from database.bulk_loader import TimeEntryBulkLoader
+from database import crud
+from database.calendar_repository import CalendarRepository
+from database.schemas import TimeEntryCreate
+from models.calendarDayModel import CalendarDay
+from models.timeEntry import TimeEntry
+from services.report_service import ReportService
+from services.time_entry_service import TimeEntryService
+from utils.calendar_days import calendar_attributes
+
+def _entry(entry_date, hours=8.0, task="Work"):
+    return {
+        "date": entry_date, "category": "Development", "subcategory": "Backend",
+        "customer": "ECOLAB", "project": "Project_Magic_Bullet",
+        "task_description": task, "hours": hours
+    }
+
+def test_calendar_attributes_follow_iso_weeks():
+    """Test that dates at a year boundary get the ISO week of the previous year"""
+    day = calendar_attributes(date(2021, 1, 3))
+    assert (day.iso_year, day.iso_week) == (2020, 53)
+    assert (day.year, day.month, day.month_name, day.quarter) == (2021, 1, 'January', 1)
+    assert (day.fiscal_year, day.fiscal_period) == (2021, 1)
+    assert day.is_workday is False
+
+def test_calendar_table_matches_python_rules(db_session):
+    """Test that calendar rows filled in SQL agree with calendar_attributes"""
+    days = db_session.query(CalendarDay).filter(
+        CalendarDay.date.between(date(2020, 12, 25), date(2021, 1, 10))
+    ).order_by(CalendarDay.date).all()
+
+    assert len(days) == 17
+    for day in days:
+        row = tuple(getattr(day, column) for column in CalendarRepository.COLUMNS)
+        assert row == tuple(calendar_attributes(day.date))
+    assert CalendarRepository().period_bounds(db_session, iso_year=2020, iso_week=53) == (
+        date(2020, 12, 28), date(2021, 1, 3)
+    )
+
+def test_bulk_loader_derives_week_and_month_outside_calendar_range(db_session, setup_test_data):
+    """Test that loading a date outside the filled range adds its calendar day"""
+    result = TimeEntryBulkLoader(db_session).load([_entry(date(1999, 12, 31))])
+
+    entry = db_session.query(TimeEntry).filter(TimeEntry.id.in_(result["ids"])).one()
+    assert (entry.week_number, entry.month) == (52, "December")
+    assert db_session.get(CalendarDay, date(1999, 12, 31)).iso_year == 1999
+
+def test_weekly_report_groups_by_iso_week(db_session, setup_test_data):
+    """Test that the weekly report sums the hours of the calendar week only"""
+    TimeEntryBulkLoader(db_session).load([
+        _entry(date(2024, 10, 7), 8.0, "Monday"),
+        _entry(date(2024, 10, 13), 2.5, "Sunday"),
+        _entry(date(2024, 10, 14), 4.0, "Next week")
+    ])
+
+    report = ReportService(db_session).get_weekly_report(datetime(2024, 10, 9))
+
+    assert report.week_number == 41
+    assert report.month == "October"
+    assert report.total_hours == 10.5
+    assert [entry.project for entry in report.entries] == ["Project_Magic_Bullet"]
+
+def test_single_entry_writes_extend_the_calendar(db_session, setup_test_data):
+    """Test that entries created or moved outside the filled range still show up in reports"""
+    service = TimeEntryService(db_session)
+    created = service.create_time_entry(TimeEntryCreate(**_entry(date(1998, 6, 15))))
+    moved = service.create_time_entry(TimeEntryCreate(**_entry(date(2024, 10, 7), task="Moved")))
+    service.entry_repo.update_returning(db_session, TimeEntry.id == moved.id, {"date": date(2060, 3, 2)})
+
+    assert db_session.get(CalendarDay, created.date) is not None
+    assert ReportService(db_session).get_monthly_report(1998, 6).total_hours == 8.0
+    assert ReportService(db_session).get_monthly_report(2060, 3).total_hours == 8.0
+
+def test_summaries_for_years_without_calendar_days_are_empty(db_session):
+    """Test that months and weeks the calendar does not cover return empty summaries"""
+    assert crud.get_time_entries_by_month(db_session, "March", 1985).total_hours == 0
+    assert crud.get_time_entries_by_week(db_session, 10, 1985).entries == []
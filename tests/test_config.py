@@ -4,6 +4,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from database.database import Base, get_db
+from database.reference_cache import get_reference_cache
 from main import app
 
 # Use the actual database URL from environment variables
@@ -51,6 +52,7 @@ def test_db():
         for table in reversed(Base.metadata.sorted_tables):
             session.execute(table.delete())
         session.commit()
+        get_reference_cache().clear()
     except Exception as e:
         session.rollback()
         raise e
@@ -63,4 +65,5 @@ def test_db():
         for table in reversed(Base.metadata.sorted_tables):
             session.execute(table.delete())
         session.commit()
+        get_reference_cache().clear()
         session.close()
\ No newline at end of file
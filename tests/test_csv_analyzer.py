@@ -0,0 +1,57 @@
+import pytest
+from utils.csv_analyzer import CSVAnalyzer
+
+CSV_HEADER = "Week Number,Month,Category,Subcategory,Customer,Project,Task Description,Hours,Date\n"
+
+def test_csv_analyzer_detects_delimiter_and_encoding():
+    """Test that tab-separated cp1252 files are detected from the sample"""
+    contents = (
+        CSV_HEADER.replace(',', '\t')
+        + "41\tOctober\tDevelopment\tBackend\tCafé Co\t-\tAPI work\t8\t2024-10-07\n"
+    ).encode('cp1252')
+
+    encoding, delimiter = CSVAnalyzer.detect_format(contents)
+    assert encoding == 'cp1252'
+    assert delimiter == '\t'
+
+    frames = list(CSVAnalyzer.iter_raw_frames(contents))
+    assert len(frames) == 1
+    record = frames[0].iloc[0]
+    assert record['Customer'] == 'Café Co'
+    assert record['Hours'] == '8'
+    assert record['Date'] == '2024-10-07'
+
+def test_csv_analyzer_streams_chunks():
+    """Test that CSV files are read in bounded chunks numbered by source row"""
+    rows = "".join(
+        f"41,October,Development,Backend,ECOLAB,Project_Magic_Bullet,Task {i},1.5,2024-10-07\n"
+        for i in range(25)
+    )
+    contents = (CSV_HEADER + rows + ",,,,,,,,\n").encode('utf-8')
+
+    assert CSVAnalyzer.count_rows(contents) == 26
+    frames = list(CSVAnalyzer.iter_raw_frames(contents, batch_size=10))
+    assert [len(frame) for frame in frames] == [10, 10, 6]
+    assert frames[2].loc[26, 'Task Description'] == 'Task 24'
+
+def test_csv_analyzer_empty_file():
+    """Test that empty CSV files are rejected"""
+    with pytest.raises(ValueError):
+        list(CSVAnalyzer.iter_raw_frames(b''))
+
+def test_csv_analyzer_resumes_at_line_offset():
+    """Test that frames record the lines they end on and a parse resumes from them"""
+    contents = (
+        CSV_HEADER
+        + '41,October,Development,Backend,ECOLAB,-,"Task 0\nwrapped",1,2024-10-07\n'
+        + "\n"
+        + "".join(f"41,October,Development,Backend,ECOLAB,-,Task {i},1,2024-10-07\n" for i in range(1, 4))
+    ).encode('utf-8')
+
+    frames = list(CSVAnalyzer.iter_raw_frames(contents, batch_size=2))
+    assert [list(frame.index) for frame in frames] == [[2, 3], [4, 5], [6]]
+    assert [frame.attrs['end_line'] for frame in frames] == [4, 6, 7]
+
+    resumed = list(CSVAnalyzer.iter_raw_frames(contents, batch_size=2, start_row=4, start_line=4))
+    assert [list(frame.index) for frame in resumed] == [[4, 5], [6]]
+    assert list(resumed[0]['Task Description']) == ['Task 1', 'Task 2']
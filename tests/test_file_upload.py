@@ -1,9 +1,17 @@
 import pytest
+import asyncio
+import hashlib
+from io import BytesIO
+from fastapi import UploadFile
 from fastapi.testclient import TestClient
 from main import app
 import pandas as pd
 from pathlib import Path
 import logging
+from database.bulk_loader import TimeEntryBulkLoader
+from models.uploadCheckpointModel import UploadCheckpoint
+from services.time_entry_service import TimeEntryService
+from utils.upload_spool import check_content_length, spool_upload, UploadTooLargeError
 from utils.xls_analyzer import XLSAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -15,6 +23,14 @@ def create_test_excel(tmp_path, data):
     df.to_excel(excel_file, index=False)
     return excel_file
 
+def create_test_workbook(tmp_path, sheets):
+    """Helper function to create a test Excel file with a worksheet per entry of sheets"""
+    excel_file = tmp_path / "workbook.xlsx"
+    with pd.ExcelWriter(excel_file) as writer:
+        for name, data in sheets.items():
+            pd.DataFrame(data).to_excel(writer, sheet_name=name, index=False)
+    return excel_file
+
 @pytest.fixture
 def valid_timesheet_data():
     """Fixture for valid timesheet data"""
@@ -214,4 +230,320 @@ def test_upload_excel_new_entities(client, setup_test_data, tmp_path):
     response = client.get("/projects/NEW_PROJECT")
     assert response.status_code == 200
     assert response.json()["project_id"] == "NEW_PROJECT"
-    assert response.json()["customer"] == "NEW_CUSTOMER"
\ No newline at end of file
+    assert response.json()["customer"] == "NEW_CUSTOMER"
+
+def test_upload_status_reports_job_progress(test_client, setup_test_data, tmp_path, valid_timesheet_data):
+    """Test that the status endpoint serves the recorded job progress"""
+    excel_file = create_test_excel(tmp_path, valid_timesheet_data)
+
+    with open(excel_file, "rb") as f:
+        response = test_client.post(
+            "/time-entries/upload/",
+            files={"file": ("test.xlsx", f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+    assert response.status_code == 202
+    progress_key = response.json()["progress_key"]
+
+    # TestClient runs background tasks before returning the response
+    response = test_client.get(f"/time-entries/upload/{progress_key}/status")
+    assert response.status_code == 200
+    status = response.json()
+    assert status["state"] == "completed"
+    assert status["filename"] == "test.xlsx"
+    assert status["rows_processed"] == 2
+    assert status["rows_rejected"] == 0
+    assert status["progress"] == 100.0
+    assert status["eta_seconds"] == 0.0
+
+def test_upload_status_unknown_key(test_client):
+    """Test that unknown progress keys return 404"""
+    response = test_client.get("/time-entries/upload/upload_missing/status")
+    assert response.status_code == 404
+
+def test_spool_upload_checks_size_and_hash_in_place():
+    """Test that uploads are size-checked and hashed without copying them"""
+    upload = UploadFile(file=BytesIO(b"x" * 5000), filename="big.xlsx")
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload, max_bytes=4096, chunk_size=1024))
+
+    received = BytesIO(b"x" * 3000)
+    upload = UploadFile(file=received, filename="small.xlsx")
+    spooled, size, file_hash = asyncio.run(spool_upload(upload, max_bytes=4096, chunk_size=1024))
+    assert spooled is received
+    assert size == 3000
+    assert file_hash == hashlib.sha256(b"x" * 3000).hexdigest()
+
+    # Closing the upload, as FastAPI does when the endpoint returns, leaves the file open
+    asyncio.run(upload.close())
+    assert spooled.read() == b"x" * 3000
+    spooled.close()
+
+
+def test_check_content_length_rejects_declared_oversize():
+    """Test that a declared body over the limit is refused before it is read"""
+    with pytest.raises(UploadTooLargeError):
+        check_content_length("5000", max_bytes=4096)
+    check_content_length("4096", max_bytes=4096)
+    check_content_length(None, max_bytes=4096)
+    check_content_length("not a number", max_bytes=4096)
+
+
+def test_upload_rejects_file_over_configured_limit(test_client, tmp_path, valid_timesheet_data, monkeypatch):
+    """Test that the upload limit is configurable and returns 413"""
+    monkeypatch.setenv("MAX_UPLOAD_SIZE_MB", "0")
+    excel_file = create_test_excel(tmp_path, valid_timesheet_data)
+
+    with open(excel_file, "rb") as f:
+        response = test_client.post(
+            "/time-entries/upload/",
+            files={"file": ("test.xlsx", f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+    assert response.status_code == 413
+    assert "exceeds" in response.json()["detail"]
+
+def test_upload_csv_processes_entries(test_client, setup_test_data):
+    """Test that the CSV endpoint loads entries and tracks the job"""
+    contents = (
+        "Week Number,Month,Category,Subcategory,Customer,Project,Task Description,Hours,Date\n"
+        "41,October,Development,Backend,ECOLAB,Project_Magic_Bullet,API Development,8,2024-10-07\n"
+        "41,October,Testing,QA,ECOLAB,Project_Magic_Bullet,Integration Testing,4,2024-10-07\n"
+    ).encode('utf-8')
+
+    response = test_client.post(
+        "/time-entries/upload-csv",
+        files={"file": ("test.csv", contents, "text/csv")}
+    )
+    assert response.status_code == 202
+    data = response.json()
+    assert data["total_records"] == 2
+
+    status = test_client.get(f"/time-entries/upload/{data['progress_key']}/status").json()
+    assert status["state"] == "completed"
+    assert status["rows_processed"] == 2
+
+def test_reupload_of_imported_file_short_circuits(test_client, setup_test_data, tmp_path, valid_timesheet_data):
+    """Test that uploading the same file twice does not import it again"""
+    excel_file = create_test_excel(tmp_path, valid_timesheet_data)
+    contents = excel_file.read_bytes()
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    first = test_client.post("/time-entries/upload/", files={"file": ("test.xlsx", contents, content_type)})
+    assert first.status_code == 202
+
+    second = test_client.post("/time-entries/upload/", files={"file": ("copy.xlsx", contents, content_type)})
+    assert second.status_code == 200
+    assert second.json()["message"] == "File already imported"
+    assert second.json()["progress_key"] == first.json()["progress_key"]
+
+    entries = test_client.get("/time-entries").json()
+    assert len(entries) == 2
+
+def _employee_sheets(valid_timesheet_data):
+    alice = dict(valid_timesheet_data)
+    bob = {**valid_timesheet_data, 'Task Description': ['Code Review', 'Release'], 'Hours': [2.0, 1.0]}
+    carol = {**valid_timesheet_data, 'Task Description': ['Planning', 'Support'], 'Hours': [3.0, 5.0]}
+    return {'Alice': alice, 'Bob': bob, 'Carol': carol}
+
+def test_upload_all_sheets_tracks_progress_per_sheet(test_client, setup_test_data, tmp_path, valid_timesheet_data):
+    """Test that every worksheet is ingested into one job with per-sheet counters"""
+    excel_file = create_test_workbook(tmp_path, _employee_sheets(valid_timesheet_data))
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    with open(excel_file, "rb") as f:
+        response = test_client.post(
+            "/time-entries/upload/",
+            params={"all_sheets": "true"},
+            files={"file": ("workbook.xlsx", f, content_type)}
+        )
+    assert response.status_code == 202
+    assert response.json()["total_records"] == 6
+
+    status = test_client.get(f"/time-entries/upload/{response.json()['progress_key']}/status").json()
+    assert status["state"] == "completed"
+    assert status["rows_processed"] == 6
+    assert list(status["sheets"]) == ["Alice", "Bob", "Carol"]
+    assert all(sheet["rows_processed"] == 2 for sheet in status["sheets"].values())
+    assert all(sheet["progress"] == 100.0 for sheet in status["sheets"].values())
+
+def test_upload_selected_sheets(test_client, setup_test_data, tmp_path, valid_timesheet_data):
+    """Test that only the requested worksheets are ingested"""
+    excel_file = create_test_workbook(tmp_path, _employee_sheets(valid_timesheet_data))
+    contents = excel_file.read_bytes()
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    response = test_client.post(
+        "/time-entries/upload/",
+        params=[("sheets", "Carol"), ("sheets", "Bob")],
+        files={"file": ("workbook.xlsx", contents, content_type)}
+    )
+    assert response.status_code == 202
+    status = test_client.get(f"/time-entries/upload/{response.json()['progress_key']}/status").json()
+    assert list(status["sheets"]) == ["Bob", "Carol"]
+    assert status["rows_processed"] == 4
+
+    # A different selection of an imported file is still imported
+    response = test_client.post(
+        "/time-entries/upload/",
+        params={"sheets": "Alice"},
+        files={"file": ("workbook.xlsx", contents, content_type)}
+    )
+    assert response.status_code == 202
+
+    response = test_client.post(
+        "/time-entries/upload/",
+        params={"sheets": "Dave"},
+        files={"file": ("workbook.xlsx", contents, content_type)}
+    )
+    assert response.status_code == 400
+    assert "Dave" in response.json()["detail"]
+
+def test_upload_dry_run_reports_counts_without_writing(test_client, setup_test_data, tmp_path, valid_timesheet_data):
+    """Test that a dry run previews rejects, new references and duplicates but writes nothing"""
+    data = {key: list(values) for key, values in valid_timesheet_data.items()}
+    data['Customer'].append('NEW_CUSTOMER')
+    data['Project'].append('NEW_PROJECT')
+    data['Task Description'].append('Overtime')
+    data['Hours'].append(30.0)
+    data['Date'].append('2024-10-08')
+    data['Week Number'].append(41)
+    data['Month'].append('October')
+    data['Category'].append('Development')
+    data['Subcategory'].append('Backend')
+    data['Customer'].append('NEW_CUSTOMER')
+    data['Project'].append('NEW PROJECT')
+    data['Task Description'].append('API Development')
+    data['Hours'].append(8.0)
+    data['Date'].append('2024-10-08')
+    data['Week Number'].append(41)
+    data['Month'].append('October')
+    data['Category'].append('Development')
+    data['Subcategory'].append('Backend')
+    contents = create_test_excel(tmp_path, data).read_bytes()
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    response = test_client.post(
+        "/time-entries/upload/",
+        params={"dry_run": "true"},
+        files={"file": ("test.xlsx", contents, content_type)}
+    )
+    assert response.status_code == 200
+    preview = response.json()
+    assert preview["dry_run"] is True
+    assert preview["rows_accepted"] == 3
+    assert preview["rows_rejected"] == 1
+    assert preview["rejected_by_reason"] == {"hours must be between 0 and 24": 1}
+    assert preview["rows_duplicate"] == 0
+    assert preview["new_customers"] == ["NEW_CUSTOMER"]
+    assert preview["new_projects"] == ["NEW_PROJECT"]
+    assert preview["already_imported"] is False
+
+    # Nothing was written
+    assert test_client.get("/time-entries").json() == []
+    assert test_client.get("/customers/NEW_CUSTOMER").status_code == 404
+
+    response = test_client.post("/time-entries/upload/", files={"file": ("test.xlsx", contents, content_type)})
+    assert response.status_code == 202
+    assert len(test_client.get("/time-entries").json()) == 3
+
+    preview = test_client.post(
+        "/time-entries/upload/",
+        params={"dry_run": "true"},
+        files={"file": ("test.xlsx", contents, content_type)}
+    ).json()
+    assert preview["already_imported"] is True
+    assert preview["rows_accepted"] == 0
+    assert preview["rows_duplicate"] == 3
+    assert preview["new_customers"] == []
+
+def test_resume_upload_continues_after_last_checkpoint(test_client, setup_test_data, test_db, monkeypatch):
+    """Test that an interrupted upload resumes after its last committed chunk without duplicates"""
+    monkeypatch.setattr(TimeEntryService, "UPLOAD_CHUNK_SIZE", 10)
+    contents = (
+        "Week Number,Month,Category,Subcategory,Customer,Project,Task Description,Hours,Date\n" + "".join(
+            f"41,October,Development,Backend,ECOLAB,Project_Magic_Bullet,Task {i},1,2024-10-07\n"
+            for i in range(25)
+        )
+    ).encode('utf-8')
+
+    # Simulate the database going away while the second chunk is loaded
+    original_load = TimeEntryBulkLoader.load
+    calls = []
+    def failing_load(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return original_load(self, *args, **kwargs)
+    monkeypatch.setattr(TimeEntryBulkLoader, "load", failing_load)
+
+    response = test_client.post("/time-entries/upload-csv", files={"file": ("test.csv", contents, "text/csv")})
+    progress_key = response.json()["progress_key"]
+    status = test_client.get(f"/time-entries/upload/{progress_key}/status").json()
+    assert status["state"] == "failed"
+    assert status["rows_processed"] == 10
+
+    response = test_client.post(
+        f"/time-entries/upload/{progress_key}/resume",
+        files={"file": ("test.csv", contents, "text/csv")}
+    )
+    assert response.status_code == 202
+    assert response.json()["rows_committed"] == 10
+
+    status = test_client.get(f"/time-entries/upload/{progress_key}/status").json()
+    assert status["state"] == "completed"
+    assert status["rows_processed"] == 25
+    assert status["rows_duplicate"] == 0
+    assert len(test_client.get("/time-entries").json()) == 25
+
+    checkpoints = test_db.query(UploadCheckpoint).filter(
+        UploadCheckpoint.progress_key == progress_key
+    ).order_by(UploadCheckpoint.chunk_index).all()
+    assert [(c.chunk_index, c.first_row, c.last_row) for c in checkpoints] == [(0, 2, 11), (1, 12, 21), (2, 22, 26)]
+
+    # Completed uploads cannot be resumed
+    response = test_client.post(
+        f"/time-entries/upload/{progress_key}/resume",
+        files={"file": ("test.csv", contents, "text/csv")}
+    )
+    assert response.status_code == 409
+
+def test_resume_csv_upload_seeks_past_multiline_rows(test_client, setup_test_data, test_db, monkeypatch):
+    """Test that a CSV upload resumes at the right row when rows span several lines or are blank"""
+    monkeypatch.setattr(TimeEntryService, "UPLOAD_CHUNK_SIZE", 10)
+    rows = [f"41,October,Development,Backend,ECOLAB,Project_Magic_Bullet,Task {i},1,2024-10-07\n" for i in range(25)]
+    rows[3] = '41,October,Development,Backend,ECOLAB,Project_Magic_Bullet,"Task 3\nsecond line",1,2024-10-07\n'
+    rows.insert(6, "\n")
+    contents = (
+        "Week Number,Month,Category,Subcategory,Customer,Project,Task Description,Hours,Date\n" + "".join(rows)
+    ).encode('utf-8')
+
+    original_load = TimeEntryBulkLoader.load
+    calls = []
+    def failing_load(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return original_load(self, *args, **kwargs)
+    monkeypatch.setattr(TimeEntryBulkLoader, "load", failing_load)
+
+    response = test_client.post("/time-entries/upload-csv", files={"file": ("test.csv", contents, "text/csv")})
+    progress_key = response.json()["progress_key"]
+    assert test_client.get(f"/time-entries/upload/{progress_key}/status").json()["rows_processed"] == 9
+
+    response = test_client.post(
+        f"/time-entries/upload/{progress_key}/resume",
+        files={"file": ("test.csv", contents, "text/csv")}
+    )
+    assert response.status_code == 202
+
+    status = test_client.get(f"/time-entries/upload/{progress_key}/status").json()
+    assert status["state"] == "completed"
+    assert status["rows_processed"] == 25
+    assert status["rows_duplicate"] == 0
+    descriptions = sorted(entry["task_description"] for entry in test_client.get("/time-entries").json())
+    assert descriptions == sorted(["Task 3\nsecond line"] + [f"Task {i}" for i in range(25) if i != 3])
+
+    checkpoints = test_db.query(UploadCheckpoint).filter(
+        UploadCheckpoint.progress_key == progress_key
+    ).order_by(UploadCheckpoint.chunk_index).all()
+    # The blank line is row 8; the quoted line break puts each later row one line further down
+    assert [(c.first_row, c.last_row, c.end_line) for c in checkpoints] == [(2, 11, 12), (12, 21, 22), (22, 27, 28)]
@@ -0,0 +1,62 @@
+import pandas as pd
+from utils.frame_validator import FrameValidator
+
+def _raw_frame(**overrides):
+    data = {
+        'Week Number': [41, 41, 41],
+        'Month': ['October', 'October', 'October'],
+        'Category': ['Development', 'Testing', 'Support'],
+        'Hours': [8.0, 4.0, 2.0],
+        'Date': ['2024-10-07', '2024-10-08', '2024-10-09']
+    }
+    data.update(overrides)
+    return pd.DataFrame(data, index=pd.RangeIndex(2, 5))
+
+def test_validator_accepts_valid_rows():
+    """Test that a clean frame passes without rejects"""
+    valid, rejects = FrameValidator.validate(_raw_frame())
+    assert len(valid) == 3
+    assert rejects.empty
+
+def test_validator_reports_each_failing_cell():
+    """Test that every failing cell is reported with its row number and reason"""
+    frame = _raw_frame(
+        Hours=['8', 'lots', 25],
+        Date=['2024-10-07', None, 'not a date'],
+        **{'Week Number': [41, 0, 41.5]},
+        Month=['october', '13', 'Smarch']
+    )
+    valid, rejects = FrameValidator.validate(frame)
+
+    assert valid.index.tolist() == [2]
+    assert FrameValidator.to_records(rejects) == [
+        {'row': 3, 'column': 'Date', 'reason': 'missing date'},
+        {'row': 3, 'column': 'Hours', 'reason': 'invalid hours'},
+        {'row': 3, 'column': 'Week Number', 'reason': 'week number must be between 1 and 53'},
+        {'row': 3, 'column': 'Month', 'reason': 'invalid month'},
+        {'row': 4, 'column': 'Date', 'reason': 'invalid date'},
+        {'row': 4, 'column': 'Hours', 'reason': 'hours must be between 0 and 24'},
+        {'row': 4, 'column': 'Week Number', 'reason': 'week number must be between 1 and 53'},
+        {'row': 4, 'column': 'Month', 'reason': 'invalid month'}
+    ]
+    assert FrameValidator.summarize(FrameValidator.to_records(rejects))['invalid month'] == 2
+
+def test_validator_skips_blank_rows_and_optional_columns():
+    """Test that empty rows are dropped silently and blank optional cells pass"""
+    frame = _raw_frame(
+        Category=['Development', None, '-'],
+        Hours=[8.0, None, 1.0],
+        Date=['2024-10-07', None, '2024-10-09'],
+        **{'Week Number': [None, None, '-']},
+        Month=['', None, 'N/A']
+    )
+    valid, rejects = FrameValidator.validate(frame)
+    assert valid.index.tolist() == [2, 4]
+    assert rejects.empty
+
+def test_validator_rejects_rows_without_required_columns():
+    """Test that a frame missing the hours column rejects every row"""
+    frame = _raw_frame().drop(columns=['Hours'])
+    valid, rejects = FrameValidator.validate(frame)
+    assert valid.empty
+    assert rejects['reason'].unique().tolist() == ['missing hours']
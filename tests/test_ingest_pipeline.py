@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from utils.ingest_pipeline import IngestPipeline, PipelineStage
+
+async def _numbers(count, pulled):
+    for number in range(count):
+        pulled.append(number)
+        yield number
+
+def test_pipeline_keeps_order_and_throttles_the_source():
+    """Test that a blocked last stage stops the source once the queues and stages are full"""
+    # Two queues and two stages hold an item each, plus one waiting in the feeder
+    capacity = 5
+    written = []
+    in_flight = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        release = asyncio.Event()
+
+        async def source():
+            for number in range(50):
+                # Items pulled but not yet written, this one included
+                in_flight.append(number + 1 - len(written))
+                if number + 1 == capacity:
+                    release.set()
+                yield number
+
+        def write(item):
+            # The writer holds its first item until the source has filled the pipeline
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+            written.append(item)
+
+        pipeline = IngestPipeline(
+            [PipelineStage('double', lambda item: item * 2), PipelineStage('write', write)],
+            queue_size=1
+        )
+        return await pipeline.run(source())
+
+    completed = asyncio.run(run())
+
+    assert max(in_flight) == capacity
+    assert completed == 50
+    assert written == [number * 2 for number in range(50)]
+
+def test_pipeline_stops_on_stage_failure():
+    """Test that a failing stage stops the source and raises to the caller"""
+    pulled = []
+
+    def fail_on_three(item):
+        if item == 3:
+            raise RuntimeError("database went away")
+        return item
+
+    pipeline = IngestPipeline([PipelineStage('write', fail_on_three)], queue_size=1)
+
+    with pytest.raises(RuntimeError, match="database went away"):
+        asyncio.run(pipeline.run(_numbers(100, pulled)))
+    assert len(pulled) < 10
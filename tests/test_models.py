@@ -13,8 +13,8 @@ def test_time_entry_creation():
         month="October",
         category="Other",
         subcategory="Other Training",
-        customer="Unassigned",
-        project="Unassigned",
+        customer_ref=Customer(name="Unassigned"),
+        project_ref=Project(project_id="Unassigned"),
         task_description="Test task",
         hours=8.0,
         date=date(2024, 10, 7)
@@ -55,7 +55,7 @@ def test_project_creation():
     project = Project(
         project_id="TEST_001",
         name="Test Project",
-        customer="Test Customer",
+        customer_ref=Customer(name="Test Customer"),
         description="Test Description",
         project_manager="Test Manager",
         status="active"
@@ -81,7 +81,7 @@ def test_project_default_status():
     project = Project(
         project_id="TEST_001",
         name="Test Project",
-        customer="Test Customer"
+        customer_ref=Customer(name="Test Customer")
     )
     assert project.status == "active"
 
@@ -93,12 +93,12 @@ def test_time_entry_repr():
         month="October",
         category="Other",
         subcategory="Other Training",
-        customer="Test Customer",
-        project="TEST_001",
+        customer_id=3,
+        project_id=7,
         hours=8.0,
         date=date(2024, 10, 7)
     )
-    expected = "<TimeEntry(id=1, date=2024-10-07, hours=8.0, project=TEST_001)>"
+    expected = "<TimeEntry(id=1, date=2024-10-07, hours=8.0, project_id=7)>"
     assert str(entry) == expected
 
 def test_project_repr():
@@ -132,4 +132,18 @@ def test_model_timestamps(db_session):
     db_session.refresh(customer)  # Refresh to get the latest timestamp
 
     assert customer.updated_at is not None
-    assert customer.updated_at > customer.created_at
\ No newline at end of file
+    assert customer.updated_at > customer.created_at
+
+def test_creation_timestamps_are_ordered_without_sleeping():
+    """Test that models built back to back get strictly increasing created_at values"""
+    import time
+    start = time.perf_counter()
+    entries = [
+        TimeEntry(category="Other", subcategory="General", hours=1.0, date=date(2024, 10, 7))
+        for _ in range(2000)
+    ]
+    elapsed = time.perf_counter() - start
+
+    timestamps = [entry.created_at for entry in entries]
+    assert all(earlier < later for earlier, later in zip(timestamps, timestamps[1:]))
+    assert elapsed < 2
@@ -0,0 +1,190 @@
+import asyncio
+import time
+import pytest
+import pandas as pd
+from tests.test_file_upload import create_test_excel, create_test_workbook
+from utils.parse_pool import ParsedBatchStream, ParsePoolBusy, SheetBatchStreams, first_batch, shutdown_parse_pools
+from utils.frame_validator import FrameValidator
+
+def _timesheet_data(rows):
+    return {
+        'Week Number': [41] * rows,
+        'Month': ['October'] * rows,
+        'Category': ['Development'] * rows,
+        'Subcategory': ['Backend'] * rows,
+        'Customer': ['ECOLAB'] * rows,
+        'Project': ['Project_Magic_Bullet'] * rows,
+        'Task Description': [f'Task {i}' for i in range(rows)],
+        'Hours': [1.0] * rows,
+        'Date': ['2024-10-07'] * rows
+    }
+
+async def _collect(source, batch_size):
+    stream = await ParsedBatchStream.start(source, batch_size=batch_size)
+    batches = [batch async for batch in stream]
+    return stream.total_rows, batches
+
+@pytest.mark.parametrize("process_min_bytes", ["1000000000", "0"], ids=["thread", "process"])
+def test_excel_batch_stream_parses_off_loop(tmp_path, monkeypatch, process_min_bytes):
+    """Test that workbooks are streamed back in batches from either pool"""
+    monkeypatch.setenv("PARSE_PROCESS_MIN_BYTES", process_min_bytes)
+    excel_file = create_test_excel(tmp_path, _timesheet_data(25))
+
+    with open(excel_file, "rb") as f:
+        total_rows, batches = asyncio.run(_collect(f, batch_size=10))
+
+    assert total_rows == 25
+    assert [len(batch.entries) for batch in batches] == [10, 10, 5]
+    assert batches[0].entries.to_records()[0]['customer'] == 'ECOLAB'
+    assert batches[2].entries.to_records()[-1]['task_description'] == 'Task 24'
+    assert all(not batch.rejects for batch in batches)
+
+def test_batch_stream_reports_rejected_rows(tmp_path):
+    """Test that rows failing validation arrive as rejects with their row numbers"""
+    data = _timesheet_data(6)
+    data['Hours'][1] = 30.0
+    data['Date'][4] = 'not a date'
+    excel_file = create_test_excel(tmp_path, data)
+
+    total_rows, batches = asyncio.run(_collect(excel_file.read_bytes(), batch_size=3))
+
+    assert [len(batch.entries) for batch in batches] == [2, 2]
+    assert batches[0].entries.rows.tolist() == [2, 4]
+    assert batches[0].rejects == [{'row': 3, 'column': 'Hours', 'reason': 'hours must be between 0 and 24'}]
+    assert batches[1].rejects == [{'row': 6, 'column': 'Date', 'reason': 'invalid date'}]
+
+@pytest.mark.parametrize("parser", ["excel", "csv"])
+def test_batch_stream_resumes_at_start_row(tmp_path, parser):
+    """Test that a resumed stream skips earlier rows and reports the row range of each batch"""
+    data = _timesheet_data(25)
+    if parser == 'excel':
+        source = create_test_excel(tmp_path, data).read_bytes()
+    else:
+        source = pd.DataFrame(data).to_csv(index=False).encode('utf-8')
+
+    async def collect():
+        stream = await ParsedBatchStream.start(source, batch_size=10, parser=parser, start_row=12)
+        return stream.total_rows, [batch async for batch in stream]
+
+    total_rows, batches = asyncio.run(collect())
+
+    assert total_rows == 25
+    assert [(batch.first_row, batch.last_row) for batch in batches] == [(12, 21), (22, 26)]
+    assert batches[0].entries.to_records()[0]['task_description'] == 'Task 10'
+    assert batches[1].entries.to_records()[-1]['task_description'] == 'Task 24'
+
+def test_batch_stream_fails_fast_when_pool_is_busy(tmp_path, monkeypatch):
+    """Test that a stream waiting behind busy workers gives up instead of hanging"""
+    monkeypatch.setenv("PARSE_POOL_WORKERS", "1")
+    monkeypatch.setenv("PARSE_QUEUE_SIZE", "1")
+    monkeypatch.setenv("PARSE_RECEIVE_TIMEOUT_SECONDS", "1")
+    monkeypatch.setenv("PARSE_PROCESS_MIN_BYTES", "1000000000")
+    source = create_test_excel(tmp_path, _timesheet_data(20)).read_bytes()
+
+    async def start_two():
+        # The first stream is never consumed, so its worker holds the only thread
+        busy = await ParsedBatchStream.start(source, batch_size=2)
+        waiting = await ParsedBatchStream.start(source, batch_size=2)
+        try:
+            with pytest.raises(ParsePoolBusy):
+                await first_batch(waiting.batches())
+        finally:
+            await busy.aclose()
+            await waiting.aclose()
+
+    shutdown_parse_pools()
+    try:
+        asyncio.run(asyncio.wait_for(start_two(), timeout=30))
+    finally:
+        shutdown_parse_pools()
+
+def test_admitted_stream_waits_past_the_receive_timeout(tmp_path, monkeypatch):
+    """Test that the receive timeout only applies to the first batch, so running uploads do not fail"""
+    monkeypatch.setenv("PARSE_RECEIVE_TIMEOUT_SECONDS", "1")
+    monkeypatch.setenv("PARSE_PROCESS_MIN_BYTES", "1000000000")
+    source = create_test_excel(tmp_path, _timesheet_data(4)).read_bytes()
+    validate = FrameValidator.validate
+    calls = []
+
+    def slow_validate(frame):
+        calls.append(frame)
+        if len(calls) > 1:
+            time.sleep(1.5)
+        return validate(frame)
+    monkeypatch.setattr(FrameValidator, "validate", slow_validate)
+
+    async def consume():
+        stream = await ParsedBatchStream.start(source, batch_size=2)
+        batches = stream.batches()
+        first = await first_batch(batches)
+        return [first] + [item async for item in batches]
+
+    shutdown_parse_pools()
+    try:
+        assert len(asyncio.run(asyncio.wait_for(consume(), timeout=30))) == 2
+    finally:
+        shutdown_parse_pools()
+
+def test_excel_batch_stream_reports_parse_errors():
+    """Test that unreadable workbooks fail when the stream starts"""
+    with pytest.raises(ValueError, match="Failed to parse Excel file"):
+        asyncio.run(ParsedBatchStream.start(b"not a workbook"))
+
+async def _collect_sheets(source, sheets, batch_size):
+    streams = await SheetBatchStreams.start(source, sheets, batch_size=batch_size)
+    try:
+        batches = [item async for item in streams.batches()]
+    finally:
+        await streams.aclose()
+    return streams.total_rows, batches
+
+@pytest.mark.parametrize("process_min_bytes", ["1000000000", "0"], ids=["thread", "process"])
+def test_sheet_batch_streams_interleave_worksheets(tmp_path, monkeypatch, process_min_bytes):
+    """Test that selected worksheets are parsed together and consumed in turn"""
+    monkeypatch.setenv("PARSE_PROCESS_MIN_BYTES", process_min_bytes)
+    excel_file = create_test_workbook(tmp_path, {
+        'January': _timesheet_data(15),
+        'February': _timesheet_data(5),
+        'March': _timesheet_data(3)
+    })
+
+    with open(excel_file, "rb") as f:
+        total_rows, batches = asyncio.run(_collect_sheets(f, ['January', 'February'], batch_size=10))
+
+    assert total_rows == 20
+    sizes = {}
+    for sheet, batch in batches:
+        sizes.setdefault(sheet, []).append(len(batch.entries))
+    assert sizes == {'January': [10, 5], 'February': [5]}
+
+def test_sheet_batch_streams_with_more_sheets_than_workers(tmp_path, monkeypatch):
+    """Test that worksheets outnumbering the pool workers are parsed without deadlocking"""
+    monkeypatch.setenv("PARSE_POOL_WORKERS", "1")
+    monkeypatch.setenv("PARSE_QUEUE_SIZE", "1")
+    monkeypatch.setenv("PARSE_PROCESS_MIN_BYTES", "1000000000")
+    excel_file = create_test_workbook(tmp_path, {
+        'January': _timesheet_data(8),
+        'February': _timesheet_data(8),
+        'March': _timesheet_data(8)
+    })
+
+    shutdown_parse_pools()
+    try:
+        total_rows, batches = asyncio.run(asyncio.wait_for(
+            _collect_sheets(excel_file.read_bytes(), ['January', 'February', 'March'], batch_size=2),
+            timeout=60
+        ))
+    finally:
+        shutdown_parse_pools()
+
+    assert total_rows == 24
+    rows = {}
+    for sheet, batch in batches:
+        rows[sheet] = rows.get(sheet, 0) + len(batch.entries)
+    assert rows == {'January': 8, 'February': 8, 'March': 8}
+
+def test_sheet_batch_streams_unknown_sheet(tmp_path):
+    """Test that a missing worksheet fails the whole stream"""
+    excel_file = create_test_workbook(tmp_path, {'January': _timesheet_data(2)})
+    with pytest.raises(ValueError, match="Worksheet 'April' not found"):
+        asyncio.run(SheetBatchStreams.start(excel_file.read_bytes(), ['January', 'April']))
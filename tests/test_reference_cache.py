@@ -0,0 +1,86 @@
+from sqlalchemy import text
+from database.customer_repository import CustomerRepository
+from database.project_repository import ProjectRepository
+from database.reference_cache import ReferenceCache, get_reference_cache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_cache_expires_entries_after_ttl():
+    """Test that entries are served until their TTL passes"""
+    clock = FakeClock()
+    cache = ReferenceCache(max_size=10, ttl=60, clock=clock)
+    cache.set('customer', 'ECOLAB')
+
+    assert cache.contains('customer', 'ECOLAB')
+    clock.now = 61
+    assert not cache.contains('customer', 'ECOLAB')
+
+    stats = cache.stats()['namespaces']['customer']
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 1, 1)
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when the cache is full"""
+    cache = ReferenceCache(max_size=2, ttl=60)
+    cache.set('project', 'A')
+    cache.set('project', 'B')
+    cache.contains('project', 'A')
+    cache.set('project', 'C')
+
+    assert cache.contains('project', 'A')
+    assert not cache.contains('project', 'B')
+    assert cache.stats()['namespaces']['project']['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+def test_cache_invalidates_keys_and_namespaces():
+    """Test that single keys and whole namespaces can be invalidated"""
+    cache = ReferenceCache()
+    cache.set('customer', 'A')
+    cache.set('customer', 'B')
+    cache.set('project', 'A')
+
+    cache.invalidate('customer', 'A')
+    assert not cache.contains('customer', 'A')
+    assert cache.contains('customer', 'B')
+
+    cache.invalidate('customer')
+    assert not cache.contains('customer', 'B')
+    assert cache.contains('project', 'A')
+
+def test_repository_existence_checks_use_the_cache(db_session, setup_test_data):
+    """Test that known references cost no query and repository deletes invalidate them"""
+    repo = CustomerRepository()
+    assert repo.exists(db_session, "ECOLAB")
+
+    # Rows removed behind the repository's back are still served from the cache
+    db_session.execute(text("UPDATE projects SET customer_id = NULL"))
+    db_session.execute(text("DELETE FROM customers WHERE name = 'ECOLAB'"))
+    db_session.commit()
+    assert repo.exists(db_session, "ECOLAB")
+
+    repo.create(db_session, {"name": "ACME", "contact_email": "acme@example.com"})
+    assert repo.delete_by_name(db_session, "ACME")
+    assert not repo.exists(db_session, "ACME")
+
+def test_bulk_ensure_skips_cached_references(db_session, setup_test_data):
+    """Test that bulk_ensure only inserts references the cache does not know"""
+    repo = ProjectRepository()
+    assert repo.bulk_ensure(db_session, {"NEW_PROJECT": "ECOLAB"}) == ["NEW_PROJECT"]
+
+    hits = get_reference_cache().stats()['namespaces']['project']['hits']
+    assert repo.bulk_ensure(db_session, {"NEW_PROJECT": "ECOLAB"}) == []
+    assert get_reference_cache().stats()['namespaces']['project']['hits'] == hits + 1
+
+def test_debug_cache_endpoint(test_client, db_session, setup_test_data):
+    """Test that the cache counters are exposed"""
+    CustomerRepository().exists(db_session, "ECOLAB")
+    response = test_client.get("/debug/cache")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert {'size', 'max_size', 'ttl_seconds', 'hits', 'misses', 'namespaces'} <= set(body)
+    assert body['namespaces']['customer']['size'] >= 1
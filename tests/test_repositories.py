@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
 from database.customer_repository import CustomerRepository
 from database.timesheet_repository import TimeEntryRepository
@@ -7,6 +8,7 @@ from models.timeEntry import TimeEntry
 from datetime import date
 from database.project_repository import ProjectRepository # Assuming this exists
 from models.projectModel import Project # Assuming this exists
+from tests.test_file_upload import create_test_excel
 
 
 def test_customer_repository_create(db_session):
@@ -167,7 +169,7 @@ def test_time_entry_repository_create(db_session):
     project = Project(
         project_id="TEST_CREATE_001",
         name="Test Create Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -179,8 +181,8 @@ def test_time_entry_repository_create(db_session):
         month="January",
         category="Development",
         subcategory="Coding",
-        customer=created_customer.name,  # Use the created customer's name
-        project=created_project.project_id,
+        customer_ref=created_customer,  # Use the created customer's name
+        project_ref=created_project,
         task_description="Test entry",
         hours=8.0,
         date=date(2024, 1, 1)
@@ -209,7 +211,7 @@ def test_time_entry_repository_get_by_id(db_session):
     project = Project(
         project_id="TEST_GET_001",
         name="Test Get Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -220,8 +222,8 @@ def test_time_entry_repository_get_by_id(db_session):
         month="January",
         category="Development",
         subcategory="Coding",
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         task_description="Test entry",
         hours=8.0,
         date=date(2024, 1, 1)
@@ -251,7 +253,7 @@ def test_time_entry_repository_get_by_date(db_session):
     project = Project(
         project_id="TEST_DATE_001",
         name="Test Date Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -263,8 +265,8 @@ def test_time_entry_repository_get_by_date(db_session):
         month="January",
         category="Development",
         subcategory="Coding",
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         task_description="Test entry",
         hours=8.0,
         date=entry_date
@@ -293,7 +295,7 @@ def test_time_entry_repository_get_all(db_session):
     project = Project(
         project_id="TEST_ALL_001",
         name="Test All Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -305,8 +307,8 @@ def test_time_entry_repository_get_all(db_session):
             month="January",
             category="Development",
             subcategory="Coding",
-            customer=created_customer.name,
-            project=created_project.project_id,
+            customer_ref=created_customer,
+            project_ref=created_project,
             task_description=f"Entry {i}",
             hours=8.0,
             date=date(2024, 1, 1)
@@ -337,7 +339,7 @@ def test_time_entry_repository_update(db_session):
     project = Project(
         project_id="TEST_UPDATE_001",
         name="Test Update Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -349,8 +351,8 @@ def test_time_entry_repository_update(db_session):
         month="January",
         category="Development",
         subcategory="Coding",
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         task_description="Original description",
         hours=8.0,
         date=date(2024, 1, 1)
@@ -385,7 +387,7 @@ def test_time_entry_repository_delete(db_session):
     project = Project(
         project_id="TEST_DELETE_001",
         name="Test Delete Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -396,8 +398,8 @@ def test_time_entry_repository_delete(db_session):
         month="January",
         category="Development",
         subcategory="Coding",
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         task_description="Test entry",
         hours=8.0,
         date=date(2024, 1, 1)
@@ -425,7 +427,7 @@ def test_time_entry_repository_pagination(db_session):
     project = Project(
         project_id="TEST_PAGE_001",
         name="Test Pagination Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active"
     )
     created_project = project_repo.create(db_session, project)
@@ -438,8 +440,8 @@ def test_time_entry_repository_pagination(db_session):
             month="January",
             category="Development",
             subcategory="Coding",
-            customer=created_customer.name,
-            project=created_project.project_id,
+            customer_ref=created_customer,
+            project_ref=created_project,
             task_description=f"Entry {i}",
             hours=8.0,
             date=date(2024, 1, 1)
@@ -478,7 +480,7 @@ def test_customer_cascade_delete_behavior(db_session):
     project = Project(
         project_id="CASCADE_TEST_001",
         name="Cascade Test Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active",
         description="Test project for cascade delete"  # Added required field
     )
@@ -487,8 +489,8 @@ def test_customer_cascade_delete_behavior(db_session):
     # Create a time entry for this project
     entry = TimeEntry(
         date=date(2024, 1, 1),
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         hours=8.0,
         category="Test",
         subcategory="Cascade",
@@ -531,7 +533,7 @@ def test_customer_name_update_cascade(db_session):
     project = Project(
         project_id="CASCADE_UPDATE_001",
         name="Update Cascade Test Project",
-        customer=created_customer.name,
+        customer_ref=created_customer,
         status="active",
         description="Test project for cascade update"  # Added required field
     )
@@ -540,8 +542,8 @@ def test_customer_name_update_cascade(db_session):
     # Create a time entry
     entry = TimeEntry(
         date=date(2024, 1, 1),
-        customer=created_customer.name,
-        project=created_project.project_id,
+        customer_ref=created_customer,
+        project_ref=created_project,
         hours=8.0,
         category="Test",
         subcategory="Cascade",
@@ -560,4 +562,180 @@ def test_customer_name_update_cascade(db_session):
     assert updated_project.customer == "Updated Customer Name"
 
     updated_entry = time_entry_repo.get_by_id(db_session, created_entry.id)
-    assert updated_entry.customer == "Updated Customer Name"
\ No newline at end of file
+    assert updated_entry.customer == "Updated Customer Name"
+
+
+def test_customer_repository_bulk_ensure(db_session):
+    """Test that missing customers are created once and existing ones are skipped"""
+    repo = CustomerRepository()
+    repo.create(db_session, {
+        "name": "Existing Customer",
+        "contact_email": "existing@example.com",
+        "status": "active"
+    })
+
+    created = repo.bulk_ensure(db_session, ["Existing Customer", "New Customer", "New Customer", None])
+    assert created == ["New Customer"]
+    assert repo.bulk_ensure(db_session, ["New Customer"]) == []
+
+    customer = repo.get_by_name(db_session, "New Customer")
+    assert customer.contact_email == "new_customer@example.com"
+    assert customer.status == "active"
+
+
+def test_customer_repository_bulk_ensure_with_taken_email(db_session):
+    """Test that a customer whose generated email is taken is still created, without an email"""
+    repo = CustomerRepository()
+    repo.create(db_session, {"name": "Acme", "contact_email": "taken_name@example.com", "status": "active"})
+
+    created = repo.bulk_ensure(db_session, ["Taken Name", "taken_name", "Other"])
+    assert sorted(created) == ["Other", "Taken Name", "taken_name"]
+    emails = {name: repo.get_by_name(db_session, name).contact_email for name in created}
+    assert emails == {"Other": "other@example.com", "Taken Name": None, "taken_name": None}
+
+
+def test_project_repository_bulk_ensure(db_session):
+    """Test that missing projects are created with resolved customers and no manager"""
+    customer_repo = CustomerRepository()
+    project_repo = ProjectRepository()
+    customer_repo.bulk_ensure(db_session, ["Bulk Customer"])
+
+    created = project_repo.bulk_ensure(db_session, {
+        "Bulk_Project": "Bulk Customer",
+        "Orphan_Project": "Missing Customer"
+    })
+    assert created == ["Bulk_Project", "Orphan_Project"]
+    assert project_repo.bulk_ensure(db_session, {"Bulk_Project": "Bulk Customer"}) == []
+
+    project = project_repo.get_by_project_id(db_session, "Bulk_Project")
+    assert project.customer == "Bulk Customer"
+    assert project.project_manager is None
+    orphan = project_repo.get_by_project_id(db_session, "Orphan_Project")
+    assert orphan.customer is None
+
+
+def test_time_entry_repository_resolve_references(db_session, setup_test_data):
+    """Test that candidate references are resolved to ids in one lookup and applied in memory"""
+    repo = TimeEntryRepository()
+    customer = setup_test_data["customers"][0]
+    project = setup_test_data["projects"][0]
+    references = repo.resolve_references(
+        db_session,
+        ["ECOLAB", "Unknown Customer", None, "ECOLAB"],
+        ["Project_Magic_Bullet", "Unknown_Project"]
+    )
+
+    assert references == {
+        'customer': {'ECOLAB': customer.id, 'Unknown Customer': None},
+        'project': {'Project_Magic_Bullet': project.id, 'Unknown_Project': None}
+    }
+    entry = repo.apply_references({'customer': 'Unknown Customer', 'project': 'Project_Magic_Bullet'}, references)
+    assert entry == {'customer_id': None, 'project_id': project.id}
+    assert repo.resolve_references(db_session, [None], [""]) == {'customer': {}, 'project': {}}
+
+
+def test_time_entry_repository_create_nulls_unknown_references(db_session, setup_test_data):
+    """Test that creating an entry with unknown references stores them as NULL"""
+    repo = TimeEntryRepository()
+    created = repo.create(db_session, {
+        "category": "Development",
+        "subcategory": "Coding",
+        "customer": "ECOLAB",
+        "project": "Unknown_Project",
+        "hours": 2.0,
+        "date": date(2024, 1, 2)
+    })
+
+    assert created.customer == "ECOLAB"
+    assert created.project is None
+
+
+def test_customer_rename_updates_only_the_customer_row(db_session, setup_test_data):
+    """Test that references follow a rename through customer_id without being rewritten"""
+    entry = TimeEntryRepository().create(db_session, {
+        "category": "Development",
+        "subcategory": "Coding",
+        "customer": "ECOLAB",
+        "project": "Project_Magic_Bullet",
+        "hours": 2.0,
+        "date": date(2024, 1, 2)
+    })
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    renamed = CustomerRepository().update_by_name(db_session, "ECOLAB", {"name": "ECOLAB Renamed"})
+
+    assert renamed.name == "ECOLAB Renamed"
+    assert statements == ["UPDATE"]
+    db_session.expire_all()
+    assert ProjectRepository().get_by_project_id(db_session, "Project_Magic_Bullet").customer == "ECOLAB Renamed"
+    assert TimeEntryRepository().get_by_id(db_session, entry.id).customer == "ECOLAB Renamed"
+    assert [e.id for e in TimeEntryRepository().get_by_customer(db_session, "ECOLAB Renamed")] == [entry.id]
+
+
+def test_time_entry_repository_lists_references_in_one_query(db_session, setup_test_data):
+    """Test that listed entries load their customer and project with the entries"""
+    repo = TimeEntryRepository()
+    for day in (2, 3):
+        repo.create(db_session, {
+            "category": "Development",
+            "subcategory": "Coding",
+            "customer": "ECOLAB",
+            "project": "Project_Magic_Bullet",
+            "hours": 2.0,
+            "date": date(2024, 1, day)
+        })
+    db_session.expire_all()
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    entries = repo.get_all(db_session)
+
+    assert [(e.customer, e.project) for e in entries] == [("ECOLAB", "Project_Magic_Bullet")] * 2
+    assert statements == ["SELECT"]
+
+
+def test_update_returning_follows_changed_references(db_session, setup_test_data):
+    """Test that an updated entry reads the customer its new customer_id points at"""
+    repo = TimeEntryRepository()
+    entry = repo.create(db_session, {
+        "category": "Development",
+        "subcategory": "Coding",
+        "customer": "ECOLAB",
+        "project": "Project_Magic_Bullet",
+        "hours": 2.0,
+        "date": date(2024, 1, 2)
+    })
+    assert entry.customer == "ECOLAB"
+    CustomerRepository().create(db_session, {"name": "Other Customer", "contact_email": "other@example.com"})
+
+    updated = repo.update_returning(
+        db_session, TimeEntry.id == entry.id, repo.with_reference_ids(db_session, {"customer": "Other Customer"})
+    )
+
+    assert updated is entry
+    assert updated.customer == "Other Customer"
+    assert updated.project == "Project_Magic_Bullet"
+
+
+def test_time_entry_repository_import_excel_skips_invalid_rows(db_session, setup_test_data, tmp_path):
+    """Test that rows failing FrameValidator are not imported"""
+    excel_file = create_test_excel(tmp_path, {
+        'Week Number': [1, 1, 1],
+        'Month': ['January', 'January', 'Smarch'],
+        'Category': ['Development', 'Development', 'Development'],
+        'Subcategory': ['Coding', 'Coding', 'Coding'],
+        'Customer': ['ECOLAB', 'ECOLAB', 'ECOLAB'],
+        'Project': ['Project_Magic_Bullet', 'Project_Magic_Bullet', 'Project_Magic_Bullet'],
+        'Task Description': ['Valid', 'Too many hours', 'Bad month'],
+        'Hours': [4.0, 30.0, 2.0],
+        'Date': ['2024-01-02', '2024-01-02', '2024-01-03']
+    })
+
+    entries = TimeEntryRepository().import_excel(db_session, excel_file.read_bytes())
+
+    assert [entry.task_description for entry in entries] == ['Valid']
+    assert entries[0].customer == 'ECOLAB'
+    assert db_session.query(TimeEntry).count() == 1
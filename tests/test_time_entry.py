@@ -1,8 +1,11 @@
 import pytest
 from datetime import datetime, date
 from services.time_entry_service import TimeEntryService
-from database.schemas import TimeEntryCreate
+from database.bulk_loader import TimeEntryBulkLoader
+from database.schemas import TimeEntryCreate, TimeEntryUpdate, TimeEntryFilter
+from sqlalchemy import event
 from models.customerModel import Customer
+from models.timeEntry import TimeEntry
 from pydantic import ValidationError
 
 def test_create_time_entry_auto_calculations(db_session):
@@ -295,4 +298,56 @@ def test_time_entry_with_invalid_project(db_session, setup_test_data):
     assert result is not None
     assert result.project is None  # Should fall back to default project
     assert result.hours == 8.0
-    assert result.date == date(2024, 1, 1)
\ No newline at end of file
+    assert result.date == date(2024, 1, 1)
+
+def _capture_statements(session):
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+    return statements
+
+def test_update_entry_is_one_update_returning(db_session, setup_test_data):
+    """Test that an update writes and loads the entry in a single statement"""
+    service = TimeEntryService(db_session)
+    created = service.create_time_entry(TimeEntryCreate(
+        category="Development", subcategory="Coding", customer="ECOLAB",
+        task_description="Before", hours=8.0, date=date(2024, 1, 15)
+    ))
+    statements = _capture_statements(db_session)
+
+    updated = service.update_entry(created.id, TimeEntryUpdate(
+        task_description="After", hours=4.0
+    ))
+
+    assert (updated.task_description, updated.hours, updated.month) == ("After", 4.0, "January")
+    assert updated.updated_at is not None
+    assert statements == ["UPDATE"]
+
+def test_update_and_delete_missing_entry(db_session, setup_test_data):
+    """Test that a missing entry is reported from the row count of the write"""
+    service = TimeEntryService(db_session)
+    statements = _capture_statements(db_session)
+
+    assert service.update_entry(999999, TimeEntryUpdate(hours=1.0)) is None
+    assert service.delete_entry(999999) is False
+    assert statements == ["UPDATE", "DELETE"]
+
+def test_edits_clear_the_fingerprint(db_session, setup_test_data):
+    """Test that edited entries stop matching the uploaded rows they came from"""
+    service = TimeEntryService(db_session)
+    loader = TimeEntryBulkLoader(db_session)
+    rows = [
+        {"category": "Development", "subcategory": "Coding", "task_description": f"Task {i}",
+         "hours": 8.0, "date": date(2024, 1, 15)}
+        for i in range(3)
+    ]
+    ids = loader.load(rows)["ids"]
+    assert all(db_session.get(TimeEntry, entry_id).fingerprint for entry_id in ids)
+
+    service.update_entry(ids[0], TimeEntryUpdate(hours=4.0))
+    assert service.bulk_update(TimeEntryFilter(ids=[ids[1]]), TimeEntryUpdate(task_description="Edited")) == 1
+    db_session.expire_all()
+    assert [db_session.get(TimeEntry, entry_id).fingerprint is None for entry_id in ids] == [True, True, False]
+
+    # The original rows of the edited entries are new again; the untouched one is still a duplicate
+    assert sorted(loader.load(rows)["rows"]) == [1, 2]
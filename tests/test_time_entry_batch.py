@@ -0,0 +1,77 @@
+import sys
+from datetime import date
+import numpy as np
+import pandas as pd
+from utils.time_entry_batch import TimeEntryBatch
+from utils.validators import normalize_customer_name, normalize_project_id
+
+def _frame(count=6):
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2024-10-07'] * count),
+        'Category': ['Development', None] * (count // 2),
+        'Subcategory': [None] * count,
+        'Customer': ['ECOLAB', ' ECOLAB ', '-'] * (count // 3),
+        'Project': ['Project Magic-Bullet', 'Project_Magic_Bullet', None] * (count // 3),
+        'Task Description': [f'Task {i}' for i in range(count)],
+        'Hours': [8.0, 4.5] * (count // 2)
+    }, index=pd.RangeIndex(2, count + 2))
+
+def test_batch_encodes_columns_and_fills_defaults():
+    """Test that string columns are dictionary encoded and missing values get defaults"""
+    batch = TimeEntryBatch.from_frame(_frame())
+
+    assert len(batch) == 6
+    assert batch.rows.tolist() == [2, 3, 4, 5, 6, 7]
+    assert batch.category.values == ['Development', 'Other']
+    assert batch.category.codes.tolist() == [0, 1, 0, 1, 0, 1]
+    assert set(batch.subcategory.decode()) == {'General'}
+    assert batch.date_text()[0] == '2024-10-07'
+
+    record = batch.to_records()[1]
+    assert record == {
+        'date': date(2024, 10, 7), 'hours': 4.5, 'category': 'Other', 'subcategory': 'General',
+        'customer': ' ECOLAB ', 'project': 'Project_Magic_Bullet', 'task_description': 'Task 1'
+    }
+
+def test_map_column_normalizes_distinct_values():
+    """Test that normalization merges equal values and turns invalid ones into None"""
+    batch = (
+        TimeEntryBatch.from_frame(_frame())
+        .map_column('customer', normalize_customer_name)
+        .map_column('project', normalize_project_id)
+    )
+
+    assert batch.customer.decode() == ['ECOLAB', 'ECOLAB', None] * 2
+    assert batch.customers() == {'ECOLAB'}
+    assert batch.project_customers() == {'Project_Magic_Bullet': 'ECOLAB'}
+
+def test_take_selects_rows():
+    """Test that take keeps the selected rows with their source row numbers"""
+    batch = TimeEntryBatch.from_frame(_frame())
+    subset = batch.take(batch.hours > 5)
+
+    assert subset.rows.tolist() == [2, 4, 6]
+    assert [record['task_description'] for record in subset.to_records()] == ['Task 0', 'Task 2', 'Task 4']
+
+def test_from_entries_matches_records():
+    """Test that a batch built from dictionaries expands back to the same values"""
+    entries = [
+        {'date': date(2024, 1, 1), 'category': 'Dev', 'subcategory': 'QA', 'customer': 'ECOLAB',
+         'project': None, 'task_description': 'Work', 'hours': 2.0}
+    ]
+    batch = TimeEntryBatch.from_entries(entries, first_row=10)
+
+    assert batch.rows.tolist() == [10]
+    assert batch.to_records() == entries
+
+def test_batch_is_smaller_than_row_dictionaries():
+    """Test that a buffered batch costs far less memory than per-row dictionaries"""
+    batch = TimeEntryBatch.from_frame(_frame(3000))
+    records = batch.to_records()
+    record_bytes = sum(
+        sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+        for record in records
+    )
+
+    assert batch.nbytes * 5 < record_bytes
+    assert batch.hours.dtype == np.float64
@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from tests.test_config import test_client, test_db
 from database import schemas
+from database.bulk_loader import TimeEntryBulkLoader
 from datetime import date
 
 def test_create_time_entry(test_client: TestClient, test_db, setup_test_data):
@@ -273,4 +274,122 @@ def test_get_time_entries_pagination(test_client: TestClient, test_db, setup_tes
     response = test_client.get("/time-entries", params={"skip": 4, "limit": 2})
     assert response.status_code == 200
     data = response.json()
-    assert len(data) <= 2  # Should be 1 since we created 5 entries
\ No newline at end of file
+    assert len(data) <= 2  # Should be 1 since we created 5 entries
+def _create_entries(test_client: TestClient, days, customer="ECOLAB", category="Development"):
+    ids = []
+    for day in days:
+        response = test_client.post("/time-entries", json={
+            "category": category, "subcategory": "Backend", "customer": customer,
+            "task_description": f"Work on {day}", "hours": 8.0, "date": day
+        })
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+    return ids
+
+def test_bulk_update_time_entries_by_filter(test_client: TestClient, test_db, setup_test_data):
+    """Test that one PATCH changes every entry in a date range"""
+    ids = _create_entries(test_client, ["2024-10-01", "2024-10-15", "2024-11-01"])
+
+    response = test_client.patch("/time-entries", json={
+        "filter": {"start_date": "2024-10-01", "end_date": "2024-10-31", "customer": "ECOLAB"},
+        "changes": {"category": "Support", "hours": 6.0}
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 2}
+    categories = [test_client.get(f"/time-entries/{entry_id}").json()["category"] for entry_id in ids]
+    assert categories == ["Support", "Support", "Development"]
+
+def test_bulk_delete_time_entries_by_ids(test_client: TestClient, test_db, setup_test_data):
+    """Test that one DELETE removes the listed entries and reports the count"""
+    ids = _create_entries(test_client, ["2024-10-01", "2024-10-02", "2024-10-03"])
+
+    response = test_client.request("DELETE", "/time-entries", json={"ids": ids[:2] + [999999]})
+
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 2}
+    assert test_client.get(f"/time-entries/{ids[2]}").status_code == 200
+
+def test_bulk_requests_need_a_filter(test_client: TestClient, test_db):
+    """Test that bulk requests without criteria or changes are rejected"""
+    assert test_client.request("DELETE", "/time-entries", json={}).status_code == 422
+    response = test_client.patch("/time-entries", json={"filter": {"category": "Development"}, "changes": {}})
+    assert response.status_code == 422
+
+def test_bulk_create_time_entries_reports_each_item(test_client: TestClient, test_db, setup_test_data):
+    """Test that a JSON list is created in one request with a result per item"""
+    entry = {
+        "category": "Development", "subcategory": "Backend", "customer": "New Bulk Customer",
+        "project": "New Bulk Project", "task_description": "Bulk", "hours": 8.0, "date": "2024-10-07"
+    }
+    response = test_client.post("/time-entries/bulk", json=[
+        entry,
+        {**entry, "hours": 30},
+        entry,
+        {**entry, "date": "2024-10-08"}
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["rejected"]) == (3, 1)
+    statuses = [item["status"] for item in body["results"]]
+    assert statuses == ["created", "rejected", "created", "created"]
+    assert body["results"][1]["error"].startswith("hours")
+    assert body["results"][0]["id"] != body["results"][2]["id"]
+
+    created = test_client.get(f"/time-entries/{body['results'][3]['id']}").json()
+    assert (created["customer"], created["project"]) == ("New Bulk Customer", "New_Bulk_Project")
+
+def test_bulk_create_time_entries_does_not_block_file_uploads(test_client: TestClient, test_db):
+    """Test that entries created through the API are not fingerprinted, so an identical upload row is still loaded"""
+    entry = {"category": "Development", "subcategory": "Backend", "hours": 8.0, "date": "2024-10-07"}
+    body = test_client.post("/time-entries/bulk", json=[entry, entry]).json()
+    assert body["created"] == 2
+
+    row = {"date": date(2024, 10, 7), "category": "Development", "subcategory": "Backend", "hours": 8.0}
+    assert TimeEntryBulkLoader(test_db).load([row])["inserted"] == 1
+
+def test_bulk_create_time_entries_from_ndjson(test_client: TestClient, test_db, setup_test_data):
+    """Test that NDJSON lines are created and unparsable lines are rejected on their own"""
+    lines = [
+        '{"category": "Development", "subcategory": "Backend", "hours": 4, "date": "2024-10-07"}',
+        '{"category": "Development", "subcategory": "Backend", "hours": ',
+        '',
+        '{"category": "Support", "subcategory": "Calls", "hours": 2, "date": "2024-10-07"}'
+    ]
+    response = test_client.post(
+        "/time-entries/bulk",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["results"]] == ["created", "rejected", "created"]
+    assert body["results"][1]["error"].startswith("invalid JSON")
+
+def test_bulk_create_time_entries_rejects_invalid_utf8(test_client: TestClient, test_db):
+    """Test that a body that is not UTF-8 is a client error"""
+    response = test_client.post(
+        "/time-entries/bulk",
+        content=b'[{"category": "\xff"}]',
+        headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
+
+def test_bulk_create_time_entries_enforces_size_limit(test_client: TestClient, test_db, monkeypatch):
+    """Test that declared and streamed bodies over MAX_UPLOAD_SIZE_MB are rejected"""
+    monkeypatch.setenv("MAX_UPLOAD_SIZE_MB", "0")
+
+    response = test_client.post("/time-entries/bulk", json=[{"category": "Development"}])
+    assert response.status_code == 413
+
+    # Without a Content-Length the limit is applied while the body is read
+    response = test_client.post(
+        "/time-entries/bulk",
+        content=iter([b'[{"category": ', b'"Development"}]']),
+        headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 413
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from database import schemas
+from database.customer_repository import CustomerRepository
+from database.reference_cache import get_reference_cache
+from database.unit_of_work import UnitOfWork
+from models.customerModel import Customer
+from models.projectManagerModel import ProjectManager
+from models.projectModel import Project
+from services.project_service import ProjectService
+
+def _count_commits(session):
+    commits = []
+    event.listen(session, "after_commit", lambda _: commits.append(True))
+    return commits
+
+def test_create_project_commits_once(test_db):
+    """Test that a project with a new customer and manager is written in one commit"""
+    commits = _count_commits(test_db)
+    project = ProjectService(test_db).create_project(schemas.ProjectCreate(
+        project_id="UOW_001",
+        name="Unit Of Work",
+        customer="New Customer",
+        project_manager="New Manager"
+    ))
+
+    assert len(commits) == 1
+    assert project.customer == "New Customer"
+    assert test_db.query(ProjectManager).filter_by(name="New Manager").count() == 1
+    assert get_reference_cache().contains('customer', "New Customer")
+
+def test_failed_create_project_leaves_nothing_behind(test_db):
+    """Test that a failing project create rolls back the customer it created"""
+    service = ProjectService(test_db)
+    service.create_project(schemas.ProjectCreate(project_id="UOW_002", name="First", project_manager="Manager"))
+
+    with pytest.raises(HTTPException) as error:
+        service.create_project(schemas.ProjectCreate(
+            project_id="UOW_002", name="Duplicate", customer="Orphan Customer", project_manager="Manager"
+        ))
+
+    assert error.value.status_code == 400
+    assert test_db.query(Customer).filter_by(name="Orphan Customer").count() == 0
+    assert not get_reference_cache().contains('customer', "Orphan Customer")
+
+def test_nested_units_commit_with_the_outermost(test_db):
+    """Test that an inner unit of work joins the outer one instead of committing"""
+    commits = _count_commits(test_db)
+    repo = CustomerRepository()
+
+    with UnitOfWork(test_db):
+        with UnitOfWork(test_db):
+            inner = repo.create(test_db, {"name": "Inner", "contact_email": "inner@example.com"})
+        assert commits == []
+        assert not get_reference_cache().contains('customer', "Inner")
+        test_db.add(ProjectManager(name="Outer Manager", email="outer.manager@company.com"))
+        test_db.flush()
+        test_db.add(Project(project_id="UOW_003", name="Outer", customer_id=inner.id, project_manager="Outer Manager"))
+
+    assert len(commits) == 1
+    assert get_reference_cache().contains('customer', "Inner")
+    assert test_db.query(Project).filter_by(customer_id=inner.id).count() == 1
@@ -0,0 +1,59 @@
+import pytest
+from datetime import timedelta
+from sqlalchemy import text
+from database.upload_job_store import InMemoryUploadJobStore, DatabaseUploadJobStore
+
+def test_in_memory_store_tracks_throughput_and_eta():
+    """Test that chunk updates refresh counters, rate and ETA"""
+    store = InMemoryUploadJobStore()
+    job = store.create("upload_test", total_rows=100, filename="test.xlsx")
+    assert job["state"] == "queued"
+
+    # Pretend the job started ten seconds ago
+    store._update("upload_test", {"started_at": job["started_at"] - timedelta(seconds=10)})
+    job = store.record_chunk("upload_test", processed=40, rejected=10)
+
+    assert job["state"] == "processing"
+    assert job["rows_processed"] == 40
+    assert job["rows_rejected"] == 10
+    assert job["rows_per_second"] == pytest.approx(5.0, rel=0.05)
+    assert job["eta_seconds"] == pytest.approx(10.0, rel=0.05)
+
+    job = store.complete("upload_test")
+    assert job["state"] == "completed"
+    assert job["eta_seconds"] == 0.0
+    assert job["finished_at"] is not None
+
+def test_store_unknown_key():
+    """Test that unknown jobs are reported as missing"""
+    store = InMemoryUploadJobStore()
+    assert store.get("missing") is None
+    assert store.record_chunk("missing", processed=1) is None
+
+def test_database_store_persists_jobs(test_db):
+    """Test that the database store shares job state through upload_jobs"""
+    store = DatabaseUploadJobStore()
+    store.create("upload_db_test", total_rows=10)
+    store.record_chunk("upload_db_test", processed=10)
+    store.fail("upload_db_test", "boom")
+
+    job = DatabaseUploadJobStore().get("upload_db_test")
+    assert job["state"] == "failed"
+    assert job["rows_processed"] == 10
+    assert job["error"] == "boom"
+    test_db.execute(text("DELETE FROM upload_jobs WHERE progress_key = 'upload_db_test'"))
+    test_db.commit()
+
+def test_database_store_tracks_sheet_counters(test_db):
+    """Test that per-worksheet counters round-trip through upload_jobs"""
+    store = DatabaseUploadJobStore()
+    store.create("upload_sheets_test", total_rows=5, sheets={"Alice": 3, "Bob": 2})
+    store.record_chunk("upload_sheets_test", processed=2, rejected=1, sheet="Alice")
+    store.record_chunk("upload_sheets_test", processed=1, duplicates=1, sheet="Bob")
+
+    job = store.get("upload_sheets_test")
+    assert job["rows_processed"] == 3
+    assert job["sheets"]["Alice"] == {"total_rows": 3, "rows_processed": 2, "rows_rejected": 1, "rows_duplicate": 0}
+    assert job["sheets"]["Bob"] == {"total_rows": 2, "rows_processed": 1, "rows_rejected": 0, "rows_duplicate": 1}
+    test_db.execute(text("DELETE FROM upload_jobs WHERE progress_key = 'upload_sheets_test'"))
+    test_db.commit()
@@ -1,4 +1,6 @@
 import pytest
+from datetime import date
+from database.schemas import TimeEntryCreate, construct_time_entries, validate_time_entries
 from utils.validators import normalize_customer_name, normalize_project_id, normalize_project_manager
 
 def test_normalize_customer_name():
@@ -42,4 +44,33 @@ def test_normalize_project_manager():
 
     # Test valid project manager names
     assert normalize_project_manager('John Doe') == 'John Doe'
-    assert normalize_project_manager(' John Doe ') == 'John Doe'
\ No newline at end of file
+    assert normalize_project_manager(' John Doe ') == 'John Doe'
+
+def test_validate_time_entries_reports_rejected_rows():
+    """Test that batch validation keeps valid rows and reports the others by position"""
+    rows = [
+        {'category': 'Dev', 'subcategory': 'QA', 'date': '2024-01-02', 'hours': '7.5'},
+        {'category': 'Dev', 'subcategory': 'QA', 'date': '2024-01-02', 'hours': 30},
+        {'category': 'Dev', 'date': 'not a date', 'hours': 1},
+        {'category': 'Dev', 'subcategory': 'QA', 'date': '2024-01-03'}
+    ]
+
+    entries, errors = validate_time_entries(rows)
+
+    assert [entry.hours for entry in entries] == [7.5, 0.0]
+    assert entries[0].date.isoformat() == '2024-01-02'
+    assert sorted(errors) == [1, 2]
+    assert errors[1].startswith('hours:')
+
+def test_construct_time_entries_skips_validation():
+    """Test that trusted rows are built as given and unknown keys are dropped"""
+    entries = construct_time_entries([
+        {'category': 'Dev', 'subcategory': 'QA', 'date': date(2024, 1, 2), 'hours': 8.0, 'month': 'January'}
+    ])
+
+    assert isinstance(entries[0], TimeEntryCreate)
+    assert entries[0].customer is None
+    assert entries[0].model_dump() == {
+        'category': 'Dev', 'subcategory': 'QA', 'customer': None, 'project': None,
+        'task_description': None, 'hours': 8.0, 'date': date(2024, 1, 2)
+    }
@@ -1,4 +1,4 @@
-from tests.test_file_upload import create_test_excel
+from tests.test_file_upload import create_test_excel, create_test_workbook
 from utils.xls_analyzer import XLSAnalyzer
 
 def test_xls_analyzer_dash_to_null_conversion(tmp_path):
@@ -74,4 +74,75 @@ def test_xls_analyzer_validates_data_types(tmp_path):
         assert records[0]['Week Number'] == 0
         assert records[0]['Hours'] == 0.0
         assert records[0]['Customer'] == 'Test Customer'
-        assert records[0]['Project'] == 'Test Project'
\ No newline at end of file
+        assert records[0]['Project'] == 'Test Project'
+
+def test_xls_analyzer_streams_bounded_batches(tmp_path):
+    """Test that iter_excel yields records in batches no larger than batch_size"""
+    rows = 25
+    data = {
+        'Week Number': [41] * rows,
+        'Month': ['October'] * rows,
+        'Category': ['Development'] * rows,
+        'Subcategory': ['Backend'] * rows,
+        'Customer': ['ECOLAB'] * rows,
+        'Project': ['Project_Magic_Bullet'] * rows,
+        'Task Description': [f'Task {i}' for i in range(rows)],
+        'Hours': [1.0] * rows,
+        'Date': ['2024-10-07'] * rows
+    }
+    excel_file = create_test_excel(tmp_path, data)
+
+    with open(excel_file, "rb") as f:
+        contents = f.read()
+
+    batches = list(XLSAnalyzer.iter_excel(contents, batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert batches[2][-1]['Task Description'] == 'Task 24'
+    assert XLSAnalyzer.count_rows(contents) == rows
+
+def test_parse_excel_builds_entries_without_temp_file(tmp_path, monkeypatch):
+    """Test that parse_excel converts the sheet directly and applies the CSV rules"""
+    from utils.utils import parse_excel
+    data = {
+        'Week Number': [41, 41, 41],
+        'Month': ['October', 'October', 'October'],
+        'Category': ['development', 'Testing', 'Testing'],
+        'Subcategory': ['backend', 'QA', 'QA'],
+        'Customer': ['ECOLAB', '-', 'ECOLAB'],
+        'Project': ['Project_Magic_Bullet', '-', 'Project_Magic_Bullet'],
+        'Task Description': ['API work', '-', 'No hours'],
+        'Hours': [8.0, 4.0, 0.0],
+        'Date': ['2024-10-07', '2024-10-08', '2024-10-09']
+    }
+    excel_file = create_test_excel(tmp_path, data)
+    monkeypatch.chdir(tmp_path)
+
+    entries = parse_excel(str(excel_file))
+
+    assert len(entries) == 2
+    assert entries[0].category == 'Development'
+    assert entries[0].subcategory == 'Backend'
+    assert entries[1].customer == 'Unassigned'
+    assert entries[1].project == 'Unassigned'
+    assert entries[1].task_description == ''
+    assert not (tmp_path / 'temp.csv').exists()
+
+def test_xls_analyzer_reads_selected_sheets(tmp_path):
+    """Test that read_excel reads the first worksheet unless others are selected"""
+    row = {
+        'Category': ['Development'],
+        'Hours': [8.0],
+        'Date': ['2024-10-07']
+    }
+    excel_file = create_test_workbook(tmp_path, {
+        'Alice': {**row, 'Task Description': ['Alice task']},
+        'Bob': {**row, 'Task Description': ['Bob task']}
+    })
+    contents = excel_file.read_bytes()
+
+    assert XLSAnalyzer.sheet_names(contents) == ['Alice', 'Bob']
+    assert [r['Task Description'] for r in XLSAnalyzer.read_excel(contents)] == ['Alice task']
+
+    records = XLSAnalyzer.read_excel(contents, sheets=XLSAnalyzer.sheet_names(contents))
+    assert [r['Task Description'] for r in records] == ['Alice task', 'Bob task']
+    assert XLSAnalyzer.count_rows(contents, sheet='Bob') == 1
@@ -0,0 +1,42 @@
+"""Calendar attributes of dates.
+
+These are the rules the calendar_days dimension table is filled with, for
+code that needs the attributes of a single date without a query. Lookups are
+cached, so ingesting many rows for the same few dates derives each date once.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
+
+# First month of the fiscal year; fiscal years are named after the calendar year they end in
+FISCAL_YEAR_START_MONTH = 1
+
+class CalendarAttributes(NamedTuple):
+    date: date
+    iso_year: int
+    iso_week: int
+    year: int
+    month: int
+    month_name: str
+    quarter: int
+    fiscal_year: int
+    fiscal_period: int
+    is_workday: bool
+
+@lru_cache(maxsize=8192)
+def calendar_attributes(day: date) -> CalendarAttributes:
+    """Return the calendar attributes of a date."""
+    iso_year, iso_week, iso_weekday = day.isocalendar()
+    starts_next_year = FISCAL_YEAR_START_MONTH > 1 and day.month >= FISCAL_YEAR_START_MONTH
+    return CalendarAttributes(
+        date=day,
+        iso_year=iso_year,
+        iso_week=iso_week,
+        year=day.year,
+        month=day.month,
+        month_name=day.strftime('%B'),
+        quarter=(day.month - 1) // 3 + 1,
+        fiscal_year=day.year + 1 if starts_next_year else day.year,
+        fiscal_period=(day.month - FISCAL_YEAR_START_MONTH) % 12 + 1,
+        is_workday=iso_weekday < 6
+    )
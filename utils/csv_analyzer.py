@@ -0,0 +1,162 @@
+from typing import Iterator, Optional, Tuple, Union, BinaryIO
+import codecs
+import csv
+import pandas as pd
+from io import BytesIO
+from utils.logger import Logger
+from utils.xls_analyzer import XLSAnalyzer
+
+logger = Logger().get_logger()
+
+CSVSource = Union[bytes, str, BinaryIO]
+
+class CSVAnalyzer:
+    """Chunked CSV reader feeding CSV uploads to the parse pool.
+
+    The encoding and delimiter are detected once from a small sample, then the
+    file is read with pandas' C parser in chunks, so no per-row Python work is
+    done during parsing. Frames are validated and cleaned by the pool worker
+    like Excel ones.
+    """
+    SNIFF_BYTES = 64 * 1024
+    ENCODINGS = ['utf-8-sig', 'cp1252', 'iso-8859-1']
+    DELIMITERS = ',\t;|'
+    DEFAULT_BATCH_SIZE = XLSAnalyzer.DEFAULT_BATCH_SIZE
+
+    @staticmethod
+    def _open(source: CSVSource) -> BinaryIO:
+        """Return a binary file positioned at the start of the source."""
+        if isinstance(source, (bytes, bytearray)):
+            if not source:
+                raise ValueError("Empty file contents provided")
+            return BytesIO(source)
+        if isinstance(source, str):
+            return open(source, 'rb')
+        source.seek(0)
+        return source
+
+    @staticmethod
+    def _close(source: CSVSource, handle: BinaryIO) -> None:
+        # Only close handles opened here; callers own the files they pass in
+        if isinstance(source, str):
+            handle.close()
+        else:
+            handle.seek(0)
+
+    @staticmethod
+    def _decode_sample(sample: bytes) -> Tuple[str, str]:
+        for encoding in CSVAnalyzer.ENCODINGS:
+            try:
+                # An incremental decoder tolerates a multi-byte character cut off at the end
+                return encoding, codecs.getincrementaldecoder(encoding)().decode(sample)
+            except UnicodeDecodeError:
+                continue
+        raise ValueError("Could not detect CSV encoding")
+
+    @staticmethod
+    def detect_format(source: CSVSource) -> Tuple[str, str]:
+        """Detect the encoding and delimiter from the first SNIFF_BYTES of the file."""
+        handle = CSVAnalyzer._open(source)
+        try:
+            sample = handle.read(CSVAnalyzer.SNIFF_BYTES)
+        finally:
+            CSVAnalyzer._close(source, handle)
+        if not sample.strip():
+            raise ValueError("Empty file contents provided")
+
+        encoding, text = CSVAnalyzer._decode_sample(sample)
+        try:
+            delimiter = csv.Sniffer().sniff(text, delimiters=CSVAnalyzer.DELIMITERS).delimiter
+        except csv.Error:
+            # Fall back to whichever candidate splits the header into the most columns
+            header = text.splitlines()[0]
+            delimiter = max(CSVAnalyzer.DELIMITERS, key=header.count)
+        logger.debug(f"Detected CSV format: encoding={encoding}, delimiter={delimiter!r}")
+        return encoding, delimiter
+
+    @staticmethod
+    def count_rows(source: CSVSource) -> int:
+        """Estimate the number of data rows by counting line breaks."""
+        handle = CSVAnalyzer._open(source)
+        try:
+            lines = 0
+            last = b''
+            for block in iter(lambda: handle.read(1024 * 1024), b''):
+                lines += block.count(b'\n')
+                last = block
+            if last and not last.endswith(b'\n'):
+                lines += 1
+            return max(lines - 1, 0)
+        finally:
+            CSVAnalyzer._close(source, handle)
+
+    @staticmethod
+    def _line_offset(handle: BinaryIO, lines: int) -> int:
+        """Return the byte offset just past the first lines line breaks of handle."""
+        handle.seek(0)
+        offset = 0
+        for block in iter(lambda: handle.read(1024 * 1024), b''):
+            count = block.count(b'\n')
+            if count >= lines:
+                position = -1
+                for _ in range(lines):
+                    position = block.index(b'\n', position + 1)
+                return offset + position + 1
+            lines -= count
+            offset += len(block)
+        return offset
+
+    @staticmethod
+    def iter_raw_frames(
+        source: CSVSource,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        start_row: int = 2,
+        start_line: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Stream uncleaned DataFrames of at most batch_size rows.
+
+        Frames are indexed by row number, the header being row 1; blank lines
+        are rows too, so the numbers match a spreadsheet's. A row can span
+        several lines when a quoted field contains a line break, so each frame
+        records in attrs['end_line'] how many lines of the file have been read
+        through its last row. Resumed uploads pass that count as start_line
+        together with the row number that follows, and parsing seeks past
+        those lines instead of tokenizing them again. Without start_line,
+        start_row is taken as a line number, which never skips an unread row.
+        """
+        start_row = max(start_row, 2)
+        encoding, delimiter = CSVAnalyzer.detect_format(source)
+        handle = CSVAnalyzer._open(source)
+        options = dict(
+            sep=delimiter,
+            encoding=encoding,
+            engine='c',
+            dtype=str,
+            keep_default_na=False,
+            skip_blank_lines=False
+        )
+        try:
+            columns = list(pd.read_csv(handle, nrows=0, **options).columns)
+            if start_line is None:
+                start_line = sum(str(name).count('\n') for name in columns) + start_row - 1
+            handle.seek(CSVAnalyzer._line_offset(handle, start_line))
+
+            reader = pd.read_csv(
+                handle,
+                header=None,
+                names=columns,
+                index_col=False,
+                chunksize=batch_size,
+                **options
+            )
+            line = start_line
+            with reader:
+                for chunk in reader:
+                    # Each row ends one line; quoted line breaks add the others
+                    line += len(chunk) + int(chunk.apply(lambda column: column.str.count('\n')).sum().sum())
+                    chunk.columns = [str(name).strip() for name in chunk.columns]
+                    chunk.index = chunk.index + start_row
+                    chunk.attrs['end_line'] = line
+                    yield chunk
+        finally:
+            CSVAnalyzer._close(source, handle)
@@ -0,0 +1,138 @@
+from typing import List, Dict, Any, Tuple
+from collections import Counter
+import calendar
+import numpy as np
+import pandas as pd
+from utils.logger import Logger
+from utils.xls_analyzer import XLSAnalyzer
+
+logger = Logger().get_logger()
+
+class FrameValidator:
+    """Vectorized row validation for raw timesheet frames.
+
+    Every rule is a boolean mask computed over a whole column, so the cost of
+    a batch grows with the number of checked columns rather than the number of
+    rows. Rows failing any rule are split off into a rejects table with one
+    (row, column, reason) record per failing cell; the frame index is taken as
+    the row number.
+    """
+    REJECT_COLUMNS = ['row', 'column', 'reason']
+    MIN_HOURS = 0.0
+    MAX_HOURS = 24.0
+    MONTH_NAMES = {name for name in calendar.month_name if name}
+
+    @staticmethod
+    def _blank(series: pd.Series) -> pd.Series:
+        """Mask of missing cells, including the null tokens used in templates."""
+        if series.dtype != object:
+            # Numeric and datetime columns cannot hold null tokens
+            return series.isna()
+        return XLSAnalyzer.map_distinct(series, FrameValidator._blank_values).astype(bool)
+
+    @staticmethod
+    def _blank_values(values: pd.Series) -> pd.Series:
+        text = values.astype('string').str.strip()
+        return values.isna() | text.isin(XLSAnalyzer.NULL_TOKENS).fillna(False)
+
+    @staticmethod
+    def _check_date(series: pd.Series, blank: pd.Series) -> List[Tuple[pd.Series, str]]:
+        parsed = pd.to_datetime(series, errors='coerce')
+        return [
+            (blank, 'missing date'),
+            (~blank & parsed.isna(), 'invalid date')
+        ]
+
+    @staticmethod
+    def _check_hours(series: pd.Series, blank: pd.Series) -> List[Tuple[pd.Series, str]]:
+        hours = pd.to_numeric(series, errors='coerce')
+        invalid = ~blank & hours.isna()
+        out_of_range = hours.notna() & ((hours < FrameValidator.MIN_HOURS) | (hours > FrameValidator.MAX_HOURS))
+        return [
+            (blank, 'missing hours'),
+            (invalid, 'invalid hours'),
+            (out_of_range, 'hours must be between 0 and 24')
+        ]
+
+    @staticmethod
+    def _check_week_number(series: pd.Series, blank: pd.Series) -> List[Tuple[pd.Series, str]]:
+        # Week numbers are optional; the stored week is derived from the date
+        week = pd.to_numeric(series, errors='coerce')
+        valid = week.notna() & (week % 1 == 0) & week.between(1, 53)
+        return [(~blank & ~valid, 'week number must be between 1 and 53')]
+
+    @staticmethod
+    def _check_month(series: pd.Series, blank: pd.Series) -> List[Tuple[pd.Series, str]]:
+        # Months are optional too; names and numbers 1-12 are accepted
+        text = series.astype('string').str.strip()
+        is_name = text.str.title().isin(FrameValidator.MONTH_NAMES).fillna(False)
+        number = pd.to_numeric(series, errors='coerce')
+        is_number = number.notna() & (number % 1 == 0) & number.between(1, 12)
+        return [(~blank & ~is_name & ~is_number, 'invalid month')]
+
+    CHECKS = {
+        'Date': '_check_date',
+        'Hours': '_check_hours',
+        'Week Number': '_check_week_number',
+        'Month': '_check_month'
+    }
+    # Rows are rejected when these columns are absent altogether
+    REQUIRED = {'Date': 'missing date', 'Hours': 'missing hours'}
+
+    @staticmethod
+    def validate(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Split a raw frame into its valid rows and a rejects table.
+
+        Rows in which every cell is blank are dropped without being reported.
+        The valid rows are returned unchanged, ready for XLSAnalyzer.clean_frame.
+        """
+        blank = {column: FrameValidator._blank(df[column]) for column in FrameValidator.CHECKS if column in df.columns}
+
+        # Only rows blank in every checked column can be empty; confirm those against the rest
+        empty = pd.Series(True, index=df.index)
+        for mask in blank.values():
+            empty &= mask
+        others = [column for column in df.columns if column not in blank]
+        if others and empty.any():
+            candidates = df.loc[empty]
+            confirmed = np.logical_and.reduce(
+                [FrameValidator._blank(candidates[column]).to_numpy(dtype=bool) for column in others]
+            )
+            empty[empty] = confirmed
+        df = df[~empty]
+        blank = {column: mask[~empty] for column, mask in blank.items()}
+
+        failures = []
+        for column, check in FrameValidator.CHECKS.items():
+            if column in df.columns:
+                for mask, reason in getattr(FrameValidator, check)(df[column], blank[column]):
+                    failures.append((mask, column, reason))
+            elif column in FrameValidator.REQUIRED:
+                failures.append((pd.Series(True, index=df.index), column, FrameValidator.REQUIRED[column]))
+
+        rejected = pd.Series(False, index=df.index)
+        parts = []
+        for mask, column, reason in failures:
+            if mask.any():
+                rejected |= mask
+                rows = df.index[mask.to_numpy()]
+                parts.append(pd.DataFrame({'row': rows, 'column': column, 'reason': reason}))
+
+        if parts:
+            rejects = pd.concat(parts, ignore_index=True).sort_values('row', kind='stable', ignore_index=True)
+        else:
+            rejects = pd.DataFrame(columns=FrameValidator.REJECT_COLUMNS)
+        return df[~rejected], rejects
+
+    @staticmethod
+    def summarize(rejects: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Count reject records by reason."""
+        return dict(Counter(reject['reason'] for reject in rejects))
+
+    @staticmethod
+    def to_records(rejects: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Convert a rejects table into the reject dictionaries used by ingestion."""
+        return [
+            {'row': int(row), 'column': column, 'reason': reason}
+            for row, column, reason in zip(rejects['row'].tolist(), rejects['column'].tolist(), rejects['reason'].tolist())
+        ]
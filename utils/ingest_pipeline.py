@@ -0,0 +1,93 @@
+"""Bounded producer/consumer pipeline for upload ingestion.
+
+Items flow from an async source through a chain of stages connected by
+bounded asyncio queues. Each stage handles one item at a time and runs its
+blocking work in a thread, so consecutive stages work on different batches at
+once while the order of items is kept. A full queue blocks the stage in front
+of it: a slow database writer throttles the stages before it and, through the
+parse queue, the parser itself. Memory is bounded by the queue depths rather
+than the size of the upload.
+"""
+from typing import Any, AsyncIterator, Callable, List, NamedTuple, Optional
+import asyncio
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_QUEUE_SIZE = 2
+
+# Marks the end of the stream on every queue
+_DONE = object()
+
+class PipelineStage(NamedTuple):
+    """A named blocking function applied to every item passing through the pipeline."""
+    name: str
+    func: Callable[[Any], Any]
+
+class IngestPipeline:
+    """Run items from an async source through stages joined by bounded queues."""
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = DEFAULT_QUEUE_SIZE):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+
+    async def run(self, source: AsyncIterator[Any]) -> int:
+        """Feed every item of source through the stages and return how many left the last one.
+
+        The first failure cancels the source and every stage, waits for work
+        already running in a thread to finish, and is raised to the caller.
+        """
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        completed = [0]
+        tasks = [asyncio.create_task(self._feed(source, queues[0]))]
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            tasks.append(asyncio.create_task(self._work(stage, queues[index], outbox, completed)))
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return completed[0]
+
+    @staticmethod
+    async def _feed(source: AsyncIterator[Any], outbox: asyncio.Queue) -> None:
+        async for item in source:
+            await outbox.put(item)
+        await outbox.put(_DONE)
+
+    @staticmethod
+    async def _work(
+        stage: PipelineStage,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        completed: List[int]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                if outbox is not None:
+                    await outbox.put(_DONE)
+                return
+
+            future = loop.run_in_executor(None, stage.func, item)
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Threads cannot be interrupted, so let the current item finish first
+                await asyncio.wait([future])
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion stage {stage.name} failed: {str(e)}")
+                raise
+
+            if outbox is not None:
+                await outbox.put(result)
+            else:
+                completed[0] += 1
@@ -1,6 +1,7 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from utils.logger import Logger, structured_log
+from utils.upload_spool import check_content_length, UploadTooLargeError
 import time
 from typing import Callable
 import traceback
@@ -139,4 +140,19 @@ async def error_logging_middleware(request: Request, call_next: Callable):
             method=request.method,
             query_params=dict(request.query_params)
         ))
-        raise
\ No newline at end of file
+        raise
+
+async def upload_size_middleware(request: Request, call_next: Callable):
+    """Reject requests whose Content-Length exceeds the upload size limit before the body is read"""
+    try:
+        check_content_length(request.headers.get('content-length'))
+    except UploadTooLargeError as e:
+        logger.warning(structured_log(
+            "Request body too large",
+            correlation_id=Logger().get_correlation_id(),
+            content_length=request.headers.get('content-length'),
+            path=request.url.path,
+            method=request.method
+        ))
+        return JSONResponse(status_code=413, content={"detail": str(e)})
+    return await call_next(request)
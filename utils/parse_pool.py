@@ -0,0 +1,464 @@
+"""Off-loop upload parsing.
+
+Excel and CSV parsing and cleaning are CPU-bound, so they run in a worker
+pool instead of on the event loop. Small files use a thread pool; larger
+files go to a spawn-based process pool so several uploads parse in parallel
+across cores. Workers stream compact column batches back through a bounded
+queue, which keeps memory bounded by the queue size rather than the file size.
+Each batch is validated with column masks in the worker, so batches arrive
+split into a columnar TimeEntryBatch of valid entries and a rejects table,
+together with the range of source rows they cover. Row counts are taken in
+the request before any worker starts. Several worksheets of one workbook are
+parsed by separate workers at once, up to the pool size, and a stream can
+start part-way through a file to resume an interrupted upload.
+"""
+from typing import Optional, Dict, Any, List, Union, AsyncIterator, Tuple, NamedTuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from utils.logger import Logger
+from utils.xls_analyzer import XLSAnalyzer, ExcelSource, SheetRef
+from utils.csv_analyzer import CSVAnalyzer
+from utils.frame_validator import FrameValidator
+from utils.time_entry_batch import TimeEntryBatch
+
+logger = Logger().get_logger()
+
+DEFAULT_PROCESS_MIN_BYTES = 1024 * 1024
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_RECEIVE_TIMEOUT_SECONDS = 30
+PUT_TIMEOUT_SECONDS = 1.0
+RECEIVE_POLL_SECONDS = 0.05
+
+# Analyzers exposing count_rows and iter_raw_frames, keyed by upload format
+PARSERS = {
+    'excel': (XLSAnalyzer, '.xlsx'),
+    'csv': (CSVAnalyzer, '.csv')
+}
+
+class ParsePoolBusy(Exception):
+    """No first batch arrived from a parse worker in time, typically because every worker is busy."""
+
+class ParsedBatch(NamedTuple):
+    """Valid entries of a parsed batch and the rows rejected by validation.
+
+    first_row and last_row are the source row numbers covered by the batch,
+    the header being row 1. end_line counts the lines of a CSV file read
+    through last_row, where a resumed parse starts; it is None for Excel.
+    """
+    entries: TimeEntryBatch
+    rejects: List[Dict[str, Any]]
+    first_row: int = 0
+    last_row: int = 0
+    end_line: Optional[int] = None
+
+    @property
+    def rejected_rows(self) -> int:
+        return len({reject['row'] for reject in self.rejects})
+
+_pool_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_manager = None
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid {name} value {value!r}, using {default}")
+        return default
+
+def _pool_workers() -> int:
+    """Worker count for both pools, configurable with PARSE_POOL_WORKERS."""
+    return max(_env_int('PARSE_POOL_WORKERS', os.cpu_count() or 1), 1)
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=_pool_workers(), thread_name_prefix='upload-parse')
+        return _thread_pool
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool, _manager
+    with _pool_lock:
+        if _process_pool is None:
+            context = multiprocessing.get_context('spawn')
+            _process_pool = ProcessPoolExecutor(max_workers=_pool_workers(), mp_context=context)
+            _manager = context.Manager()
+            logger.info(f"Started upload parse process pool with {_pool_workers()} workers")
+        return _process_pool
+
+def shutdown_parse_pools() -> None:
+    """Shut down the parse pools, e.g. on application shutdown."""
+    global _thread_pool, _process_pool, _manager
+    with _pool_lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=True)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True)
+            _process_pool = None
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
+
+def _source_size(source: ExcelSource) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    position = source.tell()
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(position)
+    return size
+
+def _copy_to_named_file(source: ExcelSource, suffix: str) -> str:
+    """Write a non-path source to a named temp file a worker process can open."""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        if isinstance(source, (bytes, bytearray)):
+            target.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, target)
+        return target.name
+
+def _put(batches, item, cancelled) -> bool:
+    """Put an item on the queue, giving up if the consumer has gone away."""
+    while not cancelled.is_set():
+        try:
+            batches.put(item, timeout=PUT_TIMEOUT_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def parse_worker(
+    parser: str,
+    source: ExcelSource,
+    batch_size: int,
+    batches,
+    cancelled,
+    sheet: Optional[SheetRef] = None,
+    start_row: Optional[int] = None,
+    start_line: Optional[int] = None
+) -> None:
+    """Parse a file and stream ('batch' | 'error' | 'done', payload) messages.
+
+    sheet selects a worksheet for the Excel parser; the first one is used by
+    default. start_row skips the rows before it, and start_line the lines of
+    a CSV file before it. Batch payloads are
+    (entries, rejects, (first_row, last_row, end_line)) tuples.
+    """
+    try:
+        if cancelled.is_set():
+            # The consumer went away while the worker was queued in the pool
+            return
+        analyzer = PARSERS[parser][0]
+        options = {} if sheet is None else {'sheet': sheet}
+        if start_row is not None:
+            options['start_row'] = start_row
+        if start_line is not None:
+            options['start_line'] = start_line
+        for raw in analyzer.iter_raw_frames(source, batch_size, **options):
+            valid, rejects = FrameValidator.validate(raw)
+            frame = XLSAnalyzer.clean_frame(valid)
+            if frame.empty and rejects.empty:
+                continue
+            payload = (
+                TimeEntryBatch.from_frame(frame),
+                FrameValidator.to_records(rejects),
+                (int(raw.index[0]), int(raw.index[-1]), raw.attrs.get('end_line'))
+            )
+            if not _put(batches, ('batch', payload), cancelled):
+                return
+        _put(batches, ('done', None), cancelled)
+    except Exception as e:
+        _put(batches, ('error', str(e)), cancelled)
+
+class ParsedBatchStream:
+    """Async iterator over entry batches parsed by a pool worker."""
+
+    def __init__(
+        self,
+        future: Future,
+        batches,
+        cancelled,
+        label: str,
+        temp_path: Optional[str] = None,
+        sheet: Optional[SheetRef] = None
+    ):
+        self.sheet = sheet
+        self._future = future
+        self._batches = batches
+        self._cancelled = cancelled
+        self._temp_path = temp_path
+        self._label = label
+        self._finished = False
+        self.total_rows = 0
+
+    @staticmethod
+    def count_rows(source: ExcelSource, parser: str = 'excel', sheet: Optional[SheetRef] = None) -> int:
+        """Count the data rows of a file or worksheet, raising ValueError when it cannot be read."""
+        label = 'Excel' if parser == 'excel' else parser.upper()
+        try:
+            options = {} if sheet is None else {'sheet': sheet}
+            return PARSERS[parser][0].count_rows(source, **options)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to parse {label} file: {str(e)}")
+
+    @classmethod
+    async def start(
+        cls,
+        source: ExcelSource,
+        batch_size: int = XLSAnalyzer.DEFAULT_BATCH_SIZE,
+        parser: str = 'excel',
+        sheet: Optional[SheetRef] = None,
+        start_row: Optional[int] = None,
+        total_rows: Optional[int] = None,
+        start_line: Optional[int] = None
+    ) -> 'ParsedBatchStream':
+        """Count the rows of the file and submit it to a pool.
+
+        parser is a key of PARSERS and sheet selects an Excel worksheet.
+        start_row resumes parsing at that source row, and start_line gives the
+        CSV lines read before it, from the checkpoint; total_rows still counts
+        the whole file or worksheet, and is taken as given when the caller
+        has counted already. The rows are counted here rather than by the
+        worker, so starting a stream never waits for a free worker.
+        PARSE_PROCESS_MIN_BYTES sets the file size from which the process pool
+        is used instead of the thread pool.
+        """
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown upload parser: {parser}")
+        label = 'Excel' if parser == 'excel' else parser.upper()
+        if sheet is not None:
+            label = f"{label} sheet {sheet!r}"
+        loop = asyncio.get_running_loop()
+        queue_size = max(_env_int('PARSE_QUEUE_SIZE', DEFAULT_QUEUE_SIZE), 1)
+        size = _source_size(source)
+        temp_path = None
+
+        if size >= _env_int('PARSE_PROCESS_MIN_BYTES', DEFAULT_PROCESS_MIN_BYTES):
+            executor: Executor = get_process_pool()
+            batches = _manager.Queue(maxsize=queue_size)
+            cancelled = _manager.Event()
+            if not isinstance(source, str):
+                temp_path = await loop.run_in_executor(None, _copy_to_named_file, source, PARSERS[parser][1])
+                source = temp_path
+            logger.debug(f"Parsing {size} byte {label} file in process pool")
+        else:
+            executor = get_thread_pool()
+            batches = queue.Queue(maxsize=queue_size)
+            cancelled = threading.Event()
+            logger.debug(f"Parsing {size} byte {label} file in thread pool")
+
+        if total_rows is None:
+            try:
+                total_rows = await loop.run_in_executor(None, cls.count_rows, source, parser, sheet)
+            except BaseException:
+                if temp_path:
+                    os.remove(temp_path)
+                raise
+
+        future = executor.submit(
+            parse_worker, parser, source, batch_size, batches, cancelled, sheet, start_row, start_line
+        )
+        stream = cls(future, batches, cancelled, label, temp_path, sheet)
+        stream.total_rows = total_rows
+        return stream
+
+    async def _receive(self):
+        """Wait for the worker's next message, polling so no executor thread is held."""
+        delay = 0.001
+        while True:
+            try:
+                return self._batches.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECEIVE_POLL_SECONDS)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ParsedBatch:
+        if self._finished:
+            raise StopAsyncIteration
+        try:
+            kind, payload = await self._receive()
+        except BaseException:
+            await self.aclose()
+            raise
+        if kind == 'batch':
+            entries, rejects, (first_row, last_row, end_line) = payload
+            return ParsedBatch(entries, rejects, first_row, last_row, end_line)
+        self._finished = True
+        await self.aclose()
+        if kind == 'error':
+            raise ValueError(f"Failed to parse {self._label} file: {payload}")
+        raise StopAsyncIteration
+
+    async def batches(self) -> AsyncIterator[Tuple[Optional[SheetRef], ParsedBatch]]:
+        """Yield (sheet, batch) pairs, matching SheetBatchStreams.batches."""
+        async for batch in self:
+            yield self.sheet, batch
+
+    async def aclose(self) -> None:
+        """Stop the worker and remove any temp file it was reading."""
+        self._finished = True
+        self._cancelled.set()
+        try:
+            # A worker still queued in the pool is dropped; a running one stops at its next put
+            if not self._future.cancel():
+                await asyncio.wrap_future(self._future)
+        except Exception as e:
+            logger.error(f"{self._label} parse worker failed: {str(e)}")
+        finally:
+            if self._temp_path:
+                try:
+                    os.remove(self._temp_path)
+                except OSError:
+                    pass
+                self._temp_path = None
+
+async def first_batch(batches: AsyncIterator[Tuple[Optional[SheetRef], ParsedBatch]]):
+    """Return the first (sheet, batch) pair of a stream, or None when it is empty.
+
+    This admits a new upload: when no batch arrives within
+    PARSE_RECEIVE_TIMEOUT_SECONDS, typically because every worker is busy
+    with other uploads, ParsePoolBusy is raised so the request can be
+    rejected. Later batches are awaited without a timeout, so an upload that
+    is already being ingested waits for the pool instead of failing midway.
+    """
+    timeout = _env_int('PARSE_RECEIVE_TIMEOUT_SECONDS', DEFAULT_RECEIVE_TIMEOUT_SECONDS)
+    try:
+        return await asyncio.wait_for(anext(batches, None), timeout)
+    except asyncio.TimeoutError:
+        raise ParsePoolBusy(f"No data from the parser within {timeout}s; the parse pool is busy")
+
+class SheetBatchStreams:
+    """Parsed batch streams for several worksheets of one workbook.
+
+    Each worksheet is parsed by its own pool worker, so the sheets are parsed
+    concurrently while their batches are consumed by a single ingestion job.
+    Workers are started lazily, at most as many at once as the pool has
+    workers, and batches are taken from whichever started worksheet has one
+    ready. A worksheet therefore never waits for a worker held by a sheet
+    whose batches are not being consumed, however many sheets are selected.
+    """
+
+    def __init__(
+        self,
+        source: ExcelSource,
+        sheet_rows: Dict[str, int],
+        batch_size: int,
+        start_rows: Dict[str, int],
+        temp_path: Optional[str] = None
+    ):
+        self.sheet_rows = sheet_rows
+        self.streams: Dict[str, ParsedBatchStream] = {}
+        self.total_rows = sum(sheet_rows.values())
+        self._source = source
+        self._batch_size = batch_size
+        self._start_rows = start_rows
+        self._temp_path = temp_path
+        self._receiving: Dict[asyncio.Future, str] = {}
+
+    @classmethod
+    async def start(
+        cls,
+        source: ExcelSource,
+        sheets: List[str],
+        batch_size: int = XLSAnalyzer.DEFAULT_BATCH_SIZE,
+        start_rows: Optional[Dict[str, int]] = None
+    ) -> 'SheetBatchStreams':
+        """Count the rows of each worksheet; workers start once batches are consumed.
+
+        start_rows maps worksheet names to the row their parsing resumes at.
+        """
+        if not sheets:
+            raise ValueError("No worksheets selected")
+        loop = asyncio.get_running_loop()
+        temp_path = None
+
+        # Workers cannot share one open file, so hand them a path or the bytes
+        if not isinstance(source, str):
+            if _source_size(source) >= _env_int('PARSE_PROCESS_MIN_BYTES', DEFAULT_PROCESS_MIN_BYTES):
+                temp_path = await loop.run_in_executor(None, _copy_to_named_file, source, '.xlsx')
+                source = temp_path
+            elif not isinstance(source, (bytes, bytearray)):
+                source.seek(0)
+                source = source.read()
+
+        def count_sheets() -> Dict[str, int]:
+            return {sheet: ParsedBatchStream.count_rows(source, 'excel', sheet) for sheet in sheets}
+
+        try:
+            sheet_rows = await loop.run_in_executor(None, count_sheets)
+        except BaseException:
+            if temp_path:
+                os.remove(temp_path)
+            raise
+        streams = cls(source, sheet_rows, batch_size, start_rows or {}, temp_path)
+        logger.debug(f"Parsing {len(sheets)} worksheets with {streams.total_rows} rows")
+        return streams
+
+    async def _start_sheet(self, sheet: str) -> ParsedBatchStream:
+        stream = await ParsedBatchStream.start(
+            self._source, self._batch_size, parser='excel', sheet=sheet,
+            start_row=self._start_rows.get(sheet), total_rows=self.sheet_rows[sheet]
+        )
+        self.streams[sheet] = stream
+        return stream
+
+    def _receive(self, sheet: str) -> None:
+        self._receiving[asyncio.ensure_future(anext(self.streams[sheet], None))] = sheet
+
+    async def batches(self) -> AsyncIterator[Tuple[str, ParsedBatch]]:
+        """Yield (sheet, batch) pairs as the worksheets' batches arrive.
+
+        Batches of one worksheet keep their order. Up to PARSE_POOL_WORKERS
+        worksheets are parsed at once; the next one starts when a started
+        worksheet is exhausted.
+        """
+        pending = [sheet for sheet in self.sheet_rows if sheet not in self.streams]
+        while pending or self._receiving:
+            while pending and len(self._receiving) < _pool_workers():
+                sheet = pending.pop(0)
+                await self._start_sheet(sheet)
+                self._receive(sheet)
+            done, _ = await asyncio.wait(self._receiving, return_when=asyncio.FIRST_COMPLETED)
+            # Deliver in worksheet order when several sheets are ready at once
+            for future in sorted(done, key=lambda ready: list(self.sheet_rows).index(self._receiving[ready])):
+                sheet = self._receiving.pop(future)
+                batch = future.result()
+                if batch is not None:
+                    self._receive(sheet)
+                    yield sheet, batch
+
+    async def aclose(self) -> None:
+        """Stop every worker and remove the shared temp file."""
+        try:
+            for future in self._receiving:
+                future.cancel()
+            self._receiving = {}
+            for stream in self.streams.values():
+                await stream.aclose()
+        finally:
+            if self._temp_path:
+                try:
+                    os.remove(self._temp_path)
+                except OSError:
+                    pass
+                self._temp_path = None
@@ -0,0 +1,175 @@
+"""Columnar time entry batches.
+
+A TimeEntryBatch holds the entries of an upload chunk as a struct of arrays:
+dates, hours and source row numbers in NumPy arrays, and the string columns
+dictionary-encoded so each row stores an int32 code into the column's distinct
+values. Timesheets repeat the same customers, projects and categories on every
+row, so a buffered row costs a few dozen bytes instead of a dictionary, a
+pydantic model and a dump of it. Batches pickle as a handful of arrays across
+the parse pool, and per-value work such as normalization runs once per
+distinct value rather than once per row.
+"""
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Union
+import sys
+import numpy as np
+import pandas as pd
+
+class EncodedColumn(NamedTuple):
+    """Dictionary-encoded string column; code -1 stands for None."""
+    codes: np.ndarray
+    values: List[Optional[str]]
+
+    @classmethod
+    def from_series(cls, series: pd.Series, default: Optional[str] = None) -> 'EncodedColumn':
+        """Encode a series, storing default for its missing values when one is given."""
+        codes, uniques = pd.factorize(series)
+        codes = codes.astype(np.int32)
+        values = [str(value) for value in uniques]
+        if default is not None:
+            missing = codes < 0
+            if missing.any():
+                values.append(default)
+                codes[missing] = len(values) - 1
+        return cls(codes, values)
+
+    def lookup(self, rendered: List[Any], missing: Any = None) -> np.ndarray:
+        """Gather a per-row array from values rendered once per distinct value."""
+        return np.array(list(rendered) + [missing], dtype=object)[self.codes]
+
+    def decode(self) -> List[Optional[str]]:
+        """Return the per-row values."""
+        return self.lookup(self.values).tolist()
+
+    def map(self, func: Callable[[str], Optional[str]]) -> 'EncodedColumn':
+        """Apply func to each distinct value; values mapped to None become missing."""
+        mapped = [func(value) for value in self.values]
+        remap = np.array([-1 if value is None else code for code, value in enumerate(mapped)] + [-1], dtype=np.int32)
+        return EncodedColumn(remap[self.codes], mapped)
+
+    def take(self, index) -> 'EncodedColumn':
+        return EncodedColumn(self.codes[index], self.values)
+
+class TimeEntryBatch:
+    """Struct-of-arrays batch of time entries, in loader column order."""
+    STRING_COLUMNS = ('category', 'subcategory', 'customer', 'project', 'task_description')
+    FRAME_COLUMNS = {
+        'category': 'Category',
+        'subcategory': 'Subcategory',
+        'customer': 'Customer',
+        'project': 'Project',
+        'task_description': 'Task Description'
+    }
+    # Stored for missing values, so every entry satisfies TimeEntryCreate
+    DEFAULTS = {'category': 'Other', 'subcategory': 'General', 'task_description': ''}
+
+    __slots__ = ('rows', 'date', 'hours') + STRING_COLUMNS
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        date: np.ndarray,
+        hours: np.ndarray,
+        category: EncodedColumn,
+        subcategory: EncodedColumn,
+        customer: EncodedColumn,
+        project: EncodedColumn,
+        task_description: EncodedColumn
+    ):
+        self.rows = rows
+        self.date = date
+        self.hours = hours
+        self.category = category
+        self.subcategory = subcategory
+        self.customer = customer
+        self.project = project
+        self.task_description = task_description
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TimeEntryBatch':
+        """Build a batch from a frame cleaned by XLSAnalyzer.clean_frame.
+
+        The frame index is kept as the source row number of each entry.
+        """
+        return cls(
+            rows=df.index.to_numpy(dtype=np.int32),
+            date=df['Date'].to_numpy(dtype='datetime64[D]'),
+            hours=df['Hours'].to_numpy(dtype=np.float64),
+            **{
+                field: EncodedColumn.from_series(df[column], cls.DEFAULTS.get(field))
+                for field, column in cls.FRAME_COLUMNS.items()
+            }
+        )
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Any], first_row: int = 1) -> 'TimeEntryBatch':
+        """Build a batch from TimeEntryCreate instances or dictionaries with the same fields."""
+        entries = list(entries)
+        def column(field: str) -> List[Any]:
+            return [entry.get(field) if isinstance(entry, dict) else getattr(entry, field, None) for entry in entries]
+        hours = [0.0 if value is None else value for value in column('hours')]
+        return cls(
+            rows=np.arange(first_row, first_row + len(entries), dtype=np.int32),
+            date=np.array(column('date'), dtype='datetime64[D]'),
+            hours=np.array(hours, dtype=np.float64),
+            **{
+                field: EncodedColumn.from_series(pd.Series(column(field), dtype=object), cls.DEFAULTS.get(field))
+                for field in cls.STRING_COLUMNS
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the batch, including its distinct strings."""
+        size = self.rows.nbytes + self.date.nbytes + self.hours.nbytes
+        for field in self.STRING_COLUMNS:
+            column = getattr(self, field)
+            size += column.codes.nbytes + sum(sys.getsizeof(value) for value in column.values)
+        return size
+
+    def take(self, index) -> 'TimeEntryBatch':
+        """Return the entries selected by a boolean mask or an array of positions."""
+        return TimeEntryBatch(
+            self.rows[index],
+            self.date[index],
+            self.hours[index],
+            *(getattr(self, field).take(index) for field in self.STRING_COLUMNS)
+        )
+
+    def map_column(self, field: str, func: Callable[[str], Optional[str]]) -> 'TimeEntryBatch':
+        """Return a batch with func applied to each distinct value of a string column."""
+        columns = {name: getattr(self, name) for name in self.STRING_COLUMNS}
+        columns[field] = columns[field].map(func)
+        return TimeEntryBatch(self.rows, self.date, self.hours, **columns)
+
+    def date_text(self) -> List[str]:
+        """ISO formatted dates, one per row."""
+        return np.datetime_as_string(self.date, unit='D').tolist()
+
+    def customers(self) -> Set[str]:
+        """Distinct customers referenced by the batch."""
+        codes = np.unique(self.customer.codes)
+        return {self.customer.values[code] for code in codes[codes >= 0]}
+
+    def project_customers(self) -> Dict[str, Optional[str]]:
+        """Map each project to the customer of its first entry."""
+        codes, first = np.unique(self.project.codes, return_index=True)
+        project_customers = {}
+        for position in sorted(first[codes >= 0]):
+            project = self.project.values[self.project.codes[position]]
+            customer_code = self.customer.codes[position]
+            if project not in project_customers:
+                project_customers[project] = self.customer.values[customer_code] if customer_code >= 0 else None
+        return project_customers
+
+    def to_records(self) -> List[Dict[str, Union[str, float, None]]]:
+        """Expand the batch into per-row dictionaries, e.g. for inspection in tests."""
+        columns = {field: getattr(self, field).decode() for field in self.STRING_COLUMNS}
+        dates = self.date.astype(object).tolist()
+        hours = self.hours.tolist()
+        return [
+            {'date': dates[i], 'hours': hours[i], **{field: values[i] for field, values in columns.items()}}
+            for i in range(len(self))
+        ]
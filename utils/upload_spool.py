@@ -0,0 +1,98 @@
+"""Spooled upload handling"""
+from typing import BinaryIO, Optional, Tuple
+import hashlib
+import os
+from io import BytesIO
+from fastapi import Request, UploadFile
+from utils.logger import Logger
+
+logger = Logger().get_logger()
+
+DEFAULT_MAX_UPLOAD_MB = 10
+READ_CHUNK_BYTES = 1024 * 1024
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File size exceeds {max_bytes // (1024 * 1024)}MB limit")
+
+def get_max_upload_bytes() -> int:
+    """Return the upload size limit, configurable with MAX_UPLOAD_SIZE_MB."""
+    value = os.environ.get('MAX_UPLOAD_SIZE_MB', DEFAULT_MAX_UPLOAD_MB)
+    try:
+        max_mb = int(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid MAX_UPLOAD_SIZE_MB value {value!r}, using {DEFAULT_MAX_UPLOAD_MB}")
+        max_mb = DEFAULT_MAX_UPLOAD_MB
+    return max_mb * 1024 * 1024
+
+def check_content_length(content_length: Optional[str], max_bytes: Optional[int] = None) -> None:
+    """Reject a request whose declared body size exceeds the upload size limit.
+
+    Run before the body is read so oversized uploads are refused without being
+    received. A missing or malformed header is left for the body checks.
+    """
+    if max_bytes is None:
+        max_bytes = get_max_upload_bytes()
+    try:
+        declared = int(content_length)
+    except (TypeError, ValueError):
+        return
+    if declared > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+async def read_body(request: Request, max_bytes: Optional[int] = None) -> bytes:
+    """Read a request body, failing as soon as it grows past the upload size limit.
+
+    Covers bodies sent without a Content-Length, which the upload size
+    middleware cannot check up front.
+    """
+    if max_bytes is None:
+        max_bytes = get_max_upload_bytes()
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = READ_CHUNK_BYTES
+) -> Tuple[BinaryIO, int, str]:
+    """Size-check and hash an upload in the temp file it was received into.
+
+    The request parser has already spooled the body to file.file, so it is
+    not copied again: its size is taken from the end of the file and it is
+    read once in chunks for the SHA-256. Returns that file rewound to the
+    start together with its size and hash. The file is detached from the
+    upload, which FastAPI closes as soon as the endpoint returns, so it
+    stays open for background processing; the caller owns it and must
+    close it.
+    """
+    if max_bytes is None:
+        max_bytes = get_max_upload_bytes()
+
+    # Seeking only moves the file position, so it does not need a worker thread
+    size = file.file.seek(0, os.SEEK_END)
+    if size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    await file.seek(0)
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+
+    await file.seek(0)
+    spooled = file.file
+    file.file = BytesIO()
+    logger.debug(f"Checked upload {file.filename}: {size} bytes")
+    return spooled, size, digest.hexdigest()
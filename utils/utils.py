@@ -1,8 +1,11 @@
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, date
 import calendar
+import json
 from utils.logger import Logger
+from utils.xls_analyzer import XLSAnalyzer
+from utils.frame_validator import FrameValidator
 import pandas as pd
 from io import StringIO
 
@@ -153,7 +156,8 @@ def parse_csv(file) -> List:
             return []
 
         from database import schemas
-        entries = []
+        rows = []
+        row_numbers = []
         logger.info(f"Processing {len(df)} rows from CSV file")
 
         for index, row in df.iterrows():
@@ -166,24 +170,29 @@ def parse_csv(file) -> List:
                 customer = clean_string_value(row.get('Customer', ''))
                 project = clean_string_value(row.get('Project', ''))
 
-                entry = schemas.TimeEntryCreate(
-                    date=parse_date(row.get('Date')),
-                    week_number=validate_week_number(row.get('Week Number')),
-                    month=validate_month(row.get('Month')),
-                    category=clean_string_value(row.get('Category'), "category"),
-                    subcategory=clean_string_value(row.get('Subcategory'), "category"),
-                    customer=customer or "Unassigned",
-                    project=project or "Unassigned",
-                    task_description=clean_string_value(row.get('Task Description')),
-                    hours=hours
-                )
-                entries.append(entry)
+                validate_week_number(row.get('Week Number'))
+                validate_month(row.get('Month'))
+                rows.append({
+                    'date': parse_date(row.get('Date')),
+                    'category': clean_string_value(row.get('Category'), "category"),
+                    'subcategory': clean_string_value(row.get('Subcategory'), "category"),
+                    'customer': customer or "Unassigned",
+                    'project': project or "Unassigned",
+                    'task_description': clean_string_value(row.get('Task Description')),
+                    'hours': hours
+                })
+                row_numbers.append(index + 1)
                 logger.debug(f"Successfully processed row {index + 1}")
 
             except Exception as e:
                 logger.error(f"Error processing row {index + 1}: {str(e)}")
                 continue
 
+        # Validate the collected rows with one call instead of a model per row
+        entries, errors = schemas.validate_time_entries(rows)
+        for position, error in errors.items():
+            logger.error(f"Error processing row {row_numbers[position]}: {error}")
+
         logger.info(f"Successfully processed {len(entries)} valid entries")
         return entries
 
@@ -191,10 +200,82 @@ def parse_csv(file) -> List:
         logger.error(f"Failed to parse CSV: {str(e)}")
         raise ValueError(f"Failed to parse file: {str(e)}")
 
+def frame_to_entries(df: pd.DataFrame) -> List:
+    """Convert a frame cleaned by XLSAnalyzer.clean_frame into time entries.
+
+    Applies the same rules as parse_csv with column operations instead of a
+    per-row loop: rows with hours outside (0, 24] are skipped, categories are
+    title-cased and missing customers and projects become "Unassigned".
+    """
+    from database import schemas
+
+    valid = (df['Hours'] > 0) & (df['Hours'] <= 24)
+    skipped = int((~valid).sum())
+    if skipped:
+        logger.warning(f"Skipping {skipped} rows with invalid hours")
+    df = df[valid]
+
+    columns = zip(
+        df['Date'].dt.date.tolist(),
+        df['Category'].fillna('').str.title().tolist(),
+        df['Subcategory'].fillna('').str.title().tolist(),
+        df['Customer'].fillna('Unassigned').tolist(),
+        df['Project'].fillna('Unassigned').tolist(),
+        df['Task Description'].fillna('').tolist(),
+        df['Hours'].tolist()
+    )
+    # Dates and hours were checked on the whole frame, so entries skip pydantic validation
+    return schemas.construct_time_entries(
+        {
+            'date': entry_date,
+            'category': category,
+            'subcategory': subcategory,
+            'customer': customer,
+            'project': project,
+            'task_description': description,
+            'hours': hours
+        }
+        for entry_date, category, subcategory, customer, project, description, hours in columns
+    )
+
 def parse_excel(file) -> List:
-    """Parse Excel file."""
+    """Parse Excel file directly into time entries, without a CSV round-trip."""
     logger.info("Starting Excel parsing")
-    df = pd.read_excel(file, parse_dates=['Date'])
-    df.to_csv('temp.csv', index=False)
-    with open('temp.csv', 'r') as csv_file:
-        return parse_csv(csv_file)
\ No newline at end of file
+
+    try:
+        df = pd.read_excel(file)
+        validate_csv_structure(df)
+        df, rejects = FrameValidator.validate(df)
+        if not rejects.empty:
+            logger.warning(f"Rejected {rejects['row'].nunique()} rows: {FrameValidator.summarize(FrameValidator.to_records(rejects))}")
+        df = XLSAnalyzer.clean_frame(df)
+
+        if df.empty:
+            logger.warning("No valid entries found in Excel file")
+            return []
+
+        entries = frame_to_entries(df)
+        logger.info(f"Successfully processed {len(entries)} valid entries")
+        return entries
+
+    except Exception as e:
+        logger.error(f"Failed to parse Excel: {str(e)}")
+        raise ValueError(f"Failed to parse file: {str(e)}")
+
+def parse_json_lines(text: str) -> Tuple[List[Any], Dict[int, str]]:
+    """Parse newline-delimited JSON with one item per non-empty line.
+
+    Returns the items and an error message for every line that is not valid
+    JSON, keyed by the item's position. Such items are None.
+    """
+    items = []
+    errors = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            errors[len(items)] = f"invalid JSON: {e}"
+            items.append(None)
+    return items, errors
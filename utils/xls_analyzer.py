@@ -1,118 +1,285 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Union, BinaryIO
 import pandas as pd
 from datetime import datetime
 from io import BytesIO
+from openpyxl import load_workbook
 from utils.logger import Logger
 from tqdm import tqdm
 
 logger = Logger().get_logger()
 
+ExcelSource = Union[bytes, str, BinaryIO]
+# A worksheet is selected by name or by position
+SheetRef = Union[str, int]
+
 class XLSAnalyzer:
     REQUIRED_COLUMNS = {
         'Week Number', 'Month', 'Category', 'Subcategory',
         'Customer', 'Project', 'Task Description', 'Hours', 'Date'
     }
+    STRING_COLUMNS = ['Month', 'Category', 'Subcategory', 'Customer', 'Project', 'Task Description']
+    NULL_TOKENS = ['-', '', 'nan', 'NaN', 'None', 'null', 'NA', 'N/A', '#N/A']
+    DEFAULT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def map_distinct(series: pd.Series, func) -> pd.Series:
+        """Apply a vectorized function to each distinct value once and map the results back.
+
+        Timesheet columns repeat the same few values across thousands of rows,
+        so the string work is done on the distinct values only. Missing values
+        are passed to func as None.
+        """
+        codes, uniques = pd.factorize(series)
+        values = func(pd.Series(list(uniques) + [None], dtype=object))
+        # Code -1 marks a missing value and picks the trailing None
+        return pd.Series(values.to_numpy()[codes], index=series.index, dtype=values.dtype)
+
+    @staticmethod
+    def _clean_strings(series: pd.Series) -> pd.Series:
+        cleaned = series.astype('string').str.strip()
+        cleaned = cleaned.mask(cleaned.isin(XLSAnalyzer.NULL_TOKENS))
+        # Hand back plain objects so missing values are None rather than pd.NA
+        return cleaned.astype(object).where(cleaned.notna(), None)
 
     @staticmethod
     def clean_string_column(series: pd.Series) -> pd.Series:
         """Clean string columns efficiently using vectorized operations."""
         try:
-            # Convert NaN to empty string first, then process
-            str_series = series.fillna('')
-            # Convert to string and clean
-            cleaned = str_series.astype(str).apply(
-                lambda x: None if x.strip() in ['-', '', 'nan', 'None', 'null'] else x.strip()
-            )
-            return cleaned
+            return XLSAnalyzer.map_distinct(series, XLSAnalyzer._clean_strings)
         except Exception as e:
             logger.error(f"Error cleaning string column: {str(e)}")
             return series
 
     @staticmethod
-    def read_excel(file_contents: bytes, chunk_size: int = 1000) -> List[Dict[str, Any]]:
-        """Read Excel file and return list of dictionaries with data."""
+    def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the vectorized cleaning rules to a raw timesheet frame."""
+        # Drop rows that are entirely empty before defaults are filled in
+        df = df.dropna(how='all')
+
+        # Handle missing columns with defaults
+        missing_columns = XLSAnalyzer.REQUIRED_COLUMNS - set(df.columns)
+        for col in missing_columns:
+            if col == 'Week Number':
+                df[col] = 0
+            elif col == 'Hours':
+                df[col] = 0.0
+            elif col == 'Date':
+                df[col] = pd.NaT
+            else:
+                df[col] = ''
+
+        # Clean string columns
+        for col in XLSAnalyzer.STRING_COLUMNS:
+            df[col] = XLSAnalyzer.clean_string_column(df[col])
+
+        # Convert numeric columns safely
+        df['Week Number'] = pd.to_numeric(df['Week Number'], errors='coerce').fillna(0).astype(int)
+        df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce').fillna(0.0).astype(float)
+
+        # Ensure date column is properly formatted
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        return df.dropna(subset=['Date'])
+
+    @staticmethod
+    def frame_to_columns(df: pd.DataFrame) -> Dict[str, List[Any]]:
+        """Convert a cleaned frame into plain column lists.
+
+        Column lists are much cheaper to pickle than per-row dictionaries, so
+        this is the form batches take when they cross a process boundary.
+        """
+        return {
+            'Week Number': df['Week Number'].tolist(),
+            'Month': df['Month'].tolist(),
+            'Category': df['Category'].tolist(),
+            'Subcategory': df['Subcategory'].tolist(),
+            'Customer': df['Customer'].tolist(),
+            'Project': df['Project'].tolist(),
+            'Task Description': df['Task Description'].tolist(),
+            'Hours': df['Hours'].tolist(),
+            'Date': df['Date'].dt.strftime('%Y-%m-%d').tolist()
+        }
+
+    @staticmethod
+    def columns_to_records(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """Expand column lists into the record dictionaries used by ingestion."""
+        rows = zip(
+            columns['Week Number'],
+            columns['Month'],
+            columns['Category'],
+            columns['Subcategory'],
+            columns['Customer'],
+            columns['Project'],
+            columns['Task Description'],
+            columns['Hours'],
+            columns['Date']
+        )
+        return [
+            {
+                'Week Number': int(week),
+                'Month': month or '',
+                'Category': category or 'Other',
+                'Subcategory': subcategory or 'General',
+                'Customer': customer,
+                'Project': project,
+                'Task Description': description or '',
+                'Hours': float(hours),
+                'Date': entry_date
+            }
+            for week, month, category, subcategory, customer, project, description, hours, entry_date in rows
+        ]
+
+    @staticmethod
+    def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Convert a cleaned frame into the record dictionaries used by ingestion."""
+        return XLSAnalyzer.columns_to_records(XLSAnalyzer.frame_to_columns(df))
+
+    @staticmethod
+    def _open_workbook(source: ExcelSource):
+        """Open a workbook in read-only mode so rows are streamed from the archive."""
+        if isinstance(source, (bytes, bytearray)):
+            if not source:
+                raise ValueError("Empty file contents provided")
+            source = BytesIO(source)
+        elif hasattr(source, 'seek'):
+            source.seek(0)
+        return load_workbook(source, read_only=True, data_only=True)
+
+    @staticmethod
+    def _worksheet(workbook, sheet: SheetRef):
+        """Return a worksheet by name or position."""
+        try:
+            if isinstance(sheet, int):
+                return workbook.worksheets[sheet]
+            return workbook[sheet]
+        except (IndexError, KeyError):
+            raise ValueError(f"Worksheet {sheet!r} not found")
+
+    @staticmethod
+    def sheet_names(source: ExcelSource) -> List[str]:
+        """Return the worksheet names in workbook order."""
+        workbook = XLSAnalyzer._open_workbook(source)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def count_rows(source: ExcelSource, sheet: SheetRef = 0) -> int:
+        """Return the number of data rows declared by a worksheet, the first by default."""
+        workbook = XLSAnalyzer._open_workbook(source)
+        try:
+            worksheet = XLSAnalyzer._worksheet(workbook, sheet)
+            max_row = worksheet.max_row
+            if max_row is None:
+                # Sheet has no stored dimension, so scan it (rows only, no cell conversion)
+                worksheet.calculate_dimension(force=True)
+                max_row = worksheet.max_row or 0
+            return max(max_row - 1, 0)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def iter_raw_frames(
+        source: ExcelSource,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sheet: SheetRef = 0,
+        start_row: int = 2
+    ) -> Iterator[pd.DataFrame]:
+        """Stream uncleaned DataFrames of at most batch_size rows from a worksheet.
+
+        Frames are indexed by worksheet row number, the header being row 1.
+        Rows before start_row are skipped by the reader, so resumed uploads
+        never build frames for rows that were already loaded.
+        """
+        workbook = XLSAnalyzer._open_workbook(source)
+        try:
+            worksheet = XLSAnalyzer._worksheet(workbook, sheet)
+            header = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), None)
+            if header is None:
+                return
+            start_row = max(start_row, 2)
+            rows = worksheet.iter_rows(min_row=start_row, values_only=True)
+
+            columns = [
+                str(name).strip() if name is not None else f"Unnamed: {idx}"
+                for idx, name in enumerate(header)
+            ]
+            width = len(columns)
+            padding = (None,) * width
+
+            batch = []
+            first_row = start_row
+            for row in rows:
+                if len(row) != width:
+                    row = (tuple(row) + padding)[:width]
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield XLSAnalyzer._batch_frame(batch, columns, first_row)
+                    first_row += len(batch)
+                    batch = []
+
+            if batch:
+                yield XLSAnalyzer._batch_frame(batch, columns, first_row)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _batch_frame(batch: List[tuple], columns: List[str], first_row: int) -> pd.DataFrame:
+        return pd.DataFrame.from_records(
+            batch, columns=columns, index=pd.RangeIndex(first_row, first_row + len(batch))
+        )
+
+    @staticmethod
+    def iter_frames(
+        source: ExcelSource,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sheet: SheetRef = 0
+    ) -> Iterator[pd.DataFrame]:
+        """Stream cleaned DataFrames of at most batch_size rows from a worksheet."""
+        for raw in XLSAnalyzer.iter_raw_frames(source, batch_size, sheet):
+            frame = XLSAnalyzer.clean_frame(raw)
+            if not frame.empty:
+                yield frame
+
+    @staticmethod
+    def iter_excel(
+        source: ExcelSource,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sheet: SheetRef = 0
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream cleaned records in batches without loading the whole sheet.
+
+        Rows are not checked against FrameValidator; callers that store them
+        validate the raw frames from iter_raw_frames instead.
+        """
+        for frame in XLSAnalyzer.iter_frames(source, batch_size, sheet):
+            yield XLSAnalyzer.frame_to_records(frame)
+
+    @staticmethod
+    def read_excel(
+        file_contents: bytes,
+        chunk_size: int = 1000,
+        sheets: Optional[List[SheetRef]] = None
+    ) -> List[Dict[str, Any]]:
+        """Read Excel file and return list of dictionaries with data.
+
+        Only the first worksheet is read unless sheets lists the worksheets to
+        read; pass sheet_names(file_contents) to read all of them.
+        """
         try:
             logger.debug("Starting Excel file analysis")
 
             if not file_contents:
                 raise ValueError("Empty file contents provided")
 
-            # Read Excel file with explicit data types
-            df = pd.read_excel(
-                BytesIO(file_contents),
-                sheet_name=0,
-                dtype={
-                    'Week Number': 'object',
-                    'Month': 'str',
-                    'Category': 'str',
-                    'Subcategory': 'str',
-                    'Customer': 'str',
-                    'Project': 'str',
-                    'Task Description': 'str',
-                    'Hours': 'float',
-                    'Date': 'datetime64[ns]'
-                },
-                na_values=['', '-', 'NA', 'N/A', '#N/A'],
-                keep_default_na=True
-            )
-
-            # Handle missing columns with defaults
-            missing_columns = XLSAnalyzer.REQUIRED_COLUMNS - set(df.columns)
-            for col in missing_columns:
-                if col == 'Week Number':
-                    df[col] = 0
-                elif col == 'Hours':
-                    df[col] = 0.0
-                else:
-                    df[col] = ''
-
-            # Drop empty rows
-            df = df.dropna(how='all')
-
-            # Clean string columns
-            string_columns = ['Month', 'Category', 'Subcategory', 'Customer', 'Project', 'Task Description']
-            for col in string_columns:
-                if col in df.columns:
-                    df[col] = XLSAnalyzer.clean_string_column(df[col])
-
-            # Convert numeric columns safely
-            try:
-                df['Week Number'] = pd.to_numeric(df['Week Number'], errors='coerce').fillna(0).astype(int)
-            except Exception:
-                df['Week Number'] = 0
-
-            try:
-                df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce').fillna(0.0).astype(float)
-            except Exception:
-                df['Hours'] = 0.0
-
-            # Ensure date column is properly formatted
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            df = df.dropna(subset=['Date'])
-
-            # Process records
             records = []
-            for chunk_start in range(0, len(df), chunk_size):
-                chunk = df.iloc[chunk_start:chunk_start + chunk_size]
-                chunk_records = chunk.to_dict('records')
-
-                for record in chunk_records:
-                    processed_record = {
-                        'Week Number': int(record['Week Number']),
-                        'Month': str(record.get('Month', '')),
-                        'Category': str(record.get('Category', 'Other')),
-                        'Subcategory': str(record.get('Subcategory', 'General')),
-                        'Customer': record.get('Customer') if pd.notna(record.get('Customer')) else None,
-                        'Project': record.get('Project') if pd.notna(record.get('Project')) else None,
-                        'Task Description': str(record.get('Task Description', '')),
-                        'Hours': float(record['Hours']),
-                        'Date': record['Date'].strftime('%Y-%m-%d')
-                    }
-                    records.append(processed_record)
+            for sheet in sheets or [0]:
+                for batch in XLSAnalyzer.iter_excel(file_contents, batch_size=chunk_size, sheet=sheet):
+                    records.extend(batch)
 
             logger.info(f"Successfully processed {len(records)} records from Excel file")
             return records
 
         except Exception as e:
             logger.error(f"Error parsing Excel file: {str(e)}")
-            raise ValueError(f"Failed to parse Excel file: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Failed to parse Excel file: {str(e)}")